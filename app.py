@@ -10,23 +10,62 @@ Enhanced with:
 - Custom URN scheme
 """
 
+import bisect
+import cProfile
+import functools
+import hashlib
+import heapq
+import itertools
+import math
+import mimetypes
 import os
+import pstats
 import shutil
+import struct
+import sys
 import tempfile
-from flask import Flask, render_template, request, jsonify, send_file, redirect
+import threading
+import time
+import uuid
+import zlib
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from difflib import SequenceMatcher
+from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for, g, has_app_context, make_response, stream_with_context
 from sqlalchemy.engine.url import make_url
 import logging
+from flask.json.provider import DefaultJSONProvider
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session as FlaskSession
 from flask_cors import CORS
-from sqlalchemy import inspect, text
+from sqlalchemy import CompoundSelect, Select, create_engine, event, inspect, text
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import DBAPIError, IntegrityError, SQLAlchemyError
+from sqlalchemy.pool import QueuePool
 import csv
 import io
 import json
-from datetime import datetime
-from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from collections import Counter, defaultdict, deque
 import re
 import unicodedata
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # columnar export/import is optional
+    pa = None
+    pq = None
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess as prometheus_multiprocess
+except ImportError:  # /metrics is optional
+    prometheus_client = None
+    prometheus_multiprocess = None
+
 # Shared color palette for author-based visualizations
 AUTHOR_PALETTE = [
     '#e41a1c',  # Bright red
@@ -123,9 +162,211 @@ app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri()
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SECRET_KEY'] = 'your-secret-key-change-in-production'
 app.config['DEMO_MODE'] = os.environ.get('DEMO_MODE', 'false').lower() == 'true'
+# Background maintenance jobs (reindex, URN generation, import, seeding, reset)
+app.config['JOB_WORKERS'] = int(os.environ.get('JOB_WORKERS', '2'))
+app.config['JOB_BATCH_SIZE'] = int(os.environ.get('JOB_BATCH_SIZE', '500'))
+app.config['JOB_STALE_SECONDS'] = int(os.environ.get('JOB_STALE_SECONDS', '900'))
+# Rows fetched per server-side cursor batch when streaming /api/entries as NDJSON
+app.config['NDJSON_BATCH_SIZE'] = int(os.environ.get('NDJSON_BATCH_SIZE', '500'))
+# Search hit snippets: at most SNIPPET_MAX_PER_FIELD windows per field, SNIPPET_CONTEXT_CHARS either side of a hit
+app.config['SNIPPET_MAX_PER_FIELD'] = int(os.environ.get('SNIPPET_MAX_PER_FIELD', '3'))
+app.config['SNIPPET_CONTEXT_CHARS'] = int(os.environ.get('SNIPPET_CONTEXT_CHARS', '60'))
+# BM25 parameters for sort_by=relevance: K1 saturates term frequency, B weights entry length
+app.config['BM25_K1'] = float(os.environ.get('BM25_K1', '1.2'))
+app.config['BM25_B'] = float(os.environ.get('BM25_B', '0.75'))
+# Change log behind /api/changes: rows older than CHANGE_LOG_RETENTION_DAYS are dropped (0 keeps them),
+# rows older than CHANGE_LOG_COMPACT_AFTER_HOURS are merged per record; a compaction job is queued every
+# CHANGE_LOG_COMPACT_EVERY revisions (0 = only via POST /api/changes/compact)
+app.config['CHANGE_LOG_RETENTION_DAYS'] = float(os.environ.get('CHANGE_LOG_RETENTION_DAYS', '30'))
+app.config['CHANGE_LOG_COMPACT_AFTER_HOURS'] = float(os.environ.get('CHANGE_LOG_COMPACT_AFTER_HOURS', '24'))
+app.config['CHANGE_LOG_COMPACT_EVERY'] = int(os.environ.get('CHANGE_LOG_COMPACT_EVERY', '1000'))
+app.config['CHANGE_FEED_LIMIT'] = int(os.environ.get('CHANGE_FEED_LIMIT', '1000'))
+# /api/changes/stream holds its worker for up to CHANGE_STREAM_MAX_SECONDS, so it is off unless gunicorn
+# runs threaded or async workers; the page then follows changes over it instead of polling /api/changes
+app.config['CHANGE_STREAM_ENABLED'] = os.environ.get('CHANGE_STREAM_ENABLED', 'false').lower() == 'true'
+app.config['CHANGE_STREAM_POLL_SECONDS'] = float(os.environ.get('CHANGE_STREAM_POLL_SECONDS', '1'))
+app.config['CHANGE_STREAM_MAX_SECONDS'] = float(os.environ.get('CHANGE_STREAM_MAX_SECONDS', '300'))
+# In-memory entry-id bitmaps per filter value, caught up from the change log; off sends every filter to SQL
+app.config['FILTER_INDEX_ENABLED'] = os.environ.get('FILTER_INDEX_ENABLED', 'true').lower() == 'true'
+# Rows per Arrow record batch / Parquet row group in columnar export and import
+app.config['COLUMNAR_ROW_GROUP_SIZE'] = int(os.environ.get('COLUMNAR_ROW_GROUP_SIZE', '5000'))
+# Per-request SQL/serialization timing; when off no hooks are installed at all
+app.config['PERF_INSTRUMENTATION'] = os.environ.get('PERF_INSTRUMENTATION', 'false').lower() == 'true'
+app.config['PERF_SAMPLES_PER_ROUTE'] = int(os.environ.get('PERF_SAMPLES_PER_ROUTE', '1000'))
+# Sampling profiler: requests slower than the budget keep their stack samples in a ring buffer on disk;
+# requests sending `X-Profile: cprofile` (plus PROFILE_TOKEN if set) are traced with cProfile instead
+app.config['PROFILING_ENABLED'] = os.environ.get('PROFILING_ENABLED', 'false').lower() == 'true'
+app.config['PROFILE_LATENCY_BUDGET_MS'] = float(os.environ.get('PROFILE_LATENCY_BUDGET_MS', '1000'))
+app.config['PROFILE_SAMPLE_INTERVAL_MS'] = float(os.environ.get('PROFILE_SAMPLE_INTERVAL_MS', '10'))
+app.config['PROFILE_DIR'] = os.environ.get('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'oribasius-profiles'))
+app.config['PROFILE_MAX_FILES'] = int(os.environ.get('PROFILE_MAX_FILES', '50'))
+app.config['PROFILE_TOKEN'] = os.environ.get('PROFILE_TOKEN')
+# Prometheus /metrics; set PROMETHEUS_MULTIPROC_DIR as well when running several gunicorn workers
+app.config['METRICS_ENABLED'] = (os.environ.get('METRICS_ENABLED', 'false').lower() == 'true'
+                                 and prometheus_client is not None)
+
+# SQLite connection profile: 'tuned' applies the pragmas below on every new connection,
+# 'default' leaves SQLite's rollback-journal defaults untouched
+app.config['SQLITE_PROFILE'] = os.environ.get('SQLITE_PROFILE', 'tuned').lower()
+app.config['SQLITE_PRAGMAS'] = {
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '5000')),
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+    'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', '-65536')),  # negative = KiB
+    'temp_store': os.environ.get('SQLITE_TEMP_STORE', 'MEMORY'),
+}
+
+
+def build_engine_options(uri):
+    """SQLAlchemy engine options per backend: lock timeout for SQLite, pool sizing for Postgres"""
+    try:
+        url = make_url(uri)
+    except Exception:
+        return {}
+
+    if url.drivername.startswith('sqlite'):
+        # sqlite3's own lock wait, in seconds; mirrors the busy_timeout pragma
+        options = {'connect_args': {'timeout': app.config['SQLITE_PRAGMAS']['busy_timeout'] / 1000}}
+        in_memory = not url.database or url.database == ':memory:'
+        if app.config['METRICS_ENABLED'] and not in_memory:
+            options['poolclass'] = TimedQueuePool
+        return options
+
+    options = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', '5')),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', '10')),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', '30')),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', '1800')),
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true',
+    }
+    if app.config['METRICS_ENABLED']:
+        options['poolclass'] = TimedQueuePool
+    return options
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that reports how long each checkout waited for a connection"""
+    metrics_role = 'primary'
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            observe_pool_wait(self.metrics_role, time.perf_counter() - started)
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record=None, read_only=False):
+    """Connect-event hook applying SQLITE_PRAGMAS to a fresh sqlite3 connection"""
+    pragmas = app.config['SQLITE_PRAGMAS']
+    cursor = dbapi_connection.cursor()
+    try:
+        if not read_only:
+            # Journal mode and durability are properties of the writer; mode=ro connections share the WAL
+            cursor.execute(f"PRAGMA journal_mode={pragmas['journal_mode']}")
+            cursor.execute(f"PRAGMA synchronous={pragmas['synchronous']}")
+        cursor.execute(f"PRAGMA busy_timeout={int(pragmas['busy_timeout'])}")
+        cursor.execute(f"PRAGMA mmap_size={int(pragmas['mmap_size'])}")
+        cursor.execute(f"PRAGMA cache_size={int(pragmas['cache_size'])}")
+        cursor.execute(f"PRAGMA temp_store={pragmas['temp_store']}")
+    finally:
+        cursor.close()
+
+
+def apply_sqlite_read_pragmas(dbapi_connection, connection_record=None):
+    apply_sqlite_pragmas(dbapi_connection, connection_record, read_only=True)
+
+
+def configure_engine(engine, read_only=False):
+    """Attach connection hooks; must run before the engine opens its first connection"""
+    if engine.dialect.name == 'sqlite' and app.config['SQLITE_PROFILE'] == 'tuned':
+        event.listen(engine, 'connect', apply_sqlite_read_pragmas if read_only else apply_sqlite_pragmas)
+    if read_only:
+        event.listen(engine, 'before_cursor_execute', guard_read_only_statement)
+    if app.config['PERF_INSTRUMENTATION']:
+        attach_perf_listeners(engine)
+    if app.config['METRICS_ENABLED']:
+        attach_pool_metrics(engine, 'read' if read_only else 'primary')
+
+
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = build_engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+
+# Read routing: views marked @read_only_route run their SELECTs on a separate engine bound to
+# READ_DATABASE_URL (e.g. a Postgres replica) or, for SQLite, a mode=ro connection to the same file
+app.config['READ_ROUTING'] = os.environ.get('READ_ROUTING', 'false').lower() == 'true'
+app.config['READ_DATABASE_URL'] = os.environ.get('READ_DATABASE_URL')
+
+READ_ONLY_STATEMENT_PREFIXES = ('SELECT', 'WITH', 'PRAGMA', 'SHOW', 'EXPLAIN')
+
+
+class ReadOnlyRoutingError(RuntimeError):
+    """A write statement was about to run on the read-only engine"""
+
+
+def guard_read_only_statement(conn, cursor, statement, parameters, context, executemany):
+    if not statement.lstrip().upper().startswith(READ_ONLY_STATEMENT_PREFIXES):
+        raise ReadOnlyRoutingError(f"Refusing to run write statement on read-only engine: {statement[:80]}")
+
+
+class RoutingSession(FlaskSession):
+    """Session that sends plain SELECTs from read-only routes to the read engine"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        # Flushes and DML always go to the primary; only reads issued inside a marked view are rerouted
+        if bind is None and not self._flushing and isinstance(clause, (Select, CompoundSelect)) and in_read_only_route():
+            read_engine = get_read_engine()
+            if read_engine is not None:
+                return read_engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
 
 CORS(app)
-db = SQLAlchemy(app)
+db = SQLAlchemy(app, session_options={'class_': RoutingSession})
+
+_read_engine = None
+_read_engine_lock = threading.Lock()
+
+
+def build_read_uri():
+    """READ_DATABASE_URL if set, else a read-only URI for the primary SQLite file (None when unavailable)"""
+    if app.config['READ_DATABASE_URL']:
+        return app.config['READ_DATABASE_URL']
+    url = db.engine.url
+    if url.drivername.startswith('sqlite') and url.database and url.database != ':memory:':
+        return f"sqlite:///file:{os.path.abspath(url.database)}?mode=ro&uri=true"
+    return None
+
+
+def get_read_engine():
+    """Lazily create the per-process read engine; None when routing is off or not possible"""
+    global _read_engine
+    if not app.config['READ_ROUTING']:
+        return None
+    if _read_engine is None:
+        with _read_engine_lock:
+            if _read_engine is None:
+                uri = build_read_uri()
+                if uri is None:
+                    app.config['READ_ROUTING'] = False
+                    return None
+                engine = create_engine(uri, **build_engine_options(uri))
+                configure_engine(engine, read_only=True)
+                _read_engine = engine
+    return _read_engine
+
+
+def in_read_only_route():
+    return has_app_context() and g.get('read_only_route', False)
+
+
+def read_only_route(view):
+    """Mark a view as read-only so its queries may be served by the read engine"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        g.read_only_route = True
+        return view(*args, **kwargs)
+    return wrapper
 
 # Log resolved DB info for debugging deploy environments
 def log_db_info(uri):
@@ -160,7 +401,8 @@ class SourceAuthor(db.Model):
     
     entries = db.relationship('Entry', back_populates='source_author_rel', lazy='dynamic')
     
-    def to_dict(self):
+    def to_dict(self, entry_count=None):
+        """entry_count may be passed in (see author_entry_counts) to avoid a COUNT per author"""
         return {
             'id': self.id,
             'name': self.name,
@@ -170,7 +412,7 @@ class SourceAuthor(db.Model):
             'floruit': self.floruit,
             'tlg_id': self.tlg_id,
             'notes': self.notes,
-            'entry_count': self.entries.count()
+            'entry_count': self.entries.count() if entry_count is None else entry_count
         }
 
 class Ingredient(db.Model):
@@ -237,8 +479,11 @@ class Entry(db.Model):
     translation_title = db.Column(db.Text)
     translation_content = db.Column(db.Text)
     
-    # Lemmatized index (JSON: {"lemma": [positions]})
-    lemma_index = db.Column(db.Text)
+    # Lemmatized index packed by encode_lemma_index(): lexicon ids, per-lemma counts and absolute word positions.
+    # Databases created before the lexicon still carry a lemma_index JSON column; see migrate_lemma_indices()
+    lemma_data = db.Column(db.LargeBinary)
+    # Character (start, end) of each Greek word of body_greek, flattened and packed (see build_token_offsets)
+    token_offsets = db.Column(db.LargeBinary)
     
     # Legacy location field
     location = db.Column(db.String(200))
@@ -271,12 +516,20 @@ class Entry(db.Model):
                                    backref=db.backref('entries', lazy='dynamic'))
     source_author_rel = db.relationship('SourceAuthor', back_populates='entries', lazy='joined')
     
-    def to_dict(self, include_ingredients=False):
+    def to_dict(self, include_ingredients=False, author_counts=None):
+        """Full representation; pass author_counts when serializing many entries"""
+        author = self.source_author_rel
+        if author is None:
+            author_dict = None
+        elif author_counts is None:
+            author_dict = author.to_dict()
+        else:
+            author_dict = author.to_dict(entry_count=author_counts.get(author.id, 0))
         result = {
             'id': self.id,
             'author_named': self.author_named,
             'source_author_id': self.source_author_id,
-            'source_author': self.source_author_rel.to_dict() if self.source_author_rel else None,
+            'source_author': author_dict,
             'author': self.author,
             'author_group': self.author_group,
             'book': self.book,
@@ -334,13 +587,31 @@ class Entry(db.Model):
             self.urn_raeder = f"urn:cite:alchemies:raeder:{raeder_ref}"
 
 class EditHistory(db.Model):
+    """
+    One changed field of one entry edit, stored as a delta against the previous row for the same field.
+    Every HISTORY_SNAPSHOT_EVERY rows per field (and wherever the chain breaks) a row keeps the full old
+    value as a compressed snapshot; see history_values() and replay_history().
+    """
     __tablename__ = 'edit_history'
-    
+    # Chain walks: one field's rows of one entry in id order; reverts: one editor's rows, or everyone's, in a time window
+    __table_args__ = (
+        db.Index('ix_edit_history_entry_field', 'entry_id', 'field_changed', 'id'),
+        db.Index('ix_edit_history_editor_time', 'editor_name', 'edited_at'),
+        db.Index('ix_edit_history_edited_at', 'edited_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     entry_id = db.Column(db.Integer, db.ForeignKey('entries.id'))
     field_changed = db.Column(db.String(100))
-    old_value = db.Column(db.Text)
-    new_value = db.Column(db.Text)
+    # Databases created before diff storage still carry old_value/new_value text columns; see migrate_edit_history()
+    snapshot = db.Column(db.LargeBinary)  # zlib of the full old value, keyframes only
+    delta = db.Column(db.LargeBinary)  # zlib of the JSON edit script from the old value to the new one
+    chain = db.Column(db.Integer)  # rows since the last keyframe; 0 marks a keyframe
+    old_length = db.Column(db.Integer)  # NULL when the value was None
+    new_length = db.Column(db.Integer)
+    new_crc = db.Column(db.BigInteger)  # crc32 of the new value, to notice writes that bypassed the history
+    old_preview = db.Column(db.String(200))
+    new_preview = db.Column(db.String(200))
     editor_name = db.Column(db.String(200))
     edited_at = db.Column(db.DateTime, default=datetime.utcnow)
 
@@ -394,6 +665,459 @@ class ThematicDivision(db.Model):
             result['children'] = [c.to_dict(include_children=True) for c in sorted(self.children, key=lambda x: x.sort_order or 0)]
         return result
 
+class Lemma(db.Model):
+    """Shared lexicon of lemma forms; entry lemma indices refer to these ids"""
+    __tablename__ = 'lemmas'
+
+    id = db.Column(db.Integer, primary_key=True)
+    lemma = db.Column(db.String(200), unique=True, nullable=False)
+
+class LemmaPosting(db.Model):
+    """Inverted lemma index row: where one lemma occurs in one entry (mirrors Entry.lemma_data)"""
+    __tablename__ = 'lemma_postings'
+
+    # (lemma_id, entry_id) primary key keeps each lemma's postings contiguous and entry-ordered
+    lemma_id = db.Column(db.Integer, db.ForeignKey('lemmas.id'), primary_key=True)
+    entry_id = db.Column(db.Integer, db.ForeignKey('entries.id'), primary_key=True, index=True)
+    positions = db.Column(db.LargeBinary, nullable=False)  # typecode byte + packed ascending positions
+
+class CorpusRevision(db.Model):
+    """Single-row counter bumped by every transaction that changes entries, their authors or ingredients"""
+    __tablename__ = 'corpus_revision'
+
+    id = db.Column(db.Integer, primary_key=True)
+    revision = db.Column(db.Integer, nullable=False, default=0)
+    # Oldest revision the change log still covers; clients synced before it must reload
+    log_floor = db.Column(db.Integer, default=0)
+
+class ChangeLog(db.Model):
+    """Append-only record of what each corpus revision changed, served by /api/changes"""
+    __tablename__ = 'change_log'
+    __table_args__ = (db.Index('ix_change_log_entity', 'entity', 'entity_id'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    revision = db.Column(db.Integer, nullable=False, index=True)
+    entity = db.Column(db.String(20), nullable=False)  # entry, source_author, ingredient, corpus
+    entity_id = db.Column(db.Integer)  # NULL for corpus-wide changes
+    action = db.Column(db.String(10), nullable=False)  # create, update, delete; import, reset for corpus
+    fields = db.Column(db.Text)  # JSON list of changed fields, updates only
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def to_dict(self):
+        return {
+            'revision': self.revision,
+            'entity': self.entity,
+            'entity_id': self.entity_id,
+            'action': self.action,
+            'fields': json.loads(self.fields) if self.fields else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+class MaintenanceJob(db.Model):
+    """Long-running maintenance task executed by the background job runner"""
+    __tablename__ = 'jobs'
+
+    id = db.Column(db.String(32), primary_key=True)
+    job_type = db.Column(db.String(50), nullable=False)  # reindex-lemmas, generate-all-urns, import, seed-thematic, reset, compact-changes
+    # Holds job_type while queued/running and NULL afterwards; the unique constraint
+    # guarantees a single active job per type across all gunicorn workers
+    active_key = db.Column(db.String(50), unique=True)
+    status = db.Column(db.String(20), default='queued')  # queued, running, succeeded, failed, cancelled
+    progress = db.Column(db.Integer, default=0)
+    total = db.Column(db.Integer)
+    message = db.Column(db.Text)
+    params = db.Column(db.Text)  # JSON
+    result = db.Column(db.Text)  # JSON
+    error = db.Column(db.Text)
+    cancel_requested = db.Column(db.Boolean, default=False)
+    worker_pid = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'job_type': self.job_type,
+            'status': self.status,
+            'progress': self.progress or 0,
+            'total': self.total,
+            'message': self.message,
+            'params': json.loads(self.params) if self.params else {},
+            'result': json.loads(self.result) if self.result else None,
+            'error': self.error,
+            'cancel_requested': bool(self.cancel_requested),
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'heartbeat_at': self.heartbeat_at.isoformat() if self.heartbeat_at else None
+        }
+
+# =============================================================================
+# CORPUS REVISION
+# =============================================================================
+
+# Models whose changes clients holding a rendered entry list need to hear about, by change log entity
+CORPUS_ENTITIES = {Entry: 'entry', SourceAuthor: 'source_author', Ingredient: 'ingredient'}
+# Derived or bookkeeping columns; changing only these bumps the revision without a change log row
+UNLOGGED_FIELDS = frozenset({'lemma_data', 'token_offsets', 'created_at', 'updated_at'})
+
+
+def ensure_corpus_revision():
+    """Create the revision row, tolerating a concurrent worker creating it first"""
+    dialect = db.engine.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        insert = sqlite_insert if dialect == 'sqlite' else postgresql_insert
+        db.session.execute(insert(CorpusRevision).values(id=1, revision=0, log_floor=0)
+                           .on_conflict_do_nothing(index_elements=['id']))
+    elif db.session.get(CorpusRevision, 1) is None:
+        db.session.add(CorpusRevision(id=1, revision=0, log_floor=0))
+    # Databases older than the change log have no history for their existing revisions
+    table = CorpusRevision.__table__
+    db.session.execute(table.update().where(table.c.log_floor.is_(None)).values(log_floor=table.c.revision))
+    db.session.commit()
+
+
+def mark_corpus_changed(session):
+    """
+    Bump the corpus revision once per transaction and return the new value. The
+    increment runs in SQL, so concurrent writers serialize on the row and each commit
+    gets its own revision. Raises if the revision row has not been created yet, since
+    change_log rows need a revision.
+    """
+    if 'corpus_revision' not in session.info:
+        table = CorpusRevision.__table__
+        connection = session.connection()
+        result = connection.execute(table.update().where(table.c.id == 1).values(revision=table.c.revision + 1))
+        if result.rowcount == 0:
+            raise RuntimeError("corpus_revision row is missing; ensure_corpus_revision() must run before corpus writes")
+        session.info['corpus_revision'] = connection.execute(
+            db.select(table.c.revision).where(table.c.id == 1)
+        ).scalar()
+    return session.info['corpus_revision']
+
+
+def log_bulk_corpus_change(session, action):
+    """Core bulk writes skip the flush hook; bump the revision and log one corpus-wide row instead"""
+    revision = mark_corpus_changed(session)
+    session.connection().execute(ChangeLog.__table__.insert().values(revision=revision, entity='corpus', action=action))
+    return revision
+
+
+def changed_fields(obj):
+    """Logged columns (and an entry's ingredients) whose value this flush changed"""
+    state = inspect(obj)
+    keys = [attr.key for attr in state.mapper.column_attrs]
+    if isinstance(obj, Entry):
+        keys.append('ingredients')
+    return [key for key in keys if key not in UNLOGGED_FIELDS and state.attrs[key].history.has_changes()]
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def log_corpus_changes(session, flush_context):
+    """Bump the revision and append a change log row per entry, author or ingredient this flush wrote"""
+    changed = False
+    rows = []
+    for action, objects in (('create', session.new), ('delete', session.deleted), ('update', session.dirty)):
+        for obj in objects:
+            entity = CORPUS_ENTITIES.get(type(obj))
+            if entity is None or (action == 'update' and not session.is_modified(obj)):
+                continue
+            changed = True
+            fields = changed_fields(obj) if action == 'update' else None
+            if action == 'update' and not fields:
+                continue
+            rows.append({'entity': entity, 'entity_id': obj.id, 'action': action,
+                         'fields': json.dumps(fields) if fields else None})
+    if changed:
+        revision = mark_corpus_changed(session)
+        if rows:
+            session.connection().execute(ChangeLog.__table__.insert(), [dict(row, revision=revision) for row in rows])
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def publish_corpus_revision(session):
+    revision = session.info.pop('corpus_revision', None)
+    if revision is not None and has_app_context():
+        g.corpus_revision = revision
+        every = app.config['CHANGE_LOG_COMPACT_EVERY']
+        if every and revision % every == 0:
+            enqueue_job('compact-changes', job_compact_change_log)
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def discard_corpus_revision(session):
+    session.info.pop('corpus_revision', None)
+
+
+def corpus_revision():
+    """The revision this request committed, else the current one"""
+    if 'corpus_revision' in g:
+        return g.corpus_revision
+    revision = db.session.execute(db.select(CorpusRevision.revision).where(CorpusRevision.id == 1)).scalar()
+    return revision or 0
+
+
+def with_corpus_revision(response, revision=None):
+    """Tell the client which corpus revision a response reflects (X-Corpus-Revision)"""
+    response.headers['X-Corpus-Revision'] = str(corpus_revision() if revision is None else revision)
+    return response
+
+# =============================================================================
+# EDIT HISTORY
+# =============================================================================
+
+# Characters of each value kept in the row for history listings
+HISTORY_PREVIEW_CHARS = 200
+# Rows per field between full snapshots; bounds how many deltas rebuilding one version replays
+HISTORY_SNAPSHOT_EVERY = 20
+# Diffs align words and the whitespace between them, so an edit script stays readable and short
+HISTORY_TOKEN_RE = re.compile(r'\s+|\S+')
+# Past this many token pairs in the changed span the whole span is replaced instead of diffed
+HISTORY_DIFF_MAX_WORK = 4_000_000
+# Rows per page of /api/history when no limit is given
+HISTORY_PAGE_SIZE = 50
+
+
+def history_text(value):
+    """Text form a field value is kept in the history; None stays None"""
+    return None if value is None else str(value)
+
+
+def history_state(text):
+    """(length, crc32) of a history value, compared against the previous row's new value"""
+    if text is None:
+        return None, None
+    return len(text), zlib.crc32(text.encode('utf-8'))
+
+
+def diff_text(old, new):
+    """
+    Edit script turning old into new: an int n > 0 copies n characters of old, n < 0 skips -n of them,
+    a string is inserted. Whatever of old the script does not reach is copied at the end.
+    """
+    prefix = len(os.path.commonprefix([old, new]))
+    suffix = len(os.path.commonprefix([old[prefix:][::-1], new[prefix:][::-1]]))
+    old_middle = old[prefix:len(old) - suffix]
+    new_middle = new[prefix:len(new) - suffix]
+    script = [prefix] if prefix else []
+    a = HISTORY_TOKEN_RE.findall(old_middle)
+    b = HISTORY_TOKEN_RE.findall(new_middle)
+    if len(a) * len(b) > HISTORY_DIFF_MAX_WORK:
+        opcodes = [('replace', 0, len(a), 0, len(b))]
+    else:
+        opcodes = SequenceMatcher(None, a, b, autojunk=False).get_opcodes()
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == 'equal':
+            ops = [sum(map(len, a[i1:i2]))]
+        else:
+            ops = [-sum(map(len, a[i1:i2])), ''.join(b[j1:j2])]
+        for op in ops:
+            if not op:
+                continue
+            # Merge with the previous op of the same kind and sign
+            if script and type(op) is type(script[-1]) and (isinstance(op, str) or (op > 0) == (script[-1] > 0)):
+                script[-1] += op
+            else:
+                script.append(op)
+    # The common suffix is copied implicitly
+    while script and isinstance(script[-1], int) and script[-1] > 0:
+        script.pop()
+    return script
+
+
+def apply_diff(old, script):
+    """Inverse of diff_text: the new text from the old one and the edit script"""
+    parts = []
+    position = 0
+    for op in script:
+        if isinstance(op, str):
+            parts.append(op)
+        elif op > 0:
+            parts.append(old[position:position + op])
+            position += op
+        else:
+            position -= op
+    parts.append(old[position:])
+    return ''.join(parts)
+
+
+def pack_history_text(text):
+    return zlib.compress(text.encode('utf-8'))
+
+
+def unpack_history_text(blob):
+    return zlib.decompress(blob).decode('utf-8')
+
+
+def history_values(old, new, previous=None):
+    """
+    Storage columns of a history row changing a field from old to new (texts or None). previous is the
+    (chain, new_length, new_crc) of the field's latest row, if any; the row is a keyframe carrying a
+    snapshot of old when there is none, the chain is long enough, or old is not what previous left behind.
+    """
+    old_length, old_crc = history_state(old)
+    new_length, new_crc = history_state(new)
+    keyframe = (previous is None or previous[0] + 1 >= HISTORY_SNAPSHOT_EVERY
+                or (previous[1], previous[2]) != (old_length, old_crc))
+    delta = None
+    if new is not None:
+        delta = zlib.compress(json.dumps(diff_text(old or '', new), ensure_ascii=False,
+                                         separators=(',', ':')).encode('utf-8'))
+    return {
+        'snapshot': pack_history_text(old) if keyframe and old is not None else None,
+        'delta': delta,
+        'chain': 0 if keyframe else previous[0] + 1,
+        'old_length': old_length,
+        'new_length': new_length,
+        'new_crc': new_crc,
+        'old_preview': old[:HISTORY_PREVIEW_CHARS] if old is not None else None,
+        'new_preview': new[:HISTORY_PREVIEW_CHARS] if new is not None else None,
+    }
+
+
+def latest_history_states(entry_ids, fields=None):
+    """{(entry_id, field): (chain, new_length, new_crc)} of the newest history row per entry field"""
+    latest = db.select(db.func.max(EditHistory.id)).where(EditHistory.entry_id.in_(entry_ids)) \
+        .group_by(EditHistory.entry_id, EditHistory.field_changed)
+    if fields is not None:
+        latest = latest.where(EditHistory.field_changed.in_(fields))
+    rows = db.session.execute(
+        db.select(EditHistory.entry_id, EditHistory.field_changed, EditHistory.chain,
+                  EditHistory.new_length, EditHistory.new_crc)
+        .where(EditHistory.id.in_(latest))
+    ).all()
+    return {(entry_id, field): (chain, length, crc) for entry_id, field, chain, length, crc in rows}
+
+
+def replay_history(rows):
+    """
+    (id, old, new) for each of one entry field's history rows, given as (id, chain, snapshot, delta,
+    new_length) in id order starting at a keyframe.
+    """
+    value = None
+    for history_id, chain, snapshot, delta, new_length in rows:
+        if chain == 0:
+            value = unpack_history_text(snapshot) if snapshot is not None else None
+        new = None
+        if new_length is not None:
+            new = apply_diff(value or '', json.loads(zlib.decompress(delta)))
+        yield history_id, value, new
+        value = new
+
+
+def history_chain(entry_id, field, history_id):
+    """Replay rows of one entry field from the keyframe at or before history_id up to it"""
+    keyframe = db.select(db.func.max(EditHistory.id)).where(
+        EditHistory.entry_id == entry_id, EditHistory.field_changed == field,
+        EditHistory.chain == 0, EditHistory.id <= history_id,
+    ).scalar_subquery()
+    return db.session.execute(
+        db.select(EditHistory.id, EditHistory.chain, EditHistory.snapshot, EditHistory.delta, EditHistory.new_length)
+        .where(EditHistory.entry_id == entry_id, EditHistory.field_changed == field,
+               EditHistory.id >= keyframe, EditHistory.id <= history_id)
+        .order_by(EditHistory.id)
+    ).all()
+
+
+def history_preview(preview, length):
+    """SQL expression for a listed value: its stored preview, with '...' when the value was longer"""
+    return db.case((length > HISTORY_PREVIEW_CHARS, preview + '...'), else_=preview)
+
+
+# Entry columns a revert may restore; ids and bookkeeping columns are never put back from the history
+HISTORY_REVERTIBLE_FIELDS = frozenset(column.name for column in Entry.__table__.columns) - UNLOGGED_FIELDS - {'id'}
+
+
+def parse_history_time(value):
+    """Naive UTC datetime, as edited_at is stored, from an ISO 8601 string; ValueError if malformed"""
+    moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def history_value(field, text):
+    """Entry attribute value for a field's history text, the inverse of history_text"""
+    if text is None:
+        return None
+    python_type = Entry.__table__.columns[field].type.python_type
+    try:
+        if python_type is bool:
+            return text == 'True'
+        if python_type is datetime:
+            return datetime.fromisoformat(text)
+        if python_type in (int, float):
+            return python_type(text)
+    except ValueError:
+        pass  # SQLite keeps whatever it was given, so a column may have held text of another type
+    return text
+
+
+def history_spans(since, until=None, editor=None, entry_ids=None):
+    """
+    {(entry_id, field): (first_id, last_id)} of the history rows of revertible fields edited after since
+    (and at or before until), limited to one editor's rows or to some entries. Editor and time bounds are
+    answered from the edited_at indexes, entry ids from the entry/field one. The rows are folded into
+    spans here rather than grouped in SQL, which would tempt SQLite into walking the entry/field index.
+    """
+    query = db.select(EditHistory.entry_id, EditHistory.field_changed, EditHistory.id) \
+        .where(EditHistory.edited_at > since, EditHistory.field_changed.in_(sorted(HISTORY_REVERTIBLE_FIELDS)))
+    if until is not None:
+        query = query.where(EditHistory.edited_at <= until)
+    if editor is not None:
+        query = query.where(EditHistory.editor_name == editor)
+    chunks = [None] if entry_ids is None else iter_chunks(sorted(set(entry_ids)), ENTRY_LOOKUP_CHUNK)
+    spans = {}
+    for chunk in chunks:
+        chunk_query = query if chunk is None else query.where(EditHistory.entry_id.in_(chunk))
+        for entry_id, field, history_id in db.session.execute(chunk_query):
+            span = spans.get((entry_id, field))
+            spans[(entry_id, field)] = (history_id, history_id) if span is None else \
+                (min(span[0], history_id), max(span[1], history_id))
+    return spans
+
+
+def reconstruct_spans(spans):
+    """
+    {(entry_id, field): (before, after)}: each span's value before its first row and after its last one.
+    Only the spans' entries' history ids are scanned, and only the rows from each span's keyframe through
+    its last row are read in full and replayed.
+    """
+    replayed = defaultdict(list)
+    entry_ids = sorted({entry_id for entry_id, _ in spans})
+    for chunk in iter_chunks(entry_ids, ENTRY_LOOKUP_CHUNK):
+        rows = db.session.execute(
+            db.select(EditHistory.id, EditHistory.entry_id, EditHistory.field_changed, EditHistory.chain)
+            .where(EditHistory.entry_id.in_(chunk)).order_by(EditHistory.id)
+        )
+        for history_id, entry_id, field, chain in rows:
+            span = spans.get((entry_id, field))
+            if span is None or history_id > span[1]:
+                continue
+            if chain == 0 and history_id <= span[0]:
+                # A later keyframe before the span makes everything replayed so far unnecessary
+                replayed[(entry_id, field)] = []
+            replayed[(entry_id, field)].append(history_id)
+    stored = {}
+    for chunk in iter_chunks(sorted(itertools.chain.from_iterable(replayed.values())), ENTRY_LOOKUP_CHUNK):
+        for row in db.session.execute(
+            db.select(EditHistory.id, EditHistory.chain, EditHistory.snapshot, EditHistory.delta,
+                      EditHistory.new_length).where(EditHistory.id.in_(chunk))
+        ):
+            stored[row.id] = row
+    values = {}
+    for key, history_ids in replayed.items():
+        first_id = spans[key][0]
+        before = after = None
+        for history_id, old, new in replay_history(stored[history_id] for history_id in history_ids):
+            if history_id == first_id:
+                before = old
+            after = new
+        values[key] = (before, after)
+    return values
+
 # =============================================================================
 # GREEK LEMMATIZATION UTILITIES
 # =============================================================================
@@ -414,13 +1138,13 @@ def normalize_greek(text):
     # Normalize back and lowercase
     return unicodedata.normalize('NFC', text).lower()
 
+GREEK_WORD_RE = re.compile(r'[\u0370-\u03FF\u1F00-\u1FFF]+')
+
 def extract_greek_words(text):
     """Extract Greek words from text"""
     if not text:
         return []
-    # Match Greek Unicode ranges
-    pattern = r'[\u0370-\u03FF\u1F00-\u1FFF]+'
-    return re.findall(pattern, text)
+    return GREEK_WORD_RE.findall(text)
 
 # Simple Greek lemmatization rules (expandable)
 # Maps normalized endings to possible lemma endings
@@ -449,10 +1173,11 @@ GREEK_STOPWORDS = {
     'ο','η','το','οι','αι','τα','του','των','τη','της','τασ','τοις','τασ','τους','τας','τον','την','τω','τῳ','τῳ','τῃ','και','δε','γαρ','μεν','δε','εν','εις','εκ','εξ','ως','ησαν','ην','εστι','εστιν','ου','ουκ','μη','ουδε','ουτε','μητε','αλλα','αλλ'
 }
 
+@functools.lru_cache(maxsize=65536)
 def simple_lemmatize(word):
     """
     Simple rule-based Greek lemmatization.
-    Returns a list of possible lemma forms.
+    Returns a tuple of possible lemma forms (cached: the corpus vocabulary is small).
     For production, integrate CLTK or Morpheus.
     """
     normalized = normalize_greek(word)
@@ -463,50 +1188,1339 @@ def simple_lemmatize(word):
             lemma = re.sub(pattern, replacement, normalized)
             lemmas.add(lemma)
     
-    return list(lemmas)
+    return tuple(lemmas)
+
+def lemma_positions(text):
+    """Map each lemma form of a Greek text to the word positions it occurs at"""
+    index = defaultdict(list)
+    for pos, word in enumerate(extract_greek_words(text)):
+        for lemma in simple_lemmatize(word):
+            index[lemma].append(pos)
+    return index
+
+# Packed lemma index layout (little-endian):
+#   header     version u8, array typecodes 3s (ids, counts, positions), lemma count u32
+#   ids        lexicon ids, ascending
+#   counts     number of positions per lemma
+#   positions  each lemma's ascending word positions, concatenated in id order
+# Every array uses the narrowest of B/H/I that fits its largest value and decodes with
+# array.frombytes(). Positions stay absolute: each lemma's first position would set the
+# width of a delta array anyway, and slicing one decoded list beats re-summing gaps.
+LEMMA_INDEX_HEADER = struct.Struct('<B3sI')
+LEMMA_INDEX_VERSION = 1
+LEMMA_ARRAY_ITEMSIZE = {code: array(code).itemsize for code in 'BHI'}
+
+# Lemma forms per IN (...) when resolving lexicon ids; stays under SQLite's variable limit
+LEXICON_LOOKUP_CHUNK = 900
+
+
+def packed_array(values):
+    top = max(values, default=0)
+    packed = array('B' if top < 0x100 else 'H' if top < 0x10000 else 'I', values)
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return packed
+
+def unpacked_array(typecode, data):
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+def pack_lemma_postings(postings):
+    """Pack {lemma_id: ascending positions} into the binary lemma index format"""
+    ids = sorted(postings)
+    positions = [pos for lemma_id in ids for pos in postings[lemma_id]]
+    arrays = (packed_array(ids), packed_array([len(postings[i]) for i in ids]), packed_array(positions))
+    typecodes = ''.join(a.typecode for a in arrays).encode('ascii')
+    return LEMMA_INDEX_HEADER.pack(LEMMA_INDEX_VERSION, typecodes, len(ids)) + b''.join(a.tobytes() for a in arrays)
+
+def read_lemma_index_header(blob):
+    version, typecodes, count = LEMMA_INDEX_HEADER.unpack_from(blob)
+    if version != LEMMA_INDEX_VERSION:
+        raise ValueError(f"Unsupported lemma index version {version}")
+    return typecodes.decode('ascii'), count
+
+def lemma_index_counts(blob):
+    """(lexicon ids, occurrences of each) in a packed lemma index, without decoding any positions"""
+    (id_code, count_code, _), count = read_lemma_index_header(blob)
+    view = memoryview(blob)
+    counts_start = LEMMA_INDEX_HEADER.size + count * LEMMA_ARRAY_ITEMSIZE[id_code]
+    return (unpacked_array(id_code, view[LEMMA_INDEX_HEADER.size:counts_start]),
+            unpacked_array(count_code, view[counts_start:counts_start + count * LEMMA_ARRAY_ITEMSIZE[count_code]]))
+
+def decode_lemma_postings(blob):
+    """Unpack a lemma index into {lemma_id: [positions]}"""
+    (id_code, count_code, position_code), count = read_lemma_index_header(blob)
+    view = memoryview(blob)
+    counts_start = LEMMA_INDEX_HEADER.size + count * LEMMA_ARRAY_ITEMSIZE[id_code]
+    positions_start = counts_start + count * LEMMA_ARRAY_ITEMSIZE[count_code]
+    ids = unpacked_array(id_code, view[LEMMA_INDEX_HEADER.size:counts_start])
+    counts = unpacked_array(count_code, view[counts_start:positions_start])
+    positions = unpacked_array(position_code, view[positions_start:]).tolist()
+    postings = {}
+    start = 0
+    for lemma_id, n in zip(ids, counts):
+        postings[lemma_id] = positions[start:start + n]
+        start += n
+    return postings
+
+# Process-wide lexicon cache. Ids first seen inside a write transaction wait in
+# session.info['pending_lemmas'] until it commits, so a rolled-back insert never
+# leaves an id in the cache that the database could later hand to another lemma.
+_lexicon_ids = {}
+_lexicon_names = {}
+_lexicon_lock = threading.Lock()
+
+
+def remember_lemmas(pairs):
+    with _lexicon_lock:
+        for lemma, lemma_id in pairs:
+            _lexicon_ids[lemma] = lemma_id
+            _lexicon_names[lemma_id] = lemma
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def commit_pending_lemmas(session):
+    pending = session.info.pop('pending_lemmas', None)
+    if pending:
+        remember_lemmas(pending.items())
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def discard_pending_lemmas(session):
+    session.info.pop('pending_lemmas', None)
+
+
+def fetch_lemma_ids(lemmas):
+    found = {}
+    for start in range(0, len(lemmas), LEXICON_LOOKUP_CHUNK):
+        chunk = lemmas[start:start + LEXICON_LOOKUP_CHUNK]
+        found.update(db.session.execute(db.select(Lemma.lemma, Lemma.id).where(Lemma.lemma.in_(chunk))).all())
+    return found
+
+def insert_lemmas(lemmas):
+    """Add lemma forms to the lexicon, tolerating forms a concurrent writer just added"""
+    rows = [{'lemma': lemma} for lemma in lemmas]
+    dialect = db.engine.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        insert = sqlite_insert if dialect == 'sqlite' else postgresql_insert
+        db.session.execute(insert(Lemma).on_conflict_do_nothing(index_elements=['lemma']), rows)
+    else:
+        db.session.execute(db.insert(Lemma), rows)
+
+def lemma_ids(lemmas, create=False):
+    """
+    Map lemma forms to lexicon ids. Forms not in the lexicon are left out,
+    or added to it in the current transaction when create is set.
+    """
+    pending = db.session.info.get('pending_lemmas', {})
+    found = {}
+    missing = []
+    for lemma in lemmas:
+        lemma_id = _lexicon_ids.get(lemma) or pending.get(lemma)
+        if lemma_id is None:
+            missing.append(lemma)
+        else:
+            found[lemma] = lemma_id
+    record_cache_lookup('lexicon', True, len(found))
+    record_cache_lookup('lexicon', False, len(missing))
+    if missing:
+        committed = fetch_lemma_ids(missing)
+        remember_lemmas(committed.items())
+        found.update(committed)
+        missing = [lemma for lemma in missing if lemma not in committed]
+    if missing and create:
+        insert_lemmas(missing)
+        created = fetch_lemma_ids(missing)
+        db.session.info.setdefault('pending_lemmas', {}).update(created)
+        found.update(created)
+    return found
+
+def lemma_names(ids):
+    """Map lexicon ids back to their lemma forms"""
+    pending = {lemma_id: lemma for lemma, lemma_id in db.session.info.get('pending_lemmas', {}).items()}
+    names = {}
+    missing = []
+    for lemma_id in ids:
+        name = _lexicon_names.get(lemma_id) or pending.get(lemma_id)
+        if name is None:
+            missing.append(lemma_id)
+        else:
+            names[lemma_id] = name
+    fetched = {}
+    for start in range(0, len(missing), LEXICON_LOOKUP_CHUNK):
+        chunk = missing[start:start + LEXICON_LOOKUP_CHUNK]
+        fetched.update(db.session.execute(db.select(Lemma.id, Lemma.lemma).where(Lemma.id.in_(chunk))).all())
+    remember_lemmas((lemma, lemma_id) for lemma_id, lemma in fetched.items())
+    names.update(fetched)
+    return names
+
+def encode_lemma_index(index):
+    """Pack {lemma: [positions]} for storage, adding unseen lemma forms to the lexicon"""
+    if not index:
+        return None
+    ids = lemma_ids(list(index), create=True)
+    return pack_lemma_postings({ids[lemma]: sorted(positions) for lemma, positions in index.items()})
+
+def decode_lemma_index(blob):
+    """Inverse of encode_lemma_index: {lemma: [positions]}"""
+    if not blob:
+        return {}
+    postings = decode_lemma_postings(blob)
+    names = lemma_names(list(postings))
+    return {names[lemma_id]: positions for lemma_id, positions in postings.items() if lemma_id in names}
 
 def build_lemma_index(text):
     """
     Build a lemma index for Greek text.
-    Returns JSON: {"lemma": [word_positions]}
+    Returns the packed index for Entry.lemma_data, or None when there are no Greek words.
     """
-    words = extract_greek_words(text)
-    index = defaultdict(list)
-    
-    for pos, word in enumerate(words):
-        for lemma in simple_lemmatize(word):
-            index[lemma].append(pos)
-    
-    return json.dumps(index, ensure_ascii=False)
+    return encode_lemma_index(lemma_positions(text))
 
-def search_with_lemma(query, entries):
+def build_token_offsets(text):
     """
-    Search entries using lemmatized matching.
-    Returns entries where any lemma form of query appears.
+    Pack the character span of every word position in the lemma index, as a flat
+    start, end, start, end, ... array, so hits map back to the text without re-tokenizing.
     """
+    if text is None:
+        return None
+    return pack_positions([offset for match in GREEK_WORD_RE.finditer(text) for offset in match.span()])
+
+def lemma_query_forms(query):
+    """All lemma forms of the Greek words in a search query"""
     query_lemmas = set()
     for word in extract_greek_words(query):
         query_lemmas.update(simple_lemmatize(word))
-    
-    results = []
-    for entry in entries:
-        if not entry.lemma_index:
+    return query_lemmas
+
+# =============================================================================
+# POSITIONAL LEMMA SEARCH
+# =============================================================================
+
+# Query syntax for lemma_search=true (each word matches any of its inflected forms):
+#   ἔλαιον                     the word
+#   "ἔλαιον παλαιόν"            the words in sequence
+#   ἔλαιον NEAR/5 ὕδωρ          both within 5 words of each other, either order
+#   a AND b, a OR b, a NOT b   boolean combinations, grouped with parentheses
+# Terms without an operator between them are ORed, as lemma search always did.
+# Binding, tightest first: NEAR, NOT, AND, OR.
+LEMMA_QUERY_TOKEN_RE = re.compile(
+    r'"([^"]*)"|(\()|(\))|NEAR/(\d+)|\b(AND|OR|NOT)\b|([\u0370-\u03FF\u1F00-\u1FFF]+)'
+)
+
+
+class LemmaQueryError(ValueError):
+    """Malformed lemma search query"""
+
+
+def tokenize_lemma_query(text):
+    if text.count('"') % 2:
+        raise LemmaQueryError('Unbalanced quote in search')
+    tokens = []
+    for match in LEMMA_QUERY_TOKEN_RE.finditer(text):
+        phrase, open_paren, close_paren, near, operator, word = match.groups()
+        if phrase is not None:
+            words = extract_greek_words(phrase)
+            if words:
+                tokens.append(('phrase', words))
+        elif open_paren or close_paren:
+            tokens.append((open_paren or close_paren, None))
+        elif near is not None:
+            if int(near) < 1:
+                raise LemmaQueryError('NEAR distance must be at least 1')
+            tokens.append(('near', int(near)))
+        elif operator:
+            tokens.append((operator, None))
+        else:
+            tokens.append(('phrase', [word]))
+    return tokens
+
+
+class LemmaQueryParser:
+    """
+    Recursive-descent parser producing tuples:
+    ('phrase', words), ('near', k, left, right), ('and', include, exclude), ('or', children)
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def take(self):
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def parse(self):
+        node = self.parse_or()
+        if self.peek() is not None:
+            raise LemmaQueryError("Unmatched ')' in search")
+        return node
+
+    def parse_or(self):
+        children = [self.parse_and()]
+        while self.peek() not in (None, ')'):
+            if self.peek() == 'OR':
+                self.take()
+            children.append(self.parse_and())
+        return children[0] if len(children) == 1 else ('or', children)
+
+    def parse_and(self):
+        include, exclude = [], []
+        while True:
+            if self.peek() == 'NOT':
+                self.take()
+                exclude.append(self.parse_near())
+            else:
+                include.append(self.parse_near())
+            if self.peek() == 'AND':
+                self.take()
+            elif self.peek() != 'NOT':  # "a NOT b" reads as "a AND NOT b"
+                break
+        if not include:
+            raise LemmaQueryError('NOT needs a term to exclude from')
+        return include[0] if len(include) == 1 and not exclude else ('and', include, exclude)
+
+    def parse_near(self):
+        node = self.parse_primary()
+        while self.peek() == 'near':
+            distance = self.take()[1]
+            node = ('near', distance, node, self.parse_primary())
+        return node
+
+    def parse_primary(self):
+        kind = self.peek()
+        if kind == 'phrase':
+            return self.take()
+        if kind == '(':
+            self.take()
+            node = self.parse_or()
+            if self.peek() != ')':
+                raise LemmaQueryError("Missing ')' in search")
+            self.take()
+            return node
+        raise LemmaQueryError('Expected a Greek word, "phrase" or ( in search')
+
+
+def lemma_query_words(node, excluded=True):
+    """Words of a parsed query; excluded=False leaves out the words under NOT"""
+    if node[0] == 'phrase':
+        return set(node[1])
+    if node[0] == 'near':
+        return lemma_query_words(node[2], excluded) | lemma_query_words(node[3], excluded)
+    if node[0] == 'and':
+        children = node[1] + node[2] if excluded else node[1]
+    else:
+        children = node[1]
+    return set().union(*(lemma_query_words(child, excluded) for child in children))
+
+
+class PostingList:
+    """Entry-ordered matches, each with its (start, end) word spans; skip pointers every ~sqrt(n) entries"""
+    __slots__ = ('ids', 'spans', 'step')
+
+    def __init__(self, ids, spans):
+        self.ids = ids
+        self.spans = spans
+        self.step = max(1, int(len(ids) ** 0.5))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def seek(self, i, target):
+        """First index at or after i whose entry id is >= target"""
+        ids, step, end = self.ids, self.step, len(self.ids)
+        while i + step < end and ids[i + step] <= target:
+            i += step
+        return bisect.bisect_left(ids, target, i, min(i + step, end))
+
+
+def intersect_postings(left, right, combine):
+    """Entries in both lists whose spans survive combine(left_spans, right_spans)"""
+    ids, spans = [], []
+    i = j = 0
+    while i < len(left) and j < len(right):
+        a, b = left.ids[i], right.ids[j]
+        if a < b:
+            i = left.seek(i, b)
+        elif b < a:
+            j = right.seek(j, a)
+        else:
+            combined = combine(left.spans[i], right.spans[j])
+            if combined:
+                ids.append(a)
+                spans.append(combined)
+            i += 1
+            j += 1
+    return PostingList(ids, spans)
+
+
+def union_postings(lists):
+    if len(lists) == 1:
+        return lists[0]
+    merged = defaultdict(set)
+    for postings in lists:
+        for entry_id, spans in zip(postings.ids, postings.spans):
+            merged[entry_id].update(spans)
+    ids = sorted(merged)
+    return PostingList(ids, [sorted(merged[entry_id]) for entry_id in ids])
+
+
+def subtract_postings(left, right):
+    ids, spans = [], []
+    j = 0
+    for entry_id, entry_spans in zip(left.ids, left.spans):
+        j = right.seek(j, entry_id)
+        if j < len(right) and right.ids[j] == entry_id:
+            continue
+        ids.append(entry_id)
+        spans.append(entry_spans)
+    return PostingList(ids, spans)
+
+
+def merge_spans(left, right):
+    return sorted(set(left) | set(right))
+
+
+def follow_spans(left, right):
+    """Phrase step: left spans immediately followed by a right span"""
+    ends = dict(right)
+    return [(start, ends[end]) for start, end in left if end in ends]
+
+
+def near_spans(distance):
+    """NEAR/k step: left and right spans at most k words apart, in either order; both are kept for highlighting"""
+    def combine(left, right):
+        by_start = sorted(right)
+        starts = [start for start, _ in by_start]
+        by_end = sorted(right, key=lambda span: span[1])
+        ends = [end for _, end in by_end]
+        found = set()
+        for span in left:
+            start, end = span
+            after = by_start[bisect.bisect_left(starts, end):bisect.bisect_left(starts, end + distance)]
+            before = by_end[bisect.bisect_right(ends, start - distance):bisect.bisect_right(ends, start)]
+            if after or before:
+                found.add(span)
+                found.update(after)
+                found.update(before)
+        return sorted(found)
+    return combine
+
+
+def evaluate_lemma_query(node, terms):
+    kind = node[0]
+    if kind == 'phrase':
+        result = terms[node[1][0]]
+        for word in node[1][1:]:
+            result = intersect_postings(result, terms[word], follow_spans)
+        return result
+    if kind == 'near':
+        return intersect_postings(evaluate_lemma_query(node[2], terms), evaluate_lemma_query(node[3], terms),
+                                  near_spans(node[1]))
+    if kind == 'or':
+        return union_postings([evaluate_lemma_query(child, terms) for child in node[1]])
+    # Intersect smallest first so the skip pointers do the most skipping
+    included = sorted((evaluate_lemma_query(child, terms) for child in node[1]), key=len)
+    result = included[0]
+    for other in included[1:]:
+        result = intersect_postings(result, other, merge_spans)
+    for child in node[2]:
+        result = subtract_postings(result, evaluate_lemma_query(child, terms))
+    return result
+
+
+def pack_positions(positions):
+    packed = packed_array(positions)
+    return packed.typecode.encode('ascii') + packed.tobytes()
+
+
+def unpack_positions(blob):
+    return unpacked_array(chr(blob[0]), blob[1:])
+
+
+def load_lemma_postings(ids):
+    """{lemma_id: PostingList of single-word spans} read from the inverted index"""
+    postings = LemmaPosting.__table__
+    grouped = defaultdict(lambda: ([], []))
+    ids = sorted(ids)
+    for start in range(0, len(ids), LEXICON_LOOKUP_CHUNK):
+        rows = db.session.execute(
+            db.select(postings.c.lemma_id, postings.c.entry_id, postings.c.positions)
+            .where(postings.c.lemma_id.in_(ids[start:start + LEXICON_LOOKUP_CHUNK]))
+            .order_by(postings.c.lemma_id, postings.c.entry_id)
+        )
+        for lemma_id, entry_id, blob in rows:
+            entry_ids, spans = grouped[lemma_id]
+            entry_ids.append(entry_id)
+            spans.append([(pos, pos + 1) for pos in unpack_positions(blob)])
+    return {lemma_id: PostingList(*lists) for lemma_id, lists in grouped.items()}
+
+
+def load_query_terms(words):
+    """{word: PostingList of every entry containing any of the word's lemma forms}"""
+    forms = {word: lemma_query_forms(word) for word in words}
+    ids = lemma_ids(sorted(set().union(*forms.values())))
+    postings = load_lemma_postings(set(ids.values()))
+    return {
+        word: union_postings([postings[ids[form]] for form in word_forms if ids.get(form) in postings])
+        for word, word_forms in forms.items()
+    }
+
+
+class LemmaMatches(dict):
+    """
+    run_lemma_query result, {entry_id: [(start, end), ...]}; terms keeps the postings
+    of the words the query asks for (not those under NOT) for relevance ranking.
+    """
+    terms = None
+
+
+def run_lemma_query(text):
+    """
+    Evaluate a lemma search query against the inverted index, touching only the
+    postings of the lemmas it names.
+    Returns LemmaMatches: entry id -> matched word spans, end exclusive.
+    """
+    tree = LemmaQueryParser(tokenize_lemma_query(text)).parse()
+    terms = load_query_terms(lemma_query_words(tree))
+    result = evaluate_lemma_query(tree, terms)
+    matches = LemmaMatches(zip(result.ids, result.spans))
+    matches.terms = {word: terms[word] for word in lemma_query_words(tree, excluded=False)}
+    return matches
+
+
+def write_lemma_postings(connection, entries):
+    """Replace the postings of (entry_id, lemma_data) pairs; empty lemma_data only clears them"""
+    entries = list(entries)
+    postings = LemmaPosting.__table__
+    entry_ids = [entry_id for entry_id, _ in entries]
+    for start in range(0, len(entry_ids), LEXICON_LOOKUP_CHUNK):
+        connection.execute(postings.delete().where(postings.c.entry_id.in_(entry_ids[start:start + LEXICON_LOOKUP_CHUNK])))
+    rows = []
+    for entry_id, data in entries:
+        if not data:
             continue
         try:
-            index = json.loads(entry.lemma_index)
-            for lemma in query_lemmas:
-                if lemma in index:
-                    results.append(entry)
-                    break
-        except json.JSONDecodeError:
+            decoded = decode_lemma_postings(data)
+        except (struct.error, ValueError, KeyError):
+            app.logger.warning("Unreadable lemma index for entry %s; reindex to repair", entry_id)
             continue
-    
-    return results
+        rows.extend({'lemma_id': lemma_id, 'entry_id': entry_id, 'positions': pack_positions(positions)}
+                    for lemma_id, positions in decoded.items())
+    if rows:
+        connection.execute(postings.insert(), rows)
+
+
+@event.listens_for(RoutingSession, 'before_flush')
+def drop_deleted_lemma_postings(session, flush_context, instances):
+    # Postings reference their entry, so they must go before the entry row does
+    deleted = [obj.id for obj in session.deleted if isinstance(obj, Entry)]
+    if deleted:
+        write_lemma_postings(session.connection(), [(entry_id, None) for entry_id in deleted])
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def sync_flushed_lemma_postings(session, flush_context):
+    changed = [obj for obj in list(session.new) + list(session.dirty)
+               if isinstance(obj, Entry) and inspect(obj).attrs.lemma_data.history.has_changes()]
+    if changed:
+        write_lemma_postings(session.connection(), [(entry.id, entry.lemma_data) for entry in changed])
+
+
+def backfill_lemma_postings(batch_size=500):
+    """Index entries whose lemma_data has no postings yet (Core bulk loads, converted legacy rows)"""
+    indexed = db.select(LemmaPosting.entry_id).where(LemmaPosting.entry_id == Entry.id).exists()
+    last_id = 0
+    total = 0
+    while True:
+        rows = db.session.execute(
+            db.select(Entry.id, Entry.lemma_data)
+            .where(Entry.id > last_id, Entry.lemma_data.isnot(None), ~indexed)
+            .order_by(Entry.id).limit(batch_size)
+        ).all()
+        if not rows:
+            return total
+        write_lemma_postings(db.session, rows)
+        db.session.commit()
+        last_id = rows[-1][0]
+        total += len(rows)
+
+# =============================================================================
+# RELEVANCE RANKING
+# =============================================================================
+
+class RelevanceRanker:
+    """
+    Okapi BM25 over the lemmas of the search words, for sort_by=relevance.
+    Each query word is one term: its document frequency is the length of its posting
+    list (entries containing any of its forms), its frequency in an entry the number
+    of positions there, and entry length is word_count against the corpus average.
+    """
+
+    def __init__(self, terms):
+        self.k1 = app.config['BM25_K1']
+        self.b = app.config['BM25_B']
+        count, words = db.session.execute(
+            db.select(db.func.count(Entry.id), db.func.sum(Entry.word_count)).where(Entry.lemma_data.isnot(None))
+        ).one()
+        self.average_length = (words or 0) / count if count else 0
+        # entry id -> [(idf, term frequency)], only for entries containing a query word
+        self.frequencies = defaultdict(list)
+        for postings in terms.values():
+            df = len(postings)
+            if not df:
+                continue
+            idf = math.log(1 + (max(count, df) - df + 0.5) / (df + 0.5))
+            for entry_id, spans in zip(postings.ids, postings.spans):
+                self.frequencies[entry_id].append((idf, len(spans)))
+
+    def score(self, entry_id, length):
+        found = self.frequencies.get(entry_id)
+        if not found:
+            return 0.0
+        norm = self.k1
+        if length and self.average_length:
+            norm *= 1 - self.b + self.b * length / self.average_length
+        return sum(idf * tf * (self.k1 + 1) / (tf + norm) for idf, tf in found)
+
+    def top(self, candidates, k=None):
+        """
+        [(score, entry_id)] best first (ties by id) for (entry_id, length) candidates.
+        With k only a k-sized heap is kept: O(n log k), and nothing else is materialized.
+        """
+        scored = ((self.score(entry_id, length), -entry_id) for entry_id, length in candidates)
+        best = heapq.nlargest(k, scored) if k is not None else sorted(scored, reverse=True)
+        return [(score, -negated_id) for score, negated_id in best]
+
+
+def relevance_ranker(search, lemma_filter):
+    """
+    RelevanceRanker for a search: a lemma query reuses the postings it was evaluated
+    from, a substring search scores its Greek words. None when there is nothing to score.
+    """
+    if lemma_filter is not None:
+        terms = lemma_filter.terms
+    else:
+        terms = load_query_terms(set(extract_greek_words(search)))
+    return RelevanceRanker(terms) if terms else None
+
+# =============================================================================
+# SEARCH SNIPPETS
+# =============================================================================
+
+class SnippetBuilder:
+    """
+    Keyword-in-context snippets for the hits of one /api/entries search. Lemma hits come
+    from the query's word spans mapped through Entry.token_offsets; substring hits are
+    found case-insensitively in body_greek and translation_content.
+    """
+    columns = ('body_greek', 'translation_content', 'token_offsets')
+
+    def __init__(self, search, lemma_filter):
+        self.lemma_filter = lemma_filter
+        self.pattern = re.compile(re.escape(search), re.IGNORECASE) if lemma_filter is None else None
+        self.context = app.config['SNIPPET_CONTEXT_CHARS']
+        self.limit = app.config['SNIPPET_MAX_PER_FIELD']
+
+    def __call__(self, row):
+        if self.lemma_filter is not None:
+            return self.field_snippets('body_greek', row.body_greek, self.lemma_hits(row))
+        snippets = []
+        for field in ('body_greek', 'translation_content'):
+            text = getattr(row, field)
+            if text:
+                snippets.extend(self.field_snippets(field, text, [m.span() for m in self.pattern.finditer(text)]))
+        return snippets
+
+    def lemma_hits(self, row):
+        if not row.body_greek:
+            return []
+        if row.token_offsets is not None:
+            offsets = unpack_positions(row.token_offsets)
+        else:
+            offsets = [offset for match in GREEK_WORD_RE.finditer(row.body_greek) for offset in match.span()]
+        words = len(offsets) // 2
+        return [(offsets[2 * start], offsets[2 * end - 1]) for start, end in self.lemma_filter.get(row.id, ())
+                if end <= words]
+
+    def field_snippets(self, field, text, hits):
+        """Merge nearby hits into at most `limit` windows of `context` characters either side"""
+        merged = []
+        for start, end in sorted(hits):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        windows = []
+        for start, end in merged:
+            low, high = max(0, start - self.context), min(len(text), end + self.context)
+            if windows and low <= windows[-1][1] and high - windows[-1][0] <= 4 * self.context:
+                windows[-1][1] = max(windows[-1][1], high)
+                windows[-1][2].append((start, end))
+                continue
+            if len(windows) == self.limit:
+                break
+            windows.append([low, high, [(start, end)]])
+
+        snippets = []
+        for low, high, window_hits in windows:
+            # Pull the edges in to whitespace so no word is cut in half
+            if low > 0:
+                space = text.find(' ', low, window_hits[0][0])
+                low = space + 1 if space != -1 else low
+            if high < len(text):
+                space = text.rfind(' ', max(end for _, end in window_hits), high)
+                high = space if space != -1 else high
+            snippets.append({
+                'field': field,
+                'start': low,
+                'end': high,
+                'text': text[low:high],
+                'highlights': [[start - low, end - low] for start, end in window_hits],
+            })
+        return snippets
+
+
+def backfill_token_offsets(batch_size=500):
+    """Fill token_offsets for entries indexed before the offsets were stored"""
+    # Plain SQL so Entry.updated_at's onupdate doesn't restamp every backfilled entry
+    update_row = text('UPDATE entries SET token_offsets = :offsets WHERE id = :entry_id') \
+        .bindparams(db.bindparam('offsets', type_=db.LargeBinary))
+    last_id = 0
+    total = 0
+    while True:
+        rows = db.session.execute(
+            db.select(Entry.id, Entry.body_greek)
+            .where(Entry.id > last_id, Entry.body_greek.isnot(None), Entry.token_offsets.is_(None))
+            .order_by(Entry.id).limit(batch_size)
+        ).all()
+        if not rows:
+            return total
+        db.session.execute(update_row, [{'entry_id': entry_id, 'offsets': build_token_offsets(body)}
+                                        for entry_id, body in rows])
+        db.session.commit()
+        last_id = rows[-1][0]
+        total += len(rows)
+
+# =============================================================================
+# PERFORMANCE INSTRUMENTATION
+# =============================================================================
+
+perf_logger = logging.getLogger('oribasius.perf')
+
+PERF_HISTOGRAM_BOUNDS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class RequestPerf:
+    """Timings collected for one request"""
+    __slots__ = ('started', 'sql_count', 'sql_time', 'slowest_sql', 'slowest_sql_time',
+                 'serialize_time', 'response_bytes')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.slowest_sql = None
+        self.slowest_sql_time = 0.0
+        self.serialize_time = 0.0
+        self.response_bytes = 0
+
+
+class RouteStats:
+    """Rolling latency samples plus cumulative counters for one endpoint (per worker process)"""
+
+    def __init__(self, max_samples):
+        self.durations = deque(maxlen=max_samples)
+        self.count = 0
+        self.errors = 0
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.serialize_time = 0.0
+        self.response_bytes = 0
+        self.buckets = [0] * (len(PERF_HISTOGRAM_BOUNDS_MS) + 1)
+        self.slowest_sql = None
+        self.slowest_sql_time = 0.0
+
+    def add(self, duration_ms, status, perf):
+        self.durations.append(duration_ms)
+        self.count += 1
+        if status >= 500:
+            self.errors += 1
+        self.sql_count += perf.sql_count
+        self.sql_time += perf.sql_time
+        self.serialize_time += perf.serialize_time
+        self.response_bytes += perf.response_bytes
+        self.buckets[bisect.bisect_left(PERF_HISTOGRAM_BOUNDS_MS, duration_ms)] += 1
+        if perf.slowest_sql_time > self.slowest_sql_time:
+            self.slowest_sql_time = perf.slowest_sql_time
+            self.slowest_sql = perf.slowest_sql
+
+    def to_dict(self):
+        ordered = sorted(self.durations)
+
+        def pct(p):
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))], 2)
+
+        n = self.count or 1
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'latency_ms': {'p50': pct(50), 'p90': pct(90), 'p95': pct(95), 'p99': pct(99),
+                           'max': round(ordered[-1], 2) if ordered else None},
+            'avg_sql_count': round(self.sql_count / n, 2),
+            'avg_sql_ms': round(self.sql_time * 1000 / n, 2),
+            'avg_serialize_ms': round(self.serialize_time * 1000 / n, 2),
+            'avg_response_bytes': int(self.response_bytes / n),
+            'histogram_ms': [
+                {'le': bound, 'count': c} for bound, c in zip(PERF_HISTOGRAM_BOUNDS_MS + ('inf',), self.buckets)
+            ],
+            'slowest_sql_ms': round(self.slowest_sql_time * 1000, 2),
+            'slowest_sql': self.slowest_sql
+        }
+
+
+perf_routes = {}
+perf_routes_lock = threading.Lock()
+
+
+def current_perf():
+    if not has_app_context():
+        return None
+    return g.get('perf')
+
+
+def perf_before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('perf_query_start', []).append(time.perf_counter())
+
+
+def perf_after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['perf_query_start'].pop()
+    perf = current_perf()
+    if perf is None:
+        return
+    perf.sql_count += 1
+    perf.sql_time += elapsed
+    if elapsed > perf.slowest_sql_time:
+        perf.slowest_sql_time = elapsed
+        perf.slowest_sql = statement[:300]
+
+
+def attach_perf_listeners(engine):
+    event.listen(engine, 'before_cursor_execute', perf_before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', perf_after_cursor_execute)
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """JSON provider that adds time spent in dumps() to the current request's timings"""
+
+    def dumps(self, obj, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            perf = current_perf()
+            if perf is not None:
+                perf.serialize_time += time.perf_counter() - started
+
+
+def perf_before_request():
+    g.perf = RequestPerf()
+
+
+def perf_after_request(response):
+    perf = g.get('perf')
+    if perf is None:
+        return response
+    total_ms = (time.perf_counter() - perf.started) * 1000
+    response.headers['Server-Timing'] = ', '.join([
+        f'sql;dur={perf.sql_time * 1000:.1f};desc="{perf.sql_count} queries"',
+        f'serialize;dur={perf.serialize_time * 1000:.1f}',
+        f'app;dur={total_ms:.1f}'
+    ])
+
+    if response.is_streamed:
+        # Streamed bodies run SQL and serialization after this hook; count them as they go out
+        response.response = count_response_bytes(response.response, perf)
+    else:
+        perf.response_bytes = response.calculate_content_length() or 0
+
+    endpoint = request.endpoint or 'unmatched'
+    method, path, status = request.method, request.path, response.status_code
+    response.call_on_close(lambda: record_request_perf(endpoint, method, path, status, perf))
+    return response
+
+
+def count_response_bytes(iterable, perf):
+    for chunk in iterable:
+        perf.response_bytes += len(chunk)
+        yield chunk
+
+
+def record_request_perf(endpoint, method, path, status, perf):
+    duration_ms = (time.perf_counter() - perf.started) * 1000
+    with perf_routes_lock:
+        stats = perf_routes.get(endpoint)
+        if stats is None:
+            stats = perf_routes[endpoint] = RouteStats(app.config['PERF_SAMPLES_PER_ROUTE'])
+        stats.add(duration_ms, status, perf)
+    perf_logger.info(json.dumps({
+        'event': 'request',
+        'method': method,
+        'path': path,
+        'endpoint': endpoint,
+        'status': status,
+        'duration_ms': round(duration_ms, 2),
+        'sql_count': perf.sql_count,
+        'sql_ms': round(perf.sql_time * 1000, 2),
+        'serialize_ms': round(perf.serialize_time * 1000, 2),
+        'response_bytes': perf.response_bytes,
+        'slowest_sql_ms': round(perf.slowest_sql_time * 1000, 2),
+        'slowest_sql': perf.slowest_sql
+    }, ensure_ascii=False))
+
+
+def install_perf_instrumentation():
+    """Register request hooks and the timed JSON provider (engines are handled by configure_engine)"""
+    app.json = TimedJSONProvider(app)
+    app.before_request(perf_before_request)
+    app.after_request(perf_after_request)
+
+
+@app.route('/debug/perf')
+def debug_perf():
+    """Per-route latency percentiles, histograms and SQL/serialization averages for this worker"""
+    if not app.config['PERF_INSTRUMENTATION']:
+        return jsonify({'enabled': False, 'message': 'Set PERF_INSTRUMENTATION=true to collect timings'})
+    with perf_routes_lock:
+        routes = {endpoint: stats.to_dict() for endpoint, stats in perf_routes.items()}
+    return jsonify({'enabled': True, 'pid': os.getpid(), 'routes': routes})
+
+# =============================================================================
+# REQUEST PROFILING
+# =============================================================================
+
+PROFILE_ID_RE = re.compile(r'^[0-9]{13}-[0-9a-f]{8}$')
+PROFILE_MAX_STACKS = 500
+STDLIB_DIR = os.path.dirname(os.__file__)
+
+
+class RequestProfile:
+    """Stack samples (or a cProfile tracer) for one in-flight request"""
+    __slots__ = ('started', 'stacks', 'samples', 'tracer')
+
+    def __init__(self, tracer=None):
+        self.started = time.perf_counter()
+        self.stacks = Counter()
+        self.samples = 0
+        self.tracer = tracer
+
+
+profile_targets = {}  # thread ident -> RequestProfile
+profile_targets_lock = threading.Lock()
+profile_sampler = None
+
+
+@functools.lru_cache(maxsize=4096)
+def frame_label(code):
+    path = code.co_filename
+    if path.startswith(BASE_DIR):
+        path = os.path.relpath(path, BASE_DIR)
+    elif 'site-packages' in path:
+        path = path.split('site-packages' + os.sep, 1)[1]
+    elif path.startswith(STDLIB_DIR):
+        path = os.path.relpath(path, STDLIB_DIR)
+    return f"{code.co_name} ({path}:{code.co_firstlineno})"
+
+
+def sample_request_stacks():
+    """Sampler thread: record the stack of every registered request thread each interval"""
+    interval = app.config['PROFILE_SAMPLE_INTERVAL_MS'] / 1000
+    while True:
+        time.sleep(interval)
+        with profile_targets_lock:
+            targets = list(profile_targets.items())
+        if not targets:
+            continue
+        frames = sys._current_frames()
+        for ident, profile in targets:
+            frame = frames.get(ident)
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                stack.reverse()
+                profile.stacks[tuple(stack)] += 1
+                profile.samples += 1
+
+
+def ensure_profile_sampler():
+    # Started lazily so it exists in each forked worker, not just the master
+    global profile_sampler
+    if profile_sampler is not None and profile_sampler.is_alive():
+        return
+    with profile_targets_lock:
+        if profile_sampler is None or not profile_sampler.is_alive():
+            profile_sampler = threading.Thread(target=sample_request_stacks, name='profile-sampler', daemon=True)
+            profile_sampler.start()
+
+
+def wants_cprofile():
+    if request.headers.get('X-Profile', '').lower() != 'cprofile':
+        return False
+    token = app.config['PROFILE_TOKEN']
+    return token is None or request.headers.get('X-Profile-Token') == token
+
+
+def profile_before_request():
+    tracer = None
+    if wants_cprofile():
+        tracer = cProfile.Profile()
+        try:
+            tracer.enable()
+        except ValueError:  # another profiler is already active on this thread
+            tracer = None
+    profile = g.request_profile = RequestProfile(tracer)
+    if tracer is None:
+        ensure_profile_sampler()
+        with profile_targets_lock:
+            profile_targets[threading.get_ident()] = profile
+
+
+def profile_after_request(response):
+    profile = g.get('request_profile')
+    if profile is None:
+        return response
+    ident = threading.get_ident()
+    details = {
+        'endpoint': request.endpoint or 'unmatched',
+        'method': request.method,
+        'path': request.full_path.rstrip('?'),
+        'status': response.status_code,
+    }
+    # Streamed bodies keep running in this thread after the hook; finish on close
+    response.call_on_close(lambda: finish_request_profile(ident, profile, details))
+    return response
+
+
+def finish_request_profile(ident, profile, details):
+    duration_ms = (time.perf_counter() - profile.started) * 1000
+    if profile.tracer is not None:
+        profile.tracer.disable()
+        save_profile(dict(details, kind='cprofile', duration_ms=round(duration_ms, 2),
+                          functions=cprofile_functions(profile.tracer)))
+        return
+
+    with profile_targets_lock:
+        profile_targets.pop(ident, None)
+    budget = app.config['PROFILE_LATENCY_BUDGET_MS']
+    if duration_ms < budget or not profile.samples:
+        return
+    stacks = [{'stack': list(stack), 'count': count}
+              for stack, count in profile.stacks.most_common(PROFILE_MAX_STACKS)]
+    save_profile(dict(details, kind='sampled', duration_ms=round(duration_ms, 2), budget_ms=budget,
+                      interval_ms=app.config['PROFILE_SAMPLE_INTERVAL_MS'], samples=profile.samples,
+                      stacks=stacks))
+
+
+def cprofile_functions(tracer, limit=200):
+    stats = pstats.Stats(tracer)
+    rows = []
+    for (filename, line, name), (cc, nc, tt, ct, _) in stats.stats.items():
+        rows.append({
+            'function': f"{name} ({filename}:{line})",
+            'calls': nc,
+            'primitive_calls': cc,
+            'tottime_ms': round(tt * 1000, 3),
+            'cumtime_ms': round(ct * 1000, 3),
+        })
+    rows.sort(key=lambda r: r['cumtime_ms'], reverse=True)
+    return rows[:limit]
+
+
+def save_profile(record):
+    """Write a profile into the on-disk ring buffer, dropping the oldest beyond PROFILE_MAX_FILES"""
+    directory = app.config['PROFILE_DIR']
+    profile_id = f"{int(time.time() * 1000):013d}-{uuid.uuid4().hex[:8]}"
+    record.update(id=profile_id, pid=os.getpid(), created_at=datetime.utcnow().isoformat())
+    try:
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = os.path.join(directory, f'.{profile_id}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as stream:
+            json.dump(record, stream, ensure_ascii=False)
+        os.replace(tmp_path, os.path.join(directory, f'{profile_id}.json'))
+        for stale in list_profile_ids()[app.config['PROFILE_MAX_FILES']:]:
+            try:
+                os.remove(os.path.join(directory, f'{stale}.json'))
+            except FileNotFoundError:
+                pass  # another worker pruned it first
+    except OSError:
+        logging.exception("Could not store request profile")
+
+
+def list_profile_ids():
+    """Stored profile ids, newest first"""
+    try:
+        names = os.listdir(app.config['PROFILE_DIR'])
+    except FileNotFoundError:
+        return []
+    ids = [name[:-5] for name in names if name.endswith('.json') and PROFILE_ID_RE.match(name[:-5])]
+    return sorted(ids, reverse=True)
+
+
+def load_profile(profile_id):
+    with open(os.path.join(app.config['PROFILE_DIR'], f'{profile_id}.json'), encoding='utf-8') as stream:
+        return json.load(stream)
+
+
+def install_profiling():
+    app.before_request(profile_before_request)
+    app.after_request(profile_after_request)
+
+
+@app.route('/debug/profiles')
+def debug_profiles():
+    """Stored slow-request and cProfile captures, newest first"""
+    if not app.config['PROFILING_ENABLED']:
+        return jsonify({'enabled': False, 'message': 'Set PROFILING_ENABLED=true to capture profiles'})
+    profiles = []
+    for profile_id in list_profile_ids():
+        try:
+            record = load_profile(profile_id)
+        except (OSError, json.JSONDecodeError):
+            continue
+        profiles.append({key: record.get(key) for key in
+                         ('id', 'kind', 'endpoint', 'method', 'path', 'status', 'duration_ms', 'samples', 'created_at', 'pid')})
+        profiles[-1]['url'] = url_for('debug_profile', profile_id=profile_id)
+    return jsonify({'enabled': True, 'budget_ms': app.config['PROFILE_LATENCY_BUDGET_MS'], 'profiles': profiles})
+
+
+@app.route('/debug/profiles/<profile_id>')
+def debug_profile(profile_id):
+    """One profile as JSON, or ?format=collapsed for flamegraph tools (sampled profiles only)"""
+    if not app.config['PROFILING_ENABLED'] or not PROFILE_ID_RE.match(profile_id):
+        return jsonify({'error': 'Profile not found'}), 404
+    try:
+        record = load_profile(profile_id)
+    except FileNotFoundError:
+        return jsonify({'error': 'Profile not found'}), 404
+
+    if request.args.get('format') == 'collapsed':
+        if record.get('kind') != 'sampled':
+            return jsonify({'error': 'Collapsed stacks are only available for sampled profiles'}), 400
+        lines = [f"{';'.join(s['stack'])} {s['count']}" for s in record['stacks']]
+        return app.response_class('\n'.join(lines) + '\n', mimetype='text/plain')
+    return jsonify(record)
+
+# =============================================================================
+# PROMETHEUS METRICS
+# =============================================================================
+
+if app.config['METRICS_ENABLED']:
+    REQUESTS_TOTAL = prometheus_client.Counter(
+        'oribasius_http_requests_total', 'HTTP requests by Flask endpoint',
+        ['endpoint', 'method', 'status'])
+    REQUEST_DURATION = prometheus_client.Histogram(
+        'oribasius_http_request_duration_seconds', 'Request latency by Flask endpoint',
+        ['endpoint'], buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30))
+    POOL_CHECKOUTS = prometheus_client.Counter(
+        'oribasius_db_pool_checkouts_total', 'Connections checked out of the pool', ['engine'])
+    POOL_WAIT = prometheus_client.Histogram(
+        'oribasius_db_pool_wait_seconds', 'Time spent waiting for a pooled connection', ['engine'],
+        buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30))
+    POOL_IN_USE = prometheus_client.Gauge(
+        'oribasius_db_pool_connections_in_use', 'Connections currently checked out', ['engine'],
+        multiprocess_mode='livesum')
+    ENTRIES_ROWS = prometheus_client.Histogram(
+        'oribasius_entries_rows_returned', 'Rows returned by /api/entries', ['format'],
+        buckets=(0, 1, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000))
+    COMPUTATION_DURATION = prometheus_client.Histogram(
+        'oribasius_computation_seconds', 'Time spent computing analytics and map aggregates', ['computation'],
+        buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60))
+    JOB_DURATION = prometheus_client.Histogram(
+        'oribasius_job_duration_seconds', 'Background job run time', ['job_type', 'status'],
+        buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 1800))
+    JOB_ITEMS = prometheus_client.Counter(
+        'oribasius_job_items_processed_total', 'Items (entries, rows) processed by background jobs', ['job_type'])
+    CACHE_LOOKUPS = prometheus_client.Counter(
+        'oribasius_cache_lookups_total', 'Cache lookups by cache and outcome', ['cache', 'result'])
+
+
+def observe_pool_wait(role, seconds):
+    POOL_WAIT.labels(role).observe(seconds)
+
+
+def attach_pool_metrics(engine, role):
+    if isinstance(engine.pool, TimedQueuePool):
+        engine.pool.metrics_role = role
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        POOL_CHECKOUTS.labels(role).inc()
+        POOL_IN_USE.labels(role).inc()
+
+    def on_checkin(dbapi_connection, connection_record):
+        POOL_IN_USE.labels(role).dec()
+
+    event.listen(engine, 'checkout', on_checkout)
+    event.listen(engine, 'checkin', on_checkin)
+
+
+def record_entries_returned(count, fmt='json'):
+    if app.config['METRICS_ENABLED']:
+        ENTRIES_ROWS.labels(fmt).observe(count)
+
+
+def record_cache_lookup(cache, hit, count=1):
+    """Count cache hits or misses; hit ratio = hit / (hit + miss) per cache label"""
+    if app.config['METRICS_ENABLED'] and count:
+        CACHE_LOOKUPS.labels(cache, 'hit' if hit else 'miss').inc(count)
+
+
+def record_job_finished(job_type, status, seconds, items):
+    if app.config['METRICS_ENABLED']:
+        JOB_DURATION.labels(job_type, status).observe(seconds)
+        if items:
+            JOB_ITEMS.labels(job_type).inc(items)
+
+
+def timed_computation(name):
+    """Record a view's computation time (everything before the response is returned)"""
+    def decorator(view):
+        if not app.config['METRICS_ENABLED']:
+            return view
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            with COMPUTATION_DURATION.labels(name).time():
+                return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def metrics_before_request():
+    g.metrics_started = time.perf_counter()
+
+
+def metrics_after_request(response):
+    started = g.get('metrics_started')
+    if started is not None:
+        endpoint = request.endpoint or 'unmatched'
+        REQUEST_DURATION.labels(endpoint).observe(time.perf_counter() - started)
+        REQUESTS_TOTAL.labels(endpoint, request.method, str(response.status_code)).inc()
+    return response
+
+
+def install_metrics():
+    app.before_request(metrics_before_request)
+    app.after_request(metrics_after_request)
+
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus text exposition, aggregated across workers in multiprocess mode"""
+    if not app.config['METRICS_ENABLED']:
+        return jsonify({'error': 'Metrics disabled; set METRICS_ENABLED=true and install prometheus_client'}), 404
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = prometheus_client.CollectorRegistry()
+        prometheus_multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return app.response_class(prometheus_client.generate_latest(registry),
+                              mimetype=prometheus_client.CONTENT_TYPE_LATEST)
+
+# =============================================================================
+# STATIC ASSETS
+# =============================================================================
+
+# build_assets.py output: content-hashed copies of static/ files plus .gz/.br variants
+ASSET_DIST_DIR = os.path.join(app.static_folder, 'dist')
+# Hashed file names change with their content, so browsers may keep them for a year without revalidating
+ASSET_MAX_AGE = 365 * 24 * 3600
+ASSET_ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+
+def file_sha256(path):
+    with open(path, 'rb') as stream:
+        return hashlib.sha256(stream.read()).hexdigest()
+
+
+def load_asset_manifest():
+    """Map source names to their built files, skipping any whose source changed since the build"""
+    try:
+        with open(os.path.join(ASSET_DIST_DIR, 'manifest.json'), encoding='utf-8') as stream:
+            manifest = json.load(stream)
+    except (OSError, ValueError):
+        return {}
+    current = {}
+    for name, built in manifest.items():
+        source = os.path.join(app.static_folder, name)
+        if (os.path.exists(source) and file_sha256(source) == built['sha256']
+                and os.path.exists(os.path.join(ASSET_DIST_DIR, built['file']))):
+            current[name] = built['file']
+        else:
+            logging.warning('Built asset %s is stale or missing; serving static/%s uncompressed', name, name)
+    return current
+
+
+ASSET_FILES = load_asset_manifest()
+# Unbuilt sources' digests by path, with the mtime they were taken at
+_source_digests = {}
+
+
+def source_digest(path):
+    """SHA-256 of a static source, rehashed only when its mtime changes"""
+    mtime = os.stat(path).st_mtime_ns
+    cached = _source_digests.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = _source_digests[path] = (mtime, file_sha256(path))
+    return cached[1]
+
+
+@app.template_global()
+def asset_url(name):
+    """URL of a static asset: its hashed build when current, else the source file versioned by content"""
+    if name in ASSET_FILES:
+        return url_for('asset', filename=ASSET_FILES[name])
+    return url_for('static', filename=name, v=source_digest(os.path.join(app.static_folder, name))[:12])
+
+
+@app.route('/assets/<filename>')
+def asset(filename):
+    """Serve a built asset, precompressed in the best encoding the client accepts"""
+    if filename not in ASSET_FILES.values():
+        return jsonify({'error': 'Asset not found'}), 404
+    path = os.path.join(ASSET_DIST_DIR, filename)
+    encoding = None
+    for candidate, suffix in ASSET_ENCODINGS:
+        if request.accept_encodings[candidate] and os.path.exists(path + suffix):
+            encoding, path = candidate, path + suffix
+            break
+    response = send_file(path, mimetype=mimetypes.guess_type(filename)[0],
+                         max_age=ASSET_MAX_AGE, conditional=True)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
 
 # Routes
 @app.route('/')
 def index():
-    return render_template('index.html')
+    """Thin HTML shell; revalidated on every load so it always points at the current asset hashes"""
+    response = make_response(render_template('index.html', change_stream=app.config['CHANGE_STREAM_ENABLED']))
+    response.add_etag()
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 
 @app.route('/debug-db')
@@ -551,6 +2565,21 @@ def debug_db():
     except Exception as exc:
         info["connection_test"] = f"failed: {exc}"
 
+    info["read_routing"] = {
+        "enabled": app.config['READ_ROUTING'],
+        "read_uri": build_read_uri() if app.config['READ_ROUTING'] else None
+    }
+    info["engine_options"] = {k: v for k, v in app.config['SQLALCHEMY_ENGINE_OPTIONS'].items() if k != 'connect_args'}
+    if db.engine.dialect.name == 'sqlite':
+        info["sqlite_profile"] = app.config['SQLITE_PROFILE']
+        try:
+            info["sqlite_pragmas"] = {
+                name: db.session.execute(text(f'PRAGMA {name}')).scalar()
+                for name in app.config['SQLITE_PRAGMAS']
+            }
+        except Exception as exc:
+            info["sqlite_pragmas"] = f"failed: {exc}"
+
     return jsonify(info)
 
 # =============================================================================
@@ -575,7 +2604,8 @@ def resolve_urn(urn):
 @app.route('/api/authors', methods=['GET'])
 def get_authors():
     authors = SourceAuthor.query.order_by(SourceAuthor.name).all()
-    return jsonify([a.to_dict() for a in authors])
+    counts = author_entry_counts()
+    return jsonify([a.to_dict(entry_count=counts.get(a.id, 0)) for a in authors])
 
 @app.route('/api/authors/<int:author_id>', methods=['GET'])
 def get_author(author_id):
@@ -684,40 +2714,330 @@ def delete_ingredient(ingredient_id):
     db.session.commit()
     return '', 204
 
+# =============================================================================
+# FILTER INDEX
+# =============================================================================
+
+# Entry columns with a bitmap per value; sect bitmaps are unions of the source_author_id ones
+FILTER_INDEX_COLUMNS = ('author', 'author_group', 'book', 'pneumatist', 'source_author_id')
+FILTER_INDEX_INT_FIELDS = {'book', 'source_author_id', 'ingredient_id'}
+# Entry updates touching none of these leave the bitmaps as they are
+FILTER_INDEX_FIELDS = set(FILTER_INDEX_COLUMNS) | {'word_count', 'ingredients'}
+# Catching up over more change log rows than this rebuilds the index instead
+FILTER_INDEX_REBUILD_AFTER = 2000
+
+
+def ids_to_bitmap(ids):
+    """Bitmap (bit i set for each id i) of an iterable of non-negative ints"""
+    ids = list(ids)
+    if not ids:
+        return 0
+    bits = bytearray(max(ids) // 8 + 1)
+    for i in ids:
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, 'little')
+
+
+def bitmap_ids(bitmap):
+    """Set bit positions of a bitmap, ascending"""
+    bits = bin(bitmap)[:1:-1]
+    ids = []
+    i = bits.find('1')
+    while i != -1:
+        ids.append(i)
+        i = bits.find('1', i + 1)
+    return ids
+
+
+def set_bits(value):
+    return [k for k in range(value.bit_length()) if value >> k & 1]
+
+
+class FilterIndex:
+    """
+    Entry-id bitmaps (Python ints, bit i = entry i) per value of each filter column, per sect
+    and per ingredient, plus word counts bit-sliced the same way, as of one corpus revision.
+    Filters become ANDs, counts popcounts and word totals a popcount per word-count bit.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.revision = None  # not built yet
+        self.entries = {}      # id -> (column values, word_count)
+        self.ingredients = {}  # id -> ingredient ids
+        self.sects = {}        # source_author_id -> sect
+        self.bitmaps = {}      # filter name -> {value: bitmap}
+        self.word_bits = []    # word_bits[k]: entries whose word_count has bit k set
+        self.all = 0
+
+    def load_entries(self, ids=None):
+        """[(id, column values, word_count)] and {id: ingredient ids} for ids, or for every entry"""
+        rows = db.select(Entry.id, *[getattr(Entry, name) for name in FILTER_INDEX_COLUMNS], Entry.word_count)
+        links = db.select(entry_ingredients.c.entry_id, entry_ingredients.c.ingredient_id)
+        if ids is not None:
+            rows = rows.where(Entry.id.in_(ids))
+            links = links.where(entry_ingredients.c.entry_id.in_(ids))
+        entries = [(row[0], tuple(row[1:-1]), row[-1] or 0) for row in db.session.execute(rows)]
+        ingredients = defaultdict(set)
+        for entry_id, ingredient_id in db.session.execute(links):
+            ingredients[entry_id].add(ingredient_id)
+        return entries, ingredients
+
+    def load_sects(self):
+        self.sects = dict(db.session.execute(db.select(SourceAuthor.id, SourceAuthor.sect)).all())
+
+    def rebuild(self, revision):
+        entries, ingredients = self.load_entries()
+        members = defaultdict(list)  # (filter name, value) -> ids
+        word_members = defaultdict(list)
+        for entry_id, values, words in entries:
+            for name, value in zip(FILTER_INDEX_COLUMNS, values):
+                members[name, value].append(entry_id)
+            for ingredient_id in ingredients.get(entry_id, ()):
+                members['ingredient_id', ingredient_id].append(entry_id)
+            for k in set_bits(words):
+                word_members[k].append(entry_id)
+        self.bitmaps = {name: {} for name in FILTER_INDEX_COLUMNS + ('ingredient_id',)}
+        for (name, value), ids in members.items():
+            self.bitmaps[name][value] = ids_to_bitmap(ids)
+        self.word_bits = [ids_to_bitmap(word_members[k]) for k in range(max(word_members, default=-1) + 1)]
+        self.all = ids_to_bitmap(entry_id for entry_id, _, _ in entries)
+        self.entries = {entry_id: (values, words) for entry_id, values, words in entries}
+        self.ingredients = dict(ingredients)
+        self.load_sects()
+        self.index_sects()
+        self.revision = revision
+        app.logger.info("Built filter index for %d entries at revision %d", len(entries), revision)
+
+    def index_sects(self):
+        sects = {}
+        for author_id, bitmap in self.bitmaps['source_author_id'].items():
+            sect = self.sects.get(author_id)
+            sects[sect] = sects.get(sect, 0) | bitmap
+        self.bitmaps['sect'] = sects
+
+    def unset(self, name, value, keep):
+        bitmap = self.bitmaps[name].get(value, 0) & keep
+        if bitmap:
+            self.bitmaps[name][value] = bitmap
+        else:
+            self.bitmaps[name].pop(value, None)
+
+    def remove(self, entry_id):
+        indexed = self.entries.pop(entry_id, None)
+        if indexed is None:
+            return
+        values, words = indexed
+        keep = ~(1 << entry_id)
+        for name, value in zip(FILTER_INDEX_COLUMNS, values):
+            self.unset(name, value, keep)
+        for ingredient_id in self.ingredients.pop(entry_id, ()):
+            self.unset('ingredient_id', ingredient_id, keep)
+        for k in set_bits(words):
+            self.word_bits[k] &= keep
+        self.all &= keep
+
+    def add(self, entry_id, values, words, ingredient_ids):
+        bit = 1 << entry_id
+        for name, value in zip(FILTER_INDEX_COLUMNS, values):
+            self.bitmaps[name][value] = self.bitmaps[name].get(value, 0) | bit
+        for ingredient_id in ingredient_ids:
+            self.bitmaps['ingredient_id'][ingredient_id] = self.bitmaps['ingredient_id'].get(ingredient_id, 0) | bit
+        for k in set_bits(words):
+            if k >= len(self.word_bits):
+                self.word_bits.extend([0] * (k + 1 - len(self.word_bits)))
+            self.word_bits[k] |= bit
+        self.all |= bit
+        self.entries[entry_id] = (values, words)
+        if ingredient_ids:
+            self.ingredients[entry_id] = set(ingredient_ids)
+
+    def catch_up(self, revision, floor):
+        """
+        Bring the bitmaps to `revision` by re-reading the records the change log names
+        since the last one. Returns False, leaving the bitmaps alone, when they are already
+        past `revision` (a reader that saw an older commit than another worker's request);
+        that reader should fall back to SQL rather than rebuild the index backwards.
+        """
+        record_cache_lookup('filter_index', self.revision == revision)
+        if self.revision == revision:
+            return True
+        if self.revision is not None and self.revision > revision:
+            return False
+        if self.revision is None or self.revision < floor:
+            self.rebuild(revision)
+            return True
+        changes = db.session.execute(
+            db.select(ChangeLog.entity, ChangeLog.entity_id, ChangeLog.action, ChangeLog.fields)
+            .where(ChangeLog.revision > self.revision)
+            .order_by(ChangeLog.id).limit(FILTER_INDEX_REBUILD_AFTER + 1)
+        ).all()
+        if len(changes) > FILTER_INDEX_REBUILD_AFTER:
+            self.rebuild(revision)
+            return True
+        entry_ids = set()
+        authors_changed = False
+        for entity, entity_id, action, fields in changes:
+            if entity == 'corpus' or (entity == 'source_author' and action == 'delete'):
+                # Bulk writes and author deletions touch entries without logging them
+                self.rebuild(revision)
+                return True
+            if entity == 'entry':
+                if action != 'update' or not fields or FILTER_INDEX_FIELDS.intersection(json.loads(fields)):
+                    entry_ids.add(entity_id)
+            elif entity == 'source_author':
+                authors_changed = True
+            elif entity == 'ingredient' and action == 'delete':
+                for entry_id in bitmap_ids(self.bitmaps['ingredient_id'].pop(entity_id, 0)):
+                    self.ingredients[entry_id].discard(entity_id)
+        for chunk in iter_chunks(sorted(entry_ids), ENTRY_LOOKUP_CHUNK):
+            entries, ingredients = self.load_entries(chunk)
+            for entry_id in chunk:
+                self.remove(entry_id)
+            for entry_id, values, words in entries:
+                self.add(entry_id, values, words, ingredients.get(entry_id, ()))
+        if authors_changed:
+            self.load_sects()
+        self.index_sects()
+        self.revision = revision
+        return True
+
+    def select(self, args, names=None):
+        """Bitmap of the entries passing the filters in args (only those in `names` when given)"""
+        mask = self.all
+        if args.get('ids') and (names is None or 'ids' in names):
+            mask &= ids_to_bitmap(parse_entry_ids(args.get('ids')))
+        if args.get('id_from') and (names is None or 'id_from' in names):
+            low = max(int(args.get('id_from')), 0)
+            mask = mask >> low << low
+        if args.get('id_to') and (names is None or 'id_to' in names):
+            high = int(args.get('id_to'))
+            mask &= (1 << (high + 1)) - 1 if high >= 0 else 0
+        for name, values in self.bitmaps.items():
+            value = args.get(name)
+            if value and (names is None or name in names):
+                mask &= values.get(int(value) if name in FILTER_INDEX_INT_FIELDS else value, 0)
+        return mask
+
+    def words(self, mask):
+        return sum((mask & bits).bit_count() << k for k, bits in enumerate(self.word_bits))
+
+    def facet_counts(self, args, matches=None):
+        """/api/facets from the bitmaps; matches narrows to a search's hits"""
+        base = self.select(args, names={'ids', 'id_from', 'id_to', 'ingredient_id'})
+        if matches is not None:
+            base &= matches
+        selected = {name: self.bitmaps[name].get(value, 0) for name, value in facet_selection(args).items()}
+
+        def narrowed(skip):
+            mask = base
+            for name, bitmap in selected.items():
+                if name != skip:
+                    mask &= bitmap
+            return mask
+
+        total = narrowed(None)
+        facets = {}
+        for name in FACET_COLUMNS:
+            mask = narrowed(name)
+            values = []
+            for value, bitmap in self.bitmaps[name].items():
+                hits = mask & bitmap
+                if hits:
+                    values.append({'value': value, 'entries': hits.bit_count(), 'words': self.words(hits)})
+            values.sort(key=lambda item: (-item['entries'], str(item['value'])))
+            facets[name] = values
+        return {'total': {'entries': total.bit_count(), 'words': self.words(total)}, 'facets': facets}
+
+    def page(self, mask, sort_by, descending, offset, limit):
+        """Ids of one page of mask, by id or by book then id (entries without a book first); descending reverses both"""
+        end = None if limit is None else offset + limit
+        if sort_by == 'id':
+            ids = bitmap_ids(mask)
+            return (ids[::-1] if descending else ids)[offset:end]
+        books = sorted((book for book in self.bitmaps['book'] if book is not None), reverse=descending)
+        ids = []
+        for book in ([None] + books if not descending else books + [None]):
+            hits = mask & self.bitmaps['book'].get(book, 0)
+            if hits:
+                ids.extend(bitmap_ids(hits)[::-1] if descending else bitmap_ids(hits))
+                if end is not None and len(ids) >= end:
+                    break
+        return ids[offset:end]
+
+
+FILTER_INDEX = FilterIndex()
+
+
+@contextmanager
+def filter_index():
+    """
+    The filter index caught up to the committed revision and locked for reading, or None
+    when disabled or already ahead of the revision this request sees
+    """
+    if not app.config['FILTER_INDEX_ENABLED']:
+        yield None
+        return
+    revision, floor = corpus_log_state()
+    with FILTER_INDEX.lock:
+        yield FILTER_INDEX if FILTER_INDEX.catch_up(revision, floor) else None
+
+
+def indexed_entry_ids(args):
+    """Ids passing the filters in args when the filter index narrows them to one IN (...) list, else None"""
+    with filter_index() as index:
+        if index is None:
+            return None
+        mask = index.select(args)
+        return bitmap_ids(mask) if mask.bit_count() <= ENTRY_LOOKUP_CHUNK else None
+
+
+def indexed_entry_page(args, lemma_filter, offset, limit):
+    """(number of matches, ids of the page) from the filter index, None without it or for other sort orders"""
+    sort_by = args.get('sort_by', 'book')
+    if sort_by not in ('book', 'id'):
+        return None
+    matches = ids_to_bitmap(lemma_filter) if lemma_filter is not None else None
+    with filter_index() as index:
+        if index is None:
+            return None
+        mask = index.select(args)
+        if matches is not None:
+            mask &= matches
+        return mask.bit_count(), index.page(mask, sort_by, args.get('sort_order') == 'desc', offset, limit)
+
 # =============================================================================
 # ENTRIES API
 # =============================================================================
 
-@app.route('/api/entries', methods=['GET'])
-def get_entries():
+def build_entries_query(args):
+    """
+    Apply the /api/entries filter, search and sort parameters.
+    Returns (query, lemma_filter); lemma_filter is None unless a lemmatized Greek search
+    was requested, in which case it maps matching entry ids to their matched word spans
+    and rows whose id is not in it must still be dropped.
+    Raises LemmaQueryError for a malformed lemma query and ValueError for malformed ids or id bounds.
+    """
     query = Entry.query
     
-    # Filtering
-    if request.args.get('author'):
-        query = query.filter(Entry.author == request.args.get('author'))
-    if request.args.get('source_author_id'):
-        query = query.filter(Entry.source_author_id == int(request.args.get('source_author_id')))
-    if request.args.get('author_group'):
-        query = query.filter(Entry.author_group == request.args.get('author_group'))
-    if request.args.get('book'):
-        query = query.filter(Entry.book == int(request.args.get('book')))
-    if request.args.get('sect'):
-        # Filter by author's sect
-        query = query.join(SourceAuthor).filter(SourceAuthor.sect == request.args.get('sect'))
-    if request.args.get('pneumatist'):
-        query = query.filter(Entry.pneumatist == request.args.get('pneumatist'))
-    if request.args.get('ingredient_id'):
-        query = query.filter(Entry.ingredients.any(Ingredient.id == int(request.args.get('ingredient_id'))))
+    # Filtering: a short id list from the filter index replaces the joins and EXISTS in SQL
+    indexed_ids = indexed_entry_ids(args)
+    if indexed_ids is not None:
+        query = query.filter(Entry.id.in_(indexed_ids))
+    else:
+        query = filter_entries_sql(query, args)
     
     # Text search
-    search = request.args.get('search')
-    lemma_search = request.args.get('lemma_search', 'false').lower() == 'true'
+    search = args.get('search')
+    lemma_search = args.get('lemma_search', 'false').lower() == 'true'
+    lemma_filter = None
     
     if search:
         if lemma_search and any(ord(c) >= 0x0370 for c in search):
-            # Lemmatized Greek search
-            all_entries = query.all()
-            entries = search_with_lemma(search, all_entries)
+            # Positional lemma query over the inverted index; small match sets also narrow the SQL
+            lemma_filter = run_lemma_query(search)
+            if len(lemma_filter) <= ENTRY_LOOKUP_CHUNK:
+                query = query.filter(Entry.id.in_(sorted(lemma_filter)))
         else:
             # Standard text search
             search_pattern = f"%{search}%"
@@ -729,36 +3049,346 @@ def get_entries():
                     Entry.translation_title.ilike(search_pattern)
                 )
             )
-            entries = None
-    else:
-        entries = None
     
     # Sorting
-    sort_by = request.args.get('sort_by', 'book')
-    sort_order = request.args.get('sort_order', 'asc')
-    
-    if entries is None:
-        if hasattr(Entry, sort_by):
-            column = getattr(Entry, sort_by)
-            if sort_order == 'desc':
-                query = query.order_by(column.desc())
-            else:
-                query = query.order_by(column.asc())
-        entries = query.all()
+    sort_by = args.get('sort_by', 'book')
+    sort_order = args.get('sort_order', 'asc')
+    
+    if hasattr(Entry, sort_by):
+        column = getattr(Entry, sort_by)
+        # Nulls sort low and id breaks ties, as in FilterIndex.page, on every backend
+        if sort_order == 'desc':
+            query = query.order_by(column.desc().nullslast())
+            if sort_by != 'id':
+                query = query.order_by(Entry.id.desc())
+        else:
+            query = query.order_by(column.asc().nullsfirst())
+            if sort_by != 'id':
+                query = query.order_by(Entry.id.asc())
     
+    return query, lemma_filter
+
+
+def parse_entry_ids(value):
+    ids = [int(i) for i in value.split(',') if i.strip()]
+    if len(ids) > ENTRY_LOOKUP_CHUNK:
+        raise ValueError(f'at most {ENTRY_LOOKUP_CHUNK} ids per request')
+    return ids
+
+
+def filter_entries_sql(query, args):
+    """Apply the /api/entries filter parameters in SQL"""
+    if args.get('ids'):
+        # Specific entries, e.g. the bodies of cards scrolling into view
+        query = query.filter(Entry.id.in_(parse_entry_ids(args.get('ids'))))
+    if args.get('id_from'):
+        # Id ranges let a client cache fill or resume in slices
+        query = query.filter(Entry.id >= int(args.get('id_from')))
+    if args.get('id_to'):
+        query = query.filter(Entry.id <= int(args.get('id_to')))
+    if args.get('author'):
+        query = query.filter(Entry.author == args.get('author'))
+    if args.get('source_author_id'):
+        query = query.filter(Entry.source_author_id == int(args.get('source_author_id')))
+    if args.get('author_group'):
+        query = query.filter(Entry.author_group == args.get('author_group'))
+    if args.get('book'):
+        query = query.filter(Entry.book == int(args.get('book')))
+    if args.get('sect'):
+        # Filter by author's sect
+        query = query.join(SourceAuthor).filter(SourceAuthor.sect == args.get('sect'))
+    if args.get('pneumatist'):
+        query = query.filter(Entry.pneumatist == args.get('pneumatist'))
+    if args.get('ingredient_id'):
+        query = query.filter(Entry.ingredients.any(Ingredient.id == int(args.get('ingredient_id'))))
+    return query
+
+# Entry representations for list endpoints (?view=):
+#   summary - table-row fields straight from SQL tuples, no body text
+#   detail  - every stored field, built from SQL tuples, slim nested author
+#   full    - Entry.to_dict() on hydrated objects, nested author with entry_count
+ENTRY_VIEWS = ('summary', 'detail', 'full')
+ENTRY_SUMMARY_FIELDS = (
+    'id', 'book', 'chapter', 'section', 'chapter_title', 'author', 'author_named', 'author_group',
+    'source_author_id', 'pneumatist', 'title_greek', 'translation_title', 'word_count', 'urn_cts'
+)
+ENTRY_DETAIL_FIELDS = (
+    'id', 'author_named', 'source_author_id', 'author', 'author_group', 'book', 'chapter', 'section',
+    'chapter_title', 'raeder_volume', 'raeder_page', 'raeder_line_start', 'raeder_line_end',
+    'title_greek', 'body_greek', 'translation_title', 'translation_content', 'location', 'word_count',
+    'note1', 'note2', 'note3', 'note4', 'pneumatist', 'themes', 'urn_cts', 'urn_raeder',
+    'created_at', 'updated_at'
+)
+# Ids per IN (...) when batch-loading ingredients; stays under SQLite's variable limit
+ENTRY_LOOKUP_CHUNK = 900
+
+
+def author_entry_counts():
+    """{source_author_id: entry count} in one grouped query"""
+    rows = db.session.query(Entry.source_author_id, db.func.count(Entry.id)) \
+        .filter(Entry.source_author_id.isnot(None)).group_by(Entry.source_author_id).all()
+    return dict(rows)
+
+
+def source_author_briefs():
+    """{id: {id, name, sect, sect_certain}} for nesting in summary/detail rows"""
+    rows = db.session.query(SourceAuthor.id, SourceAuthor.name, SourceAuthor.sect, SourceAuthor.sect_certain).all()
+    return {r.id: {'id': r.id, 'name': r.name, 'sect': r.sect, 'sect_certain': r.sect_certain} for r in rows}
+
+
+def ingredients_by_entry(entry_ids):
+    """{entry_id: [ingredient dicts]} for a batch of entries"""
+    columns = Ingredient.__table__.columns
+    result = defaultdict(list)
+    for start in range(0, len(entry_ids), ENTRY_LOOKUP_CHUNK):
+        chunk = entry_ids[start:start + ENTRY_LOOKUP_CHUNK]
+        rows = db.session.execute(
+            db.select(entry_ingredients.c.entry_id, *columns)
+            .join(Ingredient, Ingredient.id == entry_ingredients.c.ingredient_id)
+            .where(entry_ingredients.c.entry_id.in_(chunk))
+            .order_by(entry_ingredients.c.entry_id, Ingredient.id)
+        )
+        for entry_id, *values in rows:
+            result[entry_id].append({c.name: v for c, v in zip(columns, values)})
+    return result
+
+
+def summary_entry_dict(row, authors):
+    data = dict(zip(ENTRY_SUMMARY_FIELDS, row))
+    data['source_author'] = authors.get(data['source_author_id'])
+    return data
+
+
+def detail_entry_dict(row, authors):
+    data = dict(zip(ENTRY_DETAIL_FIELDS, row))
+    data['source_author'] = authors.get(data['source_author_id'])
+    data['themes'] = json.loads(data['themes']) if data['themes'] else []
+    data['created_at'] = data['created_at'].isoformat() if data['created_at'] else None
+    data['updated_at'] = data['updated_at'].isoformat() if data['updated_at'] else None
+    return data
+
+
+def iter_chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_entry_dicts(query, view, lemma_filter, include_ingredients, batch_size=None, snippets=None):
+    """
+    Serialize the rows of an entries query in the requested view.
+    With batch_size the rows come from a server-side cursor (yield_per) for streaming;
+    with a SnippetBuilder each row also gets its search hit snippets.
+    """
+    if view == 'full':
+        if include_ingredients:
+            query = query.options(db.selectinload(Entry.ingredients))
+        counts = author_entry_counts()
+        for entry in (query.yield_per(batch_size) if batch_size else query.all()):
+            if lemma_filter is not None and entry.id not in lemma_filter:
+                continue
+            data = entry.to_dict(include_ingredients=include_ingredients, author_counts=counts)
+            if lemma_filter is not None:
+                data['lemma_matches'] = [list(span) for span in lemma_filter[entry.id]]
+            if snippets is not None:
+                data['snippets'] = snippets(entry)
+            yield data
+        return
+
+    fields, serialize = (ENTRY_SUMMARY_FIELDS, summary_entry_dict) if view == 'summary' \
+        else (ENTRY_DETAIL_FIELDS, detail_entry_dict)
+    columns = list(fields)
+    if snippets is not None:
+        columns += [c for c in SnippetBuilder.columns if c not in fields]  # read for snippets, never emitted
+    rows = query.with_entities(*[getattr(Entry, c) for c in columns])
+    rows = rows.yield_per(batch_size) if batch_size else rows.all()
+    authors = source_author_briefs()
+
+    for chunk in iter_chunks(rows, ENTRY_LOOKUP_CHUNK):
+        if lemma_filter is not None:
+            chunk = [row for row in chunk if row.id in lemma_filter]
+        ingredients = ingredients_by_entry([row.id for row in chunk]) if include_ingredients else None
+        for row in chunk:
+            data = serialize(row, authors)
+            if ingredients is not None:
+                data['ingredients'] = ingredients.get(row.id, [])
+            if lemma_filter is not None:
+                data['lemma_matches'] = [list(span) for span in lemma_filter[row.id]]
+            if snippets is not None:
+                data['snippets'] = snippets(row)
+            yield data
+
+
+def rank_entries(query, lemma_filter, ranker, offset=0, limit=None):
+    """
+    Score every entry the filtered query matches from (id, word_count) alone and keep
+    the offset + limit best. Returns (number of matches, [(score, entry_id)] for the page).
+    """
+    candidates = query.order_by(None).with_entities(Entry.id, Entry.word_count).all()
+    if lemma_filter is not None:
+        candidates = [row for row in candidates if row.id in lemma_filter]
+    ranked = ranker.top(candidates, None if limit is None else offset + limit)
+    return len(candidates), ranked[offset:]
+
+
+def count_entries(query, lemma_filter):
+    """Number of entries the filtered query matches, dropping rows outside lemma_filter as rank_entries does"""
+    if lemma_filter is None or len(lemma_filter) <= ENTRY_LOOKUP_CHUNK:
+        # Small lemma match sets are already an id IN (...) in the query
+        return query.order_by(None).count()
+    return sum(1 for row in query.order_by(None).with_entities(Entry.id) if row.id in lemma_filter)
+
+
+def iter_entry_dicts_by_id(query, ids, view, lemma_filter, include_ingredients, snippets=None):
+    """Serialize the rows for ids, fetched by id and yielded in the order given"""
+    query = query.order_by(None)
+    for chunk in iter_chunks(ids, ENTRY_LOOKUP_CHUNK):
+        page = query.filter(Entry.id.in_(chunk))
+        by_id = {data['id']: data for data in
+                 iter_entry_dicts(page, view, lemma_filter, include_ingredients, snippets=snippets)}
+        for entry_id in chunk:
+            if entry_id in by_id:
+                yield by_id[entry_id]
+
+
+def iter_ranked_entry_dicts(query, ranked, view, lemma_filter, include_ingredients, snippets=None):
+    """Serialize only the ranked page: rows fetched by id, yielded best first with their score"""
+    scores = {entry_id: score for score, entry_id in ranked}
+    for data in iter_entry_dicts_by_id(query, [entry_id for _, entry_id in ranked], view, lemma_filter,
+                                       include_ingredients, snippets):
+        data['score'] = round(scores[data['id']], 4)
+        yield data
+
+
+def requested_entry_view():
+    view = request.args.get('view', 'full').lower()
+    return view if view in ENTRY_VIEWS else None
+
+
+def requested_page():
+    """(offset, limit) from the query string, limit None for no limit; ValueError if malformed"""
+    offset = int(request.args.get('offset', 0))
+    limit = int(request.args['limit']) if request.args.get('limit') else None
+    if offset < 0 or (limit is not None and limit < 0):
+        raise ValueError('negative offset or limit')
+    return offset, limit
+
+
+def wants_ndjson():
+    if request.args.get('format') == 'ndjson':
+        return True
+    return request.accept_mimetypes.best_match(['application/json', 'application/x-ndjson']) == 'application/x-ndjson'
+
+@app.route('/api/entries', methods=['GET'])
+def get_entries():
+    view = requested_entry_view()
+    if view is None:
+        return jsonify({'error': f"view must be one of {', '.join(ENTRY_VIEWS)}"}), 400
+    try:
+        offset, limit = requested_page()
+    except ValueError:
+        return jsonify({'error': 'offset and limit must be non-negative integers'}), 400
+    # Read before the entries, so a write landing in between shows up as a revision gap
+    revision = corpus_revision()
+    try:
+        query, lemma_filter = build_entries_query(request.args)
+    except LemmaQueryError as exc:
+        return jsonify({'error': str(exc)}), 400
+    except ValueError as exc:
+        return jsonify({'error': f'Invalid filter: {exc}'}), 400
     include_ingredients = request.args.get('include_ingredients', 'false').lower() == 'true'
-    return jsonify([e.to_dict(include_ingredients=include_ingredients) for e in entries])
+    search = request.args.get('search')
+    snippets = None
+    if search and request.args.get('snippets', 'true').lower() == 'true':
+        snippets = SnippetBuilder(search, lemma_filter)
+    ndjson = wants_ndjson()
+    # Every branch below sets the match count (unpaged JSON counts its list), so the response headers
+    # are the same whichever of the filter index, ranking or plain SQL served it
+    total = None
+
+    if request.args.get('sort_by') == 'relevance':
+        ranker = relevance_ranker(search, lemma_filter) if search else None
+        if ranker is None:
+            return jsonify({'error': 'sort_by=relevance needs a search with Greek words'}), 400
+        total, ranked = rank_entries(query, lemma_filter, ranker, offset, limit)
+        entries = iter_ranked_entry_dicts(query, ranked, view, lemma_filter, include_ingredients, snippets)
+    else:
+        indexed = None
+        if (offset or limit is not None) and (not search or lemma_filter is not None):
+            # The filter index knows every match, so it picks the page and SQL reads only those rows
+            indexed = indexed_entry_page(request.args, lemma_filter, offset, limit)
+        if indexed is not None:
+            total, page_ids = indexed
+            entries = iter_entry_dicts_by_id(query, page_ids, view, lemma_filter, include_ingredients, snippets)
+        else:
+            # Unpaged JSON responses are counted as they are listed below
+            if offset or limit is not None or ndjson:
+                total = count_entries(query, lemma_filter)
+            # A large lemma match set is filtered in Python, so only then page the output instead of the SQL
+            paged_in_sql = lemma_filter is None or len(lemma_filter) <= ENTRY_LOOKUP_CHUNK
+            if paged_in_sql and (offset or limit is not None):
+                query = query.offset(offset).limit(limit)
+            entries = iter_entry_dicts(query, view, lemma_filter, include_ingredients,
+                                       batch_size=app.config['NDJSON_BATCH_SIZE'] if ndjson else None,
+                                       snippets=snippets)
+            if not paged_in_sql and (offset or limit is not None):
+                entries = itertools.islice(entries, offset, None if limit is None else offset + limit)
+
+    if ndjson:
+        response = stream_entries_ndjson(entries)
+    else:
+        entries = list(entries)
+        record_entries_returned(len(entries))
+        if total is None:
+            total = len(entries)
+        response = jsonify(entries)
+    response.headers['X-Total-Count'] = str(total)
+    return with_corpus_revision(response, revision)
+
+def stream_entries_ndjson(entries):
+    """Stream one JSON entry per line as the entry dicts are produced, keeping memory bounded"""
+    def generate():
+        count = 0
+        for data in entries:
+            count += 1
+            yield app.json.dumps(data) + '\n'
+        record_entries_returned(count, 'ndjson')
+
+    return app.response_class(stream_with_context(generate()), mimetype='application/x-ndjson')
 
 @app.route('/api/entries/<int:entry_id>', methods=['GET'])
 def get_entry(entry_id):
     entry = Entry.query.get_or_404(entry_id)
     return jsonify(entry.to_dict(include_ingredients=True))
 
+# Location fields Entry.generate_urns() builds the URNs from
+URN_SOURCE_FIELDS = ('book', 'chapter', 'section', 'raeder_volume', 'raeder_page', 'raeder_line_start', 'raeder_line_end')
+
+
+def refresh_derived_fields(entry, fields, old_body):
+    """Recompute what an edit of fields invalidates: word count, lemma index, token offsets and URNs"""
+    # Recalculate word count and lemma index if Greek text changed (the edit form always sends it)
+    if 'body_greek' in fields and entry.body_greek != old_body:
+        entry.word_count = len(re.findall(r'\S+', entry.body_greek or ''))
+        entry.lemma_data = build_lemma_index(entry.body_greek)
+        entry.token_offsets = build_token_offsets(entry.body_greek)
+    
+    # Regenerate URNs if location fields changed
+    if any(f in fields for f in URN_SOURCE_FIELDS):
+        entry.generate_urns()
+
 @app.route('/api/entries/<int:entry_id>', methods=['PUT'])
 def update_entry(entry_id):
     entry = Entry.query.get_or_404(entry_id)
     data = request.json
     editor_name = data.pop('editor_name', 'Anonymous')
+    old_body = entry.body_greek
+    previous = latest_history_states([entry_id])
     
     for field, value in data.items():
         if hasattr(entry, field):
@@ -767,29 +3397,20 @@ def update_entry(entry_id):
                 value = json.dumps(value) if isinstance(value, list) else value
             setattr(entry, field, value)
             
-            # Log the change
-            if str(old_value) != str(value):
+            # Log the change as a delta against the field's previous history row
+            old_text, new_text = history_text(old_value), history_text(value)
+            if old_text != new_text:
                 history = EditHistory(
                     entry_id=entry_id,
                     field_changed=field,
-                    old_value=str(old_value),
-                    new_value=str(value),
-                    editor_name=editor_name
+                    editor_name=editor_name,
+                    **history_values(old_text, new_text, previous.get((entry_id, field)))
                 )
                 db.session.add(history)
     
-    # Recalculate word count and lemma index if Greek text changed
-    if 'body_greek' in data:
-        entry.word_count = len(re.findall(r'\S+', entry.body_greek or ''))
-        entry.lemma_index = build_lemma_index(entry.body_greek)
-    
-    # Regenerate URNs if location fields changed
-    if any(f in data for f in ['book', 'chapter', 'section', 'raeder_volume', 
-                                'raeder_page', 'raeder_line_start', 'raeder_line_end']):
-        entry.generate_urns()
-    
+    refresh_derived_fields(entry, data, old_body)
     db.session.commit()
-    return jsonify(entry.to_dict())
+    return with_corpus_revision(jsonify(entry.to_dict(include_ingredients=True)))
 
 @app.route('/api/entries', methods=['POST'])
 def create_entry():
@@ -805,7 +3426,8 @@ def create_entry():
     # Set word count and lemma index
     if entry.body_greek:
         entry.word_count = len(re.findall(r'\S+', entry.body_greek))
-        entry.lemma_index = build_lemma_index(entry.body_greek)
+        entry.lemma_data = build_lemma_index(entry.body_greek)
+        entry.token_offsets = build_token_offsets(entry.body_greek)
     
     # Generate URNs
     entry.generate_urns()
@@ -817,14 +3439,14 @@ def create_entry():
     
     db.session.add(entry)
     db.session.commit()
-    return jsonify(entry.to_dict()), 201
+    return with_corpus_revision(jsonify(entry.to_dict(include_ingredients=True))), 201
 
 @app.route('/api/entries/<int:entry_id>', methods=['DELETE'])
 def delete_entry(entry_id):
     entry = Entry.query.get_or_404(entry_id)
     db.session.delete(entry)
     db.session.commit()
-    return '', 204
+    return with_corpus_revision(app.response_class(status=204))
 
 @app.route('/api/entries/<int:entry_id>/ingredients', methods=['POST'])
 def add_entry_ingredient(entry_id):
@@ -837,7 +3459,7 @@ def add_entry_ingredient(entry_id):
         entry.ingredients.append(ingredient)
         db.session.commit()
     
-    return jsonify(entry.to_dict(include_ingredients=True))
+    return with_corpus_revision(jsonify(entry.to_dict(include_ingredients=True)))
 
 @app.route('/api/entries/<int:entry_id>/ingredients/<int:ingredient_id>', methods=['DELETE'])
 def remove_entry_ingredient(entry_id, ingredient_id):
@@ -849,7 +3471,7 @@ def remove_entry_ingredient(entry_id, ingredient_id):
         entry.ingredients.remove(ingredient)
         db.session.commit()
     
-    return jsonify(entry.to_dict(include_ingredients=True))
+    return with_corpus_revision(jsonify(entry.to_dict(include_ingredients=True)))
 
 @app.route('/api/filters', methods=['GET'])
 def get_filter_options():
@@ -882,7 +3504,104 @@ def get_filter_options():
         'ingredient_categories': [c[0] for c in ingredient_categories if c[0]]
     })
 
+# Filter parameters /api/facets counts values for; each facet's counts ignore its own filter
+# so the other values stay selectable, but apply every other filter and the search
+FACET_COLUMNS = {
+    'author': Entry.author,
+    'author_group': Entry.author_group,
+    'book': Entry.book,
+    'pneumatist': Entry.pneumatist,
+    'sect': SourceAuthor.sect,
+    'source_author_id': Entry.source_author_id,
+}
+FACET_INT_FIELDS = {'book', 'source_author_id'}
+
+
+def facet_selection(args):
+    """{facet: selected value} for the facet filters present in args; raises ValueError for bad ints"""
+    selected = {}
+    for name in FACET_COLUMNS:
+        if args.get(name):
+            selected[name] = int(args.get(name)) if name in FACET_INT_FIELDS else args.get(name)
+    return selected
+
+
+def facet_groups(args):
+    """
+    [(facet values tuple, entries, words)] for the entries matching the search and non-facet filters,
+    from one query grouped by every facet column.
+    """
+    base_args = {k: v for k, v in args.items() if k not in FACET_COLUMNS and k != 'sort_by'}
+    query, lemma_filter = build_entries_query(base_args)
+    query = query.outerjoin(SourceAuthor, Entry.source_author_id == SourceAuthor.id).order_by(None)
+    columns = list(FACET_COLUMNS.values())
+    if lemma_filter is None or len(lemma_filter) <= ENTRY_LOOKUP_CHUNK:
+        rows = query.with_entities(
+            *columns, db.func.count(Entry.id), db.func.coalesce(db.func.sum(Entry.word_count), 0)
+        ).group_by(*columns)
+        return [(tuple(values), entries, words) for *values, entries, words in rows]
+    # Too many lemma matches to narrow the SQL: group the matching rows here instead
+    groups = defaultdict(lambda: [0, 0])
+    for entry_id, *values, words in query.with_entities(Entry.id, *columns, Entry.word_count):
+        if entry_id in lemma_filter:
+            group = groups[tuple(values)]
+            group[0] += 1
+            group[1] += words or 0
+    return [(values, entries, words) for values, (entries, words) in groups.items()]
+
+
+def facet_counts(args):
+    """Per-facet value counts under the selected filters, from the filter index or the facet groups"""
+    search = args.get('search')
+    lemma = search and args.get('lemma_search', 'false').lower() == 'true' and any(ord(c) >= 0x0370 for c in search)
+    if app.config['FILTER_INDEX_ENABLED'] and (not search or lemma):
+        matches = ids_to_bitmap(run_lemma_query(search)) if search else None
+        with filter_index() as index:
+            if index is not None:
+                return index.facet_counts(args, matches)
+    selected = facet_selection(args)
+    names = list(FACET_COLUMNS)
+    counts = {name: defaultdict(lambda: [0, 0]) for name in names}
+    total = [0, 0]
+    for values, entries, words in facet_groups(args):
+        misses = [name for name, value in zip(names, values) if name in selected and value != selected[name]]
+        if len(misses) > 1:
+            continue
+        for name, value in zip(names, values):
+            # A row failing only this facet's own filter still counts towards its other values
+            if not misses or misses == [name]:
+                counts[name][value][0] += entries
+                counts[name][value][1] += words
+        if not misses:
+            total[0] += entries
+            total[1] += words
+    return {
+        'total': {'entries': total[0], 'words': total[1]},
+        'facets': {
+            name: [{'value': value, 'entries': n, 'words': w}
+                   for value, (n, w) in sorted(values.items(), key=lambda item: (-item[1][0], str(item[0])))]
+            for name, values in counts.items()
+        },
+    }
+
+
+@app.route('/api/facets', methods=['GET'])
+@read_only_route
+@timed_computation('facets')
+def get_facets():
+    """Entry and word counts per filter value for the current filters and search"""
+    revision = corpus_revision()
+    try:
+        result = facet_counts(request.args)
+    except LemmaQueryError as exc:
+        return jsonify({'error': str(exc)}), 400
+    except ValueError as exc:
+        return jsonify({'error': f'Invalid filter: {exc}'}), 400
+    return with_corpus_revision(jsonify(result), revision)
+
 @app.route('/api/analytics', methods=['GET'])
+@read_only_route
+@timed_computation('analytics')
 def get_analytics():
     """Comprehensive analytics for the corpus"""
     entries = Entry.query.all()
@@ -975,6 +3694,8 @@ def get_analytics():
 
 
 @app.route('/api/book-map', methods=['GET'])
+@read_only_route
+@timed_computation('book_map')
 def get_book_map():
     """Return chapter-level distribution by source author for visualization"""
     entries = Entry.query.all()
@@ -1036,6 +3757,8 @@ def get_book_map():
 
 
 @app.route('/api/book-map-v2', methods=['GET'])
+@read_only_route
+@timed_computation('book_map_v2')
 def get_book_map_v2():
     """
     Book map with flexible grouping modes:
@@ -1140,6 +3863,8 @@ def get_thematic_structure():
 
 
 @app.route('/api/thematic-map', methods=['GET'])
+@read_only_route
+@timed_computation('thematic_map')
 def get_thematic_map():
     """
     Get visualization data combining thematic structure with entry statistics.
@@ -1320,11 +4045,27 @@ def get_thematic_map():
 
 @app.route('/api/seed-thematic', methods=['POST'])
 def seed_thematic_structure():
+    """Queue (re)seeding of the thematic divisions as a background job"""
+    return enqueue_job_response('seed-thematic', job_seed_thematic)
+
+
+def job_seed_thematic(job, payload):
+    count = seed_thematic_divisions(job)
+    return {'message': f'Seeded {count} thematic divisions', 'count': count}
+
+
+def seed_thematic_divisions(job=None):
     """Populate the thematic divisions from Oribasius Books 1-10 structure"""
 
+    def checkpoint(message):
+        # Commit division by division so a seeding job can report progress (and its heartbeat) in between
+        db.session.commit()
+        if job is not None:
+            job.progress(ThematicDivision.query.count(), message=message)
+
     # Clear existing
     ThematicDivision.query.delete()
-    db.session.commit()
+    checkpoint('Cleared thematic divisions')
 
     # Color scheme for four divisions
     div_colors = {
@@ -1466,6 +4207,8 @@ def seed_thematic_structure():
             books_start=book, books_end=book, color='#fda4af', sort_order=10+order
         ))
 
+    checkpoint('Seeded division I')
+
     # ===== DIVISION II: THINGS DONE (Book 6) =====
     div_ii = ThematicDivision(
         level='division', parent_id=part1.id,
@@ -1495,6 +4238,8 @@ def seed_thematic_structure():
             books_start=book, books_end=book, color='#93c5fd', sort_order=order
         ))
 
+    checkpoint('Seeded division II')
+
     # ===== DIVISION III: THINGS EVACUATED (Books 7-8) =====
     div_iii = ThematicDivision(
         level='division', parent_id=part1.id,
@@ -1560,6 +4305,8 @@ def seed_thematic_structure():
             books_start=book, books_end=book, color='#bbf7d0', sort_order=order
         ))
 
+    checkpoint('Seeded division III')
+
     # ===== DIVISION IV: THINGS APPLIED EXTERNALLY (Books 9-10) =====
     div_iv = ThematicDivision(
         level='division', parent_id=part1.id,
@@ -1634,55 +4381,377 @@ def seed_thematic_structure():
             books_start=book, books_end=book, color='#d8b4fe', sort_order=10+order
         ))
 
-    db.session.commit()
+    checkpoint('Seeded division IV')
+
+    return ThematicDivision.query.count()
+
+# Selector types /api/compare accepts as type:value; division takes a thematic division code or id
+COMPARE_SELECTOR_TYPES = ('author', 'author_group', 'book', 'pneumatist', 'sect', 'source_author_id',
+                          'ingredient_id', 'division')
+COMPARE_MAX_SELECTORS = 50
+COMPARE_MAX_LEMMAS = 200
+
+
+def division_predicate(division):
+    """SQL condition for the entries inside a thematic division's book (and chapter) range"""
+    if division.books_start is None or division.books_end is None:
+        return db.false()
+    condition = Entry.book.between(division.books_start, division.books_end)
+    if division.chapter_start is not None and division.chapter_end is not None:
+        condition = db.and_(condition, Entry.chapter.between(division.chapter_start, division.chapter_end))
+    return condition
+
+
+def divisions_by_book(divisions):
+    """{book: [(code, chapter_start, chapter_end)]} of the divisions covering each book, as division_predicate does"""
+    covering = defaultdict(list)
+    for division in divisions:
+        if division.books_start is None or division.books_end is None:
+            continue
+        chapters = (division.chapter_start, division.chapter_end) \
+            if division.chapter_start is not None and division.chapter_end is not None else (None, None)
+        for book in range(division.books_start, division.books_end + 1):
+            covering[book].append((division.code or division.id, *chapters))
+    return covering
+
+
+def compare_selector(kind, value, divisions):
+    """(selector dict, SQL condition) for one type:value; ValueError when it cannot be resolved"""
+    if kind not in COMPARE_SELECTOR_TYPES:
+        raise ValueError(f"unknown selector type {kind!r}; use one of {', '.join(COMPARE_SELECTOR_TYPES)}")
+    selector = {'key': f'{kind}:{value}', 'type': kind, 'value': value}
+    if kind == 'division':
+        division = divisions.get(value) or (divisions.get(int(value)) if value.isdigit() else None)
+        if division is None:
+            raise ValueError(f'unknown thematic division {value!r}')
+        selector['value'] = division.code
+        selector['label'] = division.title_english or division.title_latin or division.code
+        return selector, division_predicate(division)
+    if kind == 'sect':
+        return selector, SourceAuthor.sect == value
+    if kind == 'ingredient_id':
+        return selector, Entry.ingredients.any(Ingredient.id == int(value))
+    if kind in ('book', 'source_author_id'):
+        selector['value'] = int(value)
+        return selector, getattr(Entry, kind) == int(value)
+    return selector, getattr(Entry, kind) == value
+
+
+def requested_compare_selectors(args):
+    """[(type, value)] from repeated select=type:value, or the legacy type1/value1/type2/value2 pair"""
+    pairs = []
+    for raw in args.getlist('select'):
+        kind, sep, value = raw.partition(':')
+        if not sep or not value:
+            raise ValueError(f'select must be type:value, got {raw!r}')
+        pairs.append((kind, value))
+    if not pairs:
+        for n in ('1', '2'):
+            if args.get(f'value{n}'):
+                pairs.append((args.get(f'type{n}', 'author'), args.get(f'value{n}')))
+    if not pairs:
+        raise ValueError('give at least one select=type:value')
+    if len(pairs) > COMPARE_MAX_SELECTORS:
+        raise ValueError(f'at most {COMPARE_MAX_SELECTORS} selectors')
+    return pairs
+
+
+def compare_lemma_counts(conditions):
+    """One Counter of lemma occurrences per condition, from a single scan of the matching entries' indices"""
+    counters = [Counter() for _ in conditions]
+    flags = [db.case((condition, 1), else_=0) for condition in conditions]
+    rows = db.session.execute(
+        db.select(Entry.lemma_data, *flags)
+        .outerjoin(SourceAuthor, Entry.source_author_id == SourceAuthor.id)
+        .where(Entry.lemma_data.isnot(None), db.or_(*conditions))
+        .execution_options(yield_per=ENTRY_LOOKUP_CHUNK)
+    )
+    for blob, *matched in rows:
+        counts = dict(zip(*lemma_index_counts(blob)))
+        for counter, hit in zip(counters, matched):
+            if hit:
+                counter.update(counts)
+    return counters
+
+
+def lemma_overlap(a, b):
+    """Weighted Jaccard of two lemma frequency distributions (1 = identical relative frequencies)"""
+    total_a, total_b = sum(a.values()), sum(b.values())
+    if not total_a or not total_b:
+        return 0.0
+    if len(a) > len(b):
+        a, b, total_a, total_b = b, a, total_b, total_a
+    shared = sum(min(n / total_a, b[lemma] / total_b) for lemma, n in a.items() if lemma in b)
+    return shared / (2 - shared)
 
-    count = ThematicDivision.query.count()
-    return jsonify({'message': f'Seeded {count} thematic divisions'})
 
 @app.route('/api/compare', methods=['GET'])
+@read_only_route
+@timed_computation('compare')
 def compare_authors():
-    """Compare word counts between two authors/groups"""
-    type1 = request.args.get('type1', 'author')  # author, author_group, book
-    value1 = request.args.get('value1')
-    type2 = request.args.get('type2', 'author')
-    value2 = request.args.get('value2')
-    
-    def get_stats(filter_type, filter_value):
-        query = Entry.query
-        if filter_type == 'author':
-            query = query.filter(Entry.author == filter_value)
-        elif filter_type == 'author_group':
-            query = query.filter(Entry.author_group == filter_value)
-        elif filter_type == 'book':
-            query = query.filter(Entry.book == int(filter_value))
-        
-        entries = query.all()
-        total_words = sum(e.word_count or 0 for e in entries)
-        return {
-            'name': filter_value,
-            'type': filter_type,
-            'total_words': total_words,
-            'entry_count': len(entries),
-            'avg_words_per_entry': total_words / len(entries) if entries else 0
-        }
-    
-    return jsonify({
-        'item1': get_stats(type1, value1),
-        'item2': get_stats(type2, value2)
-    })
+    """Compare entry and word counts across any number of authors, groups, books, sects or divisions"""
+    breakdown = {b.strip() for b in request.args.get('breakdown', '').split(',') if b.strip()}
+    if breakdown - {'book', 'division'}:
+        return jsonify({'error': 'breakdown takes book and/or division'}), 400
+    divisions = {}
+    for division in ThematicDivision.query.order_by(ThematicDivision.id):
+        divisions[division.id] = division
+        if division.code:
+            divisions[division.code] = division
+    try:
+        pairs = requested_compare_selectors(request.args)
+        resolved = [compare_selector(kind, value, divisions) for kind, value in pairs]
+        top_lemmas = min(int(request.args.get('lemmas', 0)), COMPARE_MAX_LEMMAS)
+    except ValueError as exc:
+        return jsonify({'error': f'Invalid comparison: {exc}'}), 400
+    selectors = [selector for selector, _ in resolved]
+    conditions = [condition for _, condition in resolved]
+
+    # One pass: per selector a matching-entry count and word sum, grouped only as finely as the breakdowns need
+    keys = [Entry.book, Entry.chapter] if 'division' in breakdown else [Entry.book] if 'book' in breakdown else []
+    aggregates = []
+    for condition in conditions:
+        aggregates += [db.func.count(db.case((condition, 1))), db.func.sum(db.case((condition, Entry.word_count)))]
+    query = db.select(*keys, db.func.count(Entry.id), db.func.sum(Entry.word_count), *aggregates) \
+        .outerjoin(SourceAuthor, Entry.source_author_id == SourceAuthor.id)
+    if keys:
+        query = query.group_by(*keys)
+    rows = db.session.execute(query).all()
+
+    corpus = {'entries': 0, 'words': 0}
+    totals = [[0, 0] for _ in selectors]
+    by_book = [defaultdict(lambda: [0, 0]) for _ in selectors]
+    by_division = [defaultdict(lambda: [0, 0]) for _ in selectors]
+    ranged = [d for key, d in divisions.items() if isinstance(key, int) and d.books_start is not None]
+    covering = divisions_by_book(ranged) if 'division' in breakdown else {}
+    for row in rows:
+        book = row[0] if keys else None
+        chapter = row[1] if len(keys) == 2 else None
+        corpus_entries, corpus_words, *counts = row[len(keys):]
+        corpus['entries'] += corpus_entries
+        corpus['words'] += corpus_words or 0
+        inside = [code for code, first, last in covering.get(book, ())
+                  if first is None or (chapter is not None and first <= chapter <= last)]
+        for i in range(len(selectors)):
+            entries, words = counts[2 * i], counts[2 * i + 1] or 0
+            if not entries:
+                continue
+            totals[i][0] += entries
+            totals[i][1] += words
+            if 'book' in breakdown:
+                by_book[i][book][0] += entries
+                by_book[i][book][1] += words
+            for division in inside:
+                by_division[i][division][0] += entries
+                by_division[i][division][1] += words
+
+    for i, selector in enumerate(selectors):
+        entries, words = totals[i]
+        selector.update({
+            'entries': entries,
+            'words': words,
+            'avg_words_per_entry': words / entries if entries else 0,
+            'share_of_words': words / corpus['words'] if corpus['words'] else 0,
+        })
+        if 'book' in breakdown:
+            selector['by_book'] = [{'book': book, 'entries': n, 'words': w}
+                                   for book, (n, w) in sorted(by_book[i].items(), key=lambda item: (item[0] is not None, item[0] or 0))]
+        if 'division' in breakdown:
+            selector['by_division'] = [{'division': code, 'entries': n, 'words': w} for code, (n, w) in by_division[i].items()]
+
+    result = {'corpus': corpus, 'groups': selectors}
+    if 'division' in breakdown:
+        result['divisions'] = [{'code': d.code, 'id': d.id, 'level': d.level, 'parent_id': d.parent_id,
+                                'title': d.title_english or d.title_latin, 'books_start': d.books_start,
+                                'books_end': d.books_end, 'chapter_start': d.chapter_start, 'chapter_end': d.chapter_end}
+                               for d in ranged]
+    if top_lemmas > 0:
+        counters = compare_lemma_counts(conditions)
+        top = [counter.most_common(top_lemmas) for counter in counters]
+        names = lemma_names(list({lemma_id for ranked in top for lemma_id, _ in ranked}))
+        for selector, counter, ranked in zip(selectors, counters, top):
+            occurrences = sum(counter.values())
+            selector['lemma_occurrences'] = occurrences
+            selector['top_lemmas'] = [{'lemma': names.get(lemma_id), 'count': n, 'share': n / occurrences}
+                                      for lemma_id, n in ranked]
+        result['lemma_overlap'] = []
+        for i, j in itertools.combinations(range(len(selectors)), 2):
+            shared = {lemma_id for lemma_id, _ in top[i]} & {lemma_id for lemma_id, _ in top[j]}
+            result['lemma_overlap'].append({
+                'groups': [selectors[i]['key'], selectors[j]['key']],
+                'weighted_jaccard': round(lemma_overlap(counters[i], counters[j]), 4),
+                'shared_top_lemmas': sorted(names.get(lemma_id) for lemma_id in shared),
+            })
+
+    if len(pairs) == 2 and not request.args.getlist('select'):
+        # Shape the old two-item endpoint returned, naming each item by the value string it was given
+        for n, (_, value), selector in zip(('item1', 'item2'), pairs, selectors):
+            result[n] = {'name': value, 'type': selector['type'], 'total_words': selector['words'],
+                         'entry_count': selector['entries'], 'avg_words_per_entry': selector['avg_words_per_entry']}
+    return jsonify(result)
 
 @app.route('/api/history/<int:entry_id>', methods=['GET'])
+@read_only_route
 def get_entry_history(entry_id):
-    """Get edit history for an entry"""
-    history = EditHistory.query.filter_by(entry_id=entry_id).order_by(EditHistory.edited_at.desc()).all()
-    return jsonify([{
-        'id': h.id,
-        'field_changed': h.field_changed,
-        'old_value': h.old_value[:200] + '...' if h.old_value and len(h.old_value) > 200 else h.old_value,
-        'new_value': h.new_value[:200] + '...' if h.new_value and len(h.new_value) > 200 else h.new_value,
-        'editor_name': h.editor_name,
-        'edited_at': h.edited_at.isoformat()
-    } for h in history])
+    """Edit history for an entry, newest first, one page at a time (?offset=&limit=&field=)"""
+    try:
+        offset, limit = requested_page()
+    except ValueError:
+        return jsonify({'error': 'offset and limit must be non-negative integers'}), 400
+    query = db.select(
+        EditHistory.id, EditHistory.field_changed,
+        history_preview(EditHistory.old_preview, EditHistory.old_length).label('old_value'),
+        history_preview(EditHistory.new_preview, EditHistory.new_length).label('new_value'),
+        EditHistory.old_length, EditHistory.new_length, EditHistory.editor_name, EditHistory.edited_at,
+    ).where(EditHistory.entry_id == entry_id)
+    if request.args.get('field'):
+        query = query.where(EditHistory.field_changed == request.args['field'])
+    total = db.session.execute(db.select(db.func.count()).select_from(query.subquery())).scalar()
+    rows = db.session.execute(
+        query.order_by(EditHistory.edited_at.desc(), EditHistory.id.desc())
+        .offset(offset).limit(HISTORY_PAGE_SIZE if limit is None else limit)
+    ).all()
+    response = jsonify([{
+        'id': row.id,
+        'field_changed': row.field_changed,
+        'old_value': row.old_value,
+        'new_value': row.new_value,
+        'old_length': row.old_length,
+        'new_length': row.new_length,
+        'editor_name': row.editor_name,
+        'edited_at': row.edited_at.isoformat()
+    } for row in rows])
+    response.headers['X-Total-Count'] = str(total)
+    return response
+
+@app.route('/api/history/<int:entry_id>/<int:history_id>', methods=['GET'])
+@read_only_route
+def get_history_version(entry_id, history_id):
+    """Full old and new value of one history row, rebuilt from the field's snapshot and deltas"""
+    history = db.session.execute(
+        db.select(EditHistory.field_changed, EditHistory.editor_name, EditHistory.edited_at)
+        .where(EditHistory.id == history_id, EditHistory.entry_id == entry_id)
+    ).first()
+    if history is None:
+        return jsonify({'error': 'History entry not found'}), 404
+    versions = list(replay_history(history_chain(entry_id, history.field_changed, history_id)))
+    _, old_value, new_value = versions[-1]
+    return jsonify({
+        'id': history_id,
+        'entry_id': entry_id,
+        'field_changed': history.field_changed,
+        'old_value': old_value,
+        'new_value': new_value,
+        'editor_name': history.editor_name,
+        'edited_at': history.edited_at.isoformat()
+    })
+
+@app.route('/api/entries/<int:entry_id>/as-of', methods=['GET'])
+@read_only_route
+def get_entry_as_of(entry_id):
+    """The entry as it stood at ?at= (ISO 8601), rebuilt from its edit history; ingredient links are not kept there"""
+    entry = Entry.query.get_or_404(entry_id)
+    try:
+        at = parse_history_time(request.args['at'])
+    except (KeyError, ValueError):
+        return jsonify({'error': 'at must be an ISO 8601 time'}), 400
+    if entry.created_at is not None and at < entry.created_at:
+        return jsonify({'error': f'Entry {entry_id} did not exist at {at.isoformat()}'}), 404
+    restored = {field: old for (_, field), (old, _) in reconstruct_spans(history_spans(at, entry_ids=[entry_id])).items()}
+    # Apply the old values to the loaded entry only to serialize it; nothing is flushed and the rollback drops them.
+    # The lemma index is left alone: rebuilding it may add lexicon rows, and to_dict() does not show it.
+    with db.session.no_autoflush:
+        for field, value in restored.items():
+            setattr(entry, field, history_value(field, value))
+        if 'source_author_id' in restored:
+            entry.source_author_rel = db.session.get(SourceAuthor, entry.source_author_id) if entry.source_author_id else None
+        if 'body_greek' in restored:
+            entry.word_count = len(re.findall(r'\S+', entry.body_greek or ''))
+        if any(field in restored for field in URN_SOURCE_FIELDS):
+            entry.generate_urns()
+        result = entry.to_dict()
+    db.session.rollback()
+    result['as_of'] = at.isoformat()
+    result['restored_fields'] = sorted(restored)
+    return jsonify(result)
+
+@app.route('/api/history/revert', methods=['POST'])
+def revert_history():
+    """
+    Put entry fields back to earlier values from the edit history, in one transaction. The body is either
+    {at, entry_ids?}: every field edited after at (on the listed entries) returns to its value at that time, or
+    {editor, since, until?}: every field that editor changed in the window returns to its value before their
+    first change there; fields changed again after their last one are reported as conflicts unless force is set.
+    dry_run reports what would change without writing. Entries deleted since, or (with at) created after it, are
+    listed under missing rather than restored.
+    """
+    data = request.json or {}
+    dry_run = bool(data.get('dry_run'))
+    check_current = bool(data.get('editor')) and not data.get('force')
+    at = None
+    try:
+        if data.get('editor'):
+            until = parse_history_time(data['until']) if data.get('until') else None
+            spans = history_spans(parse_history_time(data['since']), until, editor=data['editor'])
+        else:
+            entry_ids = [int(entry_id) for entry_id in data['entry_ids']] if data.get('entry_ids') is not None else None
+            at = parse_history_time(data['at'])
+            spans = history_spans(at, entry_ids=entry_ids)
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return jsonify({'error': 'give at (and optionally entry_ids), or editor and since (and optionally until), '
+                                 'with times in ISO 8601'}), 400
+    targets = defaultdict(dict)
+    for (entry_id, field), values in reconstruct_spans(spans).items():
+        targets[entry_id][field] = values
+    editor_name = data.get('editor_name', 'Anonymous')
+    changes, conflicts, missing = [], [], []
+    for chunk in iter_chunks(sorted(targets), ENTRY_LOOKUP_CHUNK):
+        entries = {entry.id: entry for entry in Entry.query.filter(Entry.id.in_(chunk))}
+        previous = latest_history_states(chunk)
+        for entry_id in chunk:
+            entry = entries.get(entry_id)
+            if entry is None or (at is not None and entry.created_at is not None and at < entry.created_at):
+                missing.append(entry_id)
+                continue
+            old_body = entry.body_greek
+            reverted = set()
+            for field, (target, last_value) in sorted(targets[entry_id].items()):
+                current = history_text(getattr(entry, field))
+                if current == target:
+                    continue
+                if check_current and current != last_value:
+                    conflicts.append({'entry_id': entry_id, 'field_changed': field})
+                    continue
+                changes.append({
+                    'entry_id': entry_id,
+                    'field_changed': field,
+                    'value': target[:HISTORY_PREVIEW_CHARS] + '...' if target and len(target) > HISTORY_PREVIEW_CHARS else target
+                })
+                if dry_run:
+                    continue
+                setattr(entry, field, history_value(field, target))
+                db.session.add(EditHistory(
+                    entry_id=entry_id,
+                    field_changed=field,
+                    editor_name=editor_name,
+                    **history_values(current, target, previous.get((entry_id, field)))
+                ))
+                reverted.add(field)
+            if reverted:
+                refresh_derived_fields(entry, reverted, old_body)
+    result = {
+        'dry_run': dry_run,
+        'entries': len({change['entry_id'] for change in changes}),
+        'fields': len(changes),
+        'changes': changes,
+        'conflicts': conflicts,
+        'missing': missing
+    }
+    if dry_run:
+        db.session.rollback()
+        return jsonify(result)
+    db.session.commit()
+    return with_corpus_revision(jsonify(result))
 
 @app.route('/api/export', methods=['GET'])
 def export_csv():
@@ -1705,7 +4774,7 @@ def export_csv():
             e.id, e.author_named, e.author, e.book, e.chapter, e.chapter_title, e.title_greek,
             e.body_greek, e.translation_title, e.translation_content, e.location,
             e.word_count, e.note1, e.note2, e.note3, e.note4,
-            e.author_group, e.pneumatist, e.themes, e.urn
+            e.author_group, e.pneumatist, e.themes, e.urn_cts
         ])
     
     output.seek(0)
@@ -1716,9 +4785,517 @@ def export_csv():
         download_name=f'oribasius_export_{datetime.now().strftime("%Y%m%d")}.csv'
     )
 
+# =============================================================================
+# CHANGE FEED
+# =============================================================================
+
+# Seconds of silence after which the event stream sends a comment so proxies keep it open
+CHANGE_STREAM_KEEPALIVE_SECONDS = 15
+
+
+def corpus_log_state():
+    """(revision, log_floor) as last committed"""
+    row = db.session.execute(
+        db.select(CorpusRevision.revision, CorpusRevision.log_floor).where(CorpusRevision.id == 1)
+    ).first()
+    return (row.revision, row.log_floor or 0) if row else (0, 0)
+
+
+def change_feed(since):
+    """
+    Changes committed after revision `since`, oldest first, with the summary rows of the
+    entries they touched. At most CHANGE_FEED_LIMIT changes, cut between revisions; `more`
+    says to ask again from the returned revision. `reset` means the log no longer reaches
+    back to `since` (or the corpus was replaced), so the client has to reload instead.
+    """
+    revision, floor = corpus_log_state()
+    feed = {'revision': revision, 'reset': since < floor or since > revision, 'more': False,
+            'changes': [], 'entries': []}
+    if feed['reset'] or since == revision:
+        return feed
+
+    limit = app.config['CHANGE_FEED_LIMIT']
+    query = db.select(ChangeLog).where(ChangeLog.revision > since).order_by(ChangeLog.revision, ChangeLog.id)
+    changes = db.session.execute(query.limit(limit + 1)).scalars().all()
+    if len(changes) > limit:
+        # Stop before the revision the limit cut into, unless that one alone is over the limit
+        boundary = changes[limit].revision
+        changes = [c for c in changes if c.revision < boundary] or \
+            db.session.execute(query.where(ChangeLog.revision == boundary)).scalars().all()
+        feed['more'] = True
+        feed['revision'] = changes[-1].revision
+    elif changes:
+        feed['revision'] = max(revision, changes[-1].revision)
+
+    feed['changes'] = [c.to_dict() for c in changes]
+    entry_ids = sorted({c.entity_id for c in changes if c.entity == 'entry' and c.action != 'delete'})
+    for chunk in iter_chunks(entry_ids, ENTRY_LOOKUP_CHUNK):
+        feed['entries'].extend(iter_entry_dicts(Entry.query.filter(Entry.id.in_(chunk)), 'summary', None, False))
+    return feed
+
+
+@app.route('/api/revision', methods=['GET'])
+def get_revision():
+    """Tiny check for clients validating a cached copy of the corpus"""
+    revision, floor = corpus_log_state()
+    count, max_id = db.session.execute(db.select(db.func.count(Entry.id), db.func.max(Entry.id))).one()
+    response = with_corpus_revision(jsonify({
+        'revision': revision,
+        'log_floor': floor,
+        'entries': count,
+        'max_entry_id': max_id or 0
+    }), revision)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def requested_since(value):
+    """A client's last seen revision; ValueError unless a non-negative integer"""
+    since = int(value)
+    if since < 0:
+        raise ValueError('negative revision')
+    return since
+
+
+@app.route('/api/changes', methods=['GET'])
+def get_changes():
+    """Poll for the changes after ?since=<revision> instead of re-reading entries, analytics or maps"""
+    try:
+        since = requested_since(request.args.get('since', ''))
+    except ValueError:
+        return jsonify({'error': 'since must be a non-negative corpus revision'}), 400
+    feed = change_feed(since)
+    return with_corpus_revision(jsonify(feed), feed['revision'])
+
+
+@app.route('/api/changes/stream', methods=['GET'])
+def stream_changes():
+    """
+    Server-sent events: each batch of changes arrives as a 'change' event carrying the
+    /api/changes payload, with the revision it reaches as the event id so a reconnecting
+    EventSource resumes from Last-Event-ID. The stream ends after CHANGE_STREAM_MAX_SECONDS
+    and the browser reconnects.
+    """
+    if not app.config['CHANGE_STREAM_ENABLED']:
+        return jsonify({'error': 'Change stream disabled; poll /api/changes'}), 404
+    since = request.headers.get('Last-Event-ID') or request.args.get('since')
+    try:
+        since = corpus_log_state()[0] if since is None else requested_since(since)
+    except ValueError:
+        return jsonify({'error': 'since must be a non-negative corpus revision'}), 400
+    db.session.close()
+    poll = app.config['CHANGE_STREAM_POLL_SECONDS']
+    lifetime = app.config['CHANGE_STREAM_MAX_SECONDS']
+
+    def generate():
+        last = since
+        started = last_sent = time.monotonic()
+        yield f'retry: {int(poll * 1000)}\n\n'
+        while time.monotonic() - started < lifetime:
+            more = False
+            if corpus_log_state()[0] != last:
+                feed = change_feed(last)
+                last, more = feed['revision'], feed['more']
+                yield f"id: {last}\nevent: change\ndata: {app.json.dumps(feed)}\n\n"
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent >= CHANGE_STREAM_KEEPALIVE_SECONDS:
+                yield ': keepalive\n\n'
+                last_sent = time.monotonic()
+            # Hand the connection back (and end the SQLite read snapshot) between polls
+            db.session.close()
+            if not more:
+                time.sleep(poll)
+
+    response = app.response_class(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def compact_change_log():
+    """
+    Apply the change log retention and compaction settings; returns (dropped, merged) row counts.
+    Dropping old revisions raises the log floor. Merging keeps only the newest row per record
+    among those older than CHANGE_LOG_COMPACT_AFTER_HOURS, with the union of their fields, so
+    deltas from any revision above the floor stay complete, just coarser.
+    """
+    table = ChangeLog.__table__
+    now = datetime.utcnow()
+    dropped = merged = 0
+
+    if app.config['CHANGE_LOG_RETENTION_DAYS']:
+        cutoff = now - timedelta(days=app.config['CHANGE_LOG_RETENTION_DAYS'])
+        floor = db.session.execute(db.select(db.func.max(table.c.revision)).where(table.c.created_at < cutoff)).scalar()
+        if floor is not None:
+            dropped = db.session.execute(table.delete().where(table.c.revision <= floor)).rowcount
+            revisions = CorpusRevision.__table__
+            db.session.execute(revisions.update().where(revisions.c.id == 1, revisions.c.log_floor < floor)
+                               .values(log_floor=floor))
+            db.session.commit()
+
+    if app.config['CHANGE_LOG_COMPACT_AFTER_HOURS']:
+        cutoff = now - timedelta(hours=app.config['CHANGE_LOG_COMPACT_AFTER_HOURS'])
+        rows = db.session.execute(
+            db.select(table.c.id, table.c.entity, table.c.entity_id, table.c.action, table.c.fields)
+            .where(table.c.created_at < cutoff, table.c.entity_id.isnot(None))
+            .order_by(table.c.revision, table.c.id)
+        ).all()
+        groups = defaultdict(list)
+        for row in rows:
+            groups[(row.entity, row.entity_id)].append(row)
+        kept, stale = [], []
+        for group in groups.values():
+            if len(group) < 2:
+                continue
+            actions = {row.action for row in group}
+            if group[-1].action == 'delete' or 'create' in actions:
+                action, fields = ('delete' if group[-1].action == 'delete' else 'create'), None
+            else:
+                action = 'update'
+                fields = json.dumps(sorted(set().union(*(json.loads(row.fields or '[]') for row in group))))
+            kept.append({'row_id': group[-1].id, 'merged_action': action, 'merged_fields': fields})
+            stale.extend(row.id for row in group[:-1])
+        if kept:
+            db.session.execute(
+                table.update().where(table.c.id == db.bindparam('row_id'))
+                .values(action=db.bindparam('merged_action'), fields=db.bindparam('merged_fields')),
+                kept
+            )
+            for chunk in iter_chunks(stale, ENTRY_LOOKUP_CHUNK):
+                db.session.execute(table.delete().where(table.c.id.in_(chunk)))
+            db.session.commit()
+            merged = len(stale)
+    return dropped, merged
+
+
+@app.route('/api/changes/compact', methods=['POST'])
+def compact_changes():
+    """Queue change log retention and compaction as a background job"""
+    return enqueue_job_response('compact-changes', job_compact_change_log)
+
+
+def job_compact_change_log(job, payload):
+    dropped, merged = compact_change_log()
+    return {'message': f'Dropped {dropped} and merged {merged} change log rows', 'dropped': dropped, 'merged': merged}
+
+# =============================================================================
+# COLUMNAR EXPORT / IMPORT (Arrow IPC, Parquet)
+# =============================================================================
+
+# Entry columns as exported; source_author/source_author_sect are denormalized from SourceAuthor
+# and lemma_index is the packed lemma_data expanded back to {lemma: [positions]} JSON
+ENTRY_COLUMNAR_FIELDS = [
+    ('id', 'int32'), ('author_named', 'string'), ('source_author_id', 'int32'),
+    ('source_author', 'string'), ('source_author_sect', 'string'),
+    ('author', 'string'), ('author_group', 'string'),
+    ('book', 'int32'), ('chapter', 'int32'), ('section', 'int32'), ('chapter_title', 'string'),
+    ('raeder_volume', 'string'), ('raeder_page', 'int32'),
+    ('raeder_line_start', 'int32'), ('raeder_line_end', 'int32'),
+    ('title_greek', 'string'), ('body_greek', 'string'),
+    ('translation_title', 'string'), ('translation_content', 'string'),
+    ('location', 'string'), ('word_count', 'int32'),
+    ('note1', 'string'), ('note2', 'string'), ('note3', 'string'), ('note4', 'string'),
+    ('pneumatist', 'string'), ('themes', 'string'),
+    ('urn_cts', 'string'), ('urn_raeder', 'string'),
+    ('created_at', 'timestamp'), ('updated_at', 'timestamp'),
+    ('lemma_index', 'string'),
+]
+ENTRY_COLUMNAR_DERIVED = {'source_author', 'source_author_sect', 'lemma_index'}
+
+LEMMA_COLUMNAR_FIELDS = [
+    ('entry_id', 'int32'), ('lemma', 'string'), ('frequency', 'int32'), ('positions', 'list<int32>'),
+]
+
+COLUMNAR_FORMATS = {
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+
+def arrow_type(name):
+    return {
+        'int32': pa.int32(),
+        'string': pa.string(),
+        'timestamp': pa.timestamp('us'),
+        'list<int32>': pa.list_(pa.int32()),
+    }[name]
+
+
+class ChunkSink:
+    """Write-only file object buffering writer output so it can be streamed out chunk by chunk"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def iter_entry_columnar_rows(query, lemma_filter, columns):
+    """Yield plain dicts for the requested entry columns straight from SQL rows"""
+    authors = {a.id: (a.name, a.sect) for a in SourceAuthor.query.all()}
+    db_columns = [c for c in columns if c not in ENTRY_COLUMNAR_DERIVED]
+    needed = set(db_columns) | {'id', 'source_author_id'}
+    if 'lemma_index' in columns:
+        needed.add('lemma_data')
+    rows = query.with_entities(*[getattr(Entry, c) for c in sorted(needed)])
+    for row in rows.yield_per(app.config['COLUMNAR_ROW_GROUP_SIZE']):
+        if lemma_filter is not None and row.id not in lemma_filter:
+            continue
+        record = {c: getattr(row, c) for c in db_columns}
+        author = authors.get(row.source_author_id)
+        if 'source_author' in columns:
+            record['source_author'] = author[0] if author else None
+        if 'source_author_sect' in columns:
+            record['source_author_sect'] = author[1] if author else None
+        if 'lemma_index' in columns:
+            # Exported as {lemma: [positions]} JSON so files stay readable without the lexicon
+            record['lemma_index'] = json.dumps(decode_lemma_index(row.lemma_data), ensure_ascii=False) if row.lemma_data else None
+        yield record
+
+
+def iter_lemma_columnar_rows(query, lemma_filter, columns):
+    """Yield one posting row (entry, lemma, positions) per lemma of each matching entry"""
+    rows = query.with_entities(Entry.id, Entry.lemma_data)
+    for row in rows.yield_per(app.config['COLUMNAR_ROW_GROUP_SIZE']):
+        if not row.lemma_data:
+            continue
+        if lemma_filter is not None and row.id not in lemma_filter:
+            continue
+        try:
+            index = decode_lemma_index(row.lemma_data)
+        except (struct.error, ValueError, KeyError):
+            continue
+        for lemma, positions in index.items():
+            record = {'entry_id': row.id, 'lemma': lemma, 'frequency': len(positions), 'positions': positions}
+            yield {c: record[c] for c in columns}
+
+
+def stream_columnar(schema, records, fmt):
+    """Encode records as Arrow IPC stream or Parquet, yielding bytes after each row group"""
+    row_group_size = app.config['COLUMNAR_ROW_GROUP_SIZE']
+    sink = ChunkSink()
+    writer = pq.ParquetWriter(sink, schema) if fmt == 'parquet' else pa.ipc.new_stream(sink, schema)
+
+    def write_batch(batch):
+        table = pa.Table.from_pylist(batch, schema=schema)
+        if fmt == 'parquet':
+            writer.write_table(table, row_group_size=row_group_size)
+        else:
+            writer.write_table(table, max_chunksize=row_group_size)
+
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= row_group_size:
+            write_batch(batch)
+            batch = []
+            yield sink.drain()
+    if batch:
+        write_batch(batch)
+    writer.close()
+    yield sink.drain()
+
+
+@app.route('/api/export/columnar', methods=['GET'])
+def export_columnar():
+    """
+    Export entries (dataset=entries) or derived lemma postings (dataset=lemmas)
+    as Arrow IPC stream (format=arrow) or Parquet (format=parquet).
+    Accepts the /api/entries filters and an optional comma-separated columns list.
+    """
+    if pa is None:
+        return jsonify({'error': 'Columnar export requires pyarrow'}), 501
+
+    fmt = request.args.get('format', 'parquet')
+    if fmt not in COLUMNAR_FORMATS:
+        return jsonify({'error': f'Unknown format: {fmt}'}), 400
+    dataset = request.args.get('dataset', 'entries')
+    if dataset not in ('entries', 'lemmas'):
+        return jsonify({'error': f'Unknown dataset: {dataset}'}), 400
+
+    fields = ENTRY_COLUMNAR_FIELDS if dataset == 'entries' else LEMMA_COLUMNAR_FIELDS
+    available = [name for name, _ in fields]
+    columns = available
+    if request.args.get('columns'):
+        columns = [c.strip() for c in request.args.get('columns').split(',') if c.strip()]
+        unknown = [c for c in columns if c not in available]
+        if unknown:
+            return jsonify({'error': f"Unknown columns: {', '.join(unknown)}", 'available': available}), 400
+
+    types = dict(fields)
+    schema = pa.schema([(c, arrow_type(types[c])) for c in columns])
+    try:
+        query, lemma_filter = build_entries_query(request.args)
+    except LemmaQueryError as exc:
+        return jsonify({'error': str(exc)}), 400
+    except ValueError as exc:
+        return jsonify({'error': f'Invalid filter: {exc}'}), 400
+    if dataset == 'entries':
+        records = iter_entry_columnar_rows(query, lemma_filter, columns)
+    else:
+        records = iter_lemma_columnar_rows(query, lemma_filter, columns)
+
+    mimetype, extension = COLUMNAR_FORMATS[fmt]
+    response = app.response_class(stream_with_context(stream_columnar(schema, records, fmt)), mimetype=mimetype)
+    filename = f'oribasius_{dataset}_{datetime.now().strftime("%Y%m%d")}.{extension}'
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
+
+
+@app.route('/api/import/columnar', methods=['POST'])
+def import_columnar():
+    """Queue a bulk import of an entries export in Arrow IPC (stream or file) or Parquet format"""
+    if pa is None:
+        return jsonify({'error': 'Columnar import requires pyarrow'}), 501
+    if 'file' not in request.files:
+        return jsonify({'error': 'No file provided'}), 400
+
+    file = request.files['file']
+    if not file.filename.endswith(('.parquet', '.arrow', '.arrows', '.feather')):
+        return jsonify({'error': 'File must be .parquet, .arrow, .arrows or .feather'}), 400
+
+    params = {
+        'filename': file.filename,
+        'preserve_ids': request.form.get('preserve_ids', 'true').lower() == 'true'
+    }
+    data = file.read()
+    if params['preserve_ids']:
+        try:
+            clashes = colliding_entry_ids(data, file.filename)
+        except pa.ArrowException as exc:
+            return jsonify({'error': f'Unreadable {file.filename}: {exc}'}), 400
+        if clashes:
+            return jsonify({
+                'error': f'{len(clashes)} imported id(s) already exist; '
+                         'import with preserve_ids=false to assign new ids',
+                'ids': clashes[:20]
+            }), 409
+    return enqueue_job_response('import', job_import_columnar, params=params,
+                                payload=(data, file.filename, params['preserve_ids']))
+
+
+def read_columnar_batches(data, filename):
+    if filename.endswith('.parquet'):
+        yield from pq.ParquetFile(pa.BufferReader(data)).iter_batches(batch_size=app.config['COLUMNAR_ROW_GROUP_SIZE'])
+        return
+    buffer = pa.BufferReader(data)
+    try:
+        reader = pa.ipc.open_stream(buffer)
+        yield from reader
+    except pa.ArrowInvalid:
+        reader = pa.ipc.open_file(pa.BufferReader(data))
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i)
+
+
+def colliding_entry_ids(data, filename):
+    """Ids in a columnar entries export that are already taken in this database"""
+    ids = []
+    for batch in read_columnar_batches(data, filename):
+        if 'id' in batch.schema.names:
+            ids.extend(entry_id for entry_id in batch.column('id').to_pylist() if entry_id is not None)
+    clashes = []
+    for chunk in iter_chunks(sorted(set(ids)), ENTRY_LOOKUP_CHUNK):
+        clashes.extend(row[0] for row in db.session.execute(db.select(Entry.id).where(Entry.id.in_(chunk))))
+    return clashes
+
+
+def job_import_columnar(job, payload):
+    """Bulk-insert exported entry rows batch by batch, reusing stored lemma indices when present"""
+    data, filename, preserve_ids = payload
+    # Checked again here since batches commit one by one: a clash found mid-import would leave it half done
+    if preserve_ids:
+        clashes = colliding_entry_ids(data, filename)
+        if clashes:
+            raise ValueError(f'{len(clashes)} imported id(s) already exist (e.g. {clashes[0]}); '
+                             'import with preserve_ids=false to assign new ids')
+    entry_columns = {c.name for c in Entry.__table__.columns}
+    author_ids = {a.name.strip().lower(): a.id for a in SourceAuthor.query.all() if a.name}
+    count = 0
+    new_authors = 0
+    job.progress(0)
+
+    for batch in read_columnar_batches(data, filename):
+        rows = []
+        for record in batch.to_pylist():
+            author_name = record.get('source_author')
+            if author_name:
+                # Authors are matched by name so ids need not agree between source and target databases
+                key = author_name.strip().lower()
+                if key not in author_ids:
+                    author = SourceAuthor(name=author_name.strip(), sect=record.get('source_author_sect') or 'Unknown')
+                    db.session.add(author)
+                    db.session.flush()
+                    author_ids[key] = author.id
+                    new_authors += 1
+                record['source_author_id'] = author_ids[key]
+
+            row = {k: v for k, v in record.items() if k in entry_columns}
+            if not preserve_ids:
+                row.pop('id', None)
+            body = row.get('body_greek')
+            try:
+                stored_index = json.loads(record['lemma_index']) if record.get('lemma_index') else None
+            except ValueError:
+                stored_index = None
+            if stored_index:
+                row['lemma_data'] = encode_lemma_index(stored_index)
+            elif body:
+                row['lemma_data'] = build_lemma_index(body)
+            row['token_offsets'] = build_token_offsets(body)
+            if body and not row.get('word_count'):
+                row['word_count'] = len(re.findall(r'\S+', body))
+            if not row.get('urn_cts') and not row.get('urn_raeder'):
+                entry = Entry(**{k: v for k, v in row.items() if k != 'id'})
+                entry.generate_urns()
+                row['urn_cts'], row['urn_raeder'] = entry.urn_cts, entry.urn_raeder
+            rows.append(row)
+
+        if rows:
+            db.session.execute(db.insert(Entry), rows)
+            log_bulk_corpus_change(db.session, 'import')
+            db.session.commit()
+            # Core inserts skip the flush hooks, so index the new rows' lemmas explicitly
+            backfill_lemma_postings()
+            count += len(rows)
+        job.progress(count)
+
+    if preserve_ids and db.engine.dialect.name == 'postgresql':
+        # Explicit ids bypass the sequence; move it past the imported rows
+        db.session.execute(text(
+            "SELECT setval(pg_get_serial_sequence('entries', 'id'), COALESCE((SELECT MAX(id) FROM entries), 1))"
+        ))
+        db.session.commit()
+
+    msg = f"Imported {count} entries"
+    if new_authors:
+        msg += f" and created {new_authors} source author(s)"
+    return {'message': msg, 'count': count, 'new_authors': new_authors}
+
+
 @app.route('/api/import', methods=['POST'])
 def import_csv():
-    """Import data from CSV"""
+    """Validate an uploaded CSV and queue its import as a background job"""
     if 'file' not in request.files:
         return jsonify({'error': 'No file provided'}), 400
     
@@ -1731,10 +5308,19 @@ def import_csv():
     if not reader.fieldnames:
         return jsonify({'error': 'CSV missing header row'}), 400
 
+    return enqueue_job_response('import', job_import_csv, params={'filename': file.filename}, payload=content)
+
+
+def job_import_csv(job, content):
+    """Import entries from CSV text, committing in batches so progress stays visible"""
+    reader = csv.DictReader(io.StringIO(content))
+    reader_fields = reader.fieldnames or []
+    rows = list(reader)
+
     def normalize_header(name):
         return re.sub(r'[^a-z0-9]+', '_', name.strip().lower())
 
-    field_lookup = {normalize_header(name): name for name in reader.fieldnames}
+    field_lookup = {normalize_header(name): name for name in reader_fields}
 
     def get_value(row, *candidates):
         for candidate in candidates:
@@ -1759,11 +5345,14 @@ def import_csv():
         except ValueError:
             return None
 
-    author_cache = {}
+    author_cache = {}  # lowercased name -> SourceAuthor id
     count = 0
     new_authors = 0
+    batch_size = app.config['JOB_BATCH_SIZE']
+    total = len(rows)
+    job.progress(0, total)
 
-    for row in reader:
+    for row in rows:
         author_named = get_value(row, 'Author Named', 'author_named')
         author_name = get_value(row, 'Author', 'author')
         author_group = get_value(row, 'Author Group', 'author_group')
@@ -1793,13 +5382,13 @@ def import_csv():
         pneumatist_value = get_value(row, 'Pneumatist (+ Antyllus)', 'Pneumatist', 'Medical Sect', 'Sect', 'pneumatist')
         sect_value = get_value(row, 'Medical Sect', 'Sect', 'Pneumatist (+ Antyllus)', 'Pneumatist')
 
-        source_author = None
+        source_author_id = None
         if author_name:
             key = author_name.strip().lower()
             if key not in author_cache:
                 existing = SourceAuthor.query.filter(db.func.lower(SourceAuthor.name) == key).first()
                 if existing:
-                    author_cache[key] = existing
+                    author_cache[key] = existing.id
                 else:
                     cleaned_sect = sect_value.strip() if sect_value else None
                     sect_certain = True
@@ -1813,14 +5402,14 @@ def import_csv():
                     )
                     db.session.add(new_author)
                     db.session.flush()
-                    author_cache[key] = new_author
+                    author_cache[key] = new_author.id
                     new_authors += 1
-            source_author = author_cache.get(key)
+            source_author_id = author_cache.get(key)
 
         entry = Entry(
             author_named=author_named,
             author=author_name,
-            source_author_id=source_author.id if source_author else None,
+            source_author_id=source_author_id,
             author_group=author_group,
             book=book,
             chapter=chapter,
@@ -1844,7 +5433,8 @@ def import_csv():
         )
 
         if entry.body_greek:
-            entry.lemma_index = build_lemma_index(entry.body_greek)
+            entry.lemma_data = build_lemma_index(entry.body_greek)
+            entry.token_offsets = build_token_offsets(entry.body_greek)
             if not word_count:
                 entry.word_count = len(re.findall(r'\S+', entry.body_greek))
         entry.generate_urns()
@@ -1852,11 +5442,16 @@ def import_csv():
         db.session.add(entry)
         count += 1
 
+        if count % batch_size == 0:
+            db.session.commit()
+            job.progress(count, total)
+
     db.session.commit()
+    job.progress(count, total)
     msg = f"Imported {count} entries"
     if new_authors:
         msg += f" and created {new_authors} source author(s)"
-    return jsonify({'message': msg})
+    return {'message': msg, 'count': count, 'new_authors': new_authors}
 
 @app.route('/api/themes', methods=['GET'])
 def get_themes():
@@ -1881,59 +5476,299 @@ def reset_database():
     if confirm != 'RESET':
         return jsonify({'error': 'Confirmation required'}), 400
 
-    try:
-        db.session.execute(entry_ingredients.delete())
-        EditHistory.query.delete()
-        Entry.query.delete()
-        message = 'Cleared all entries'
-
-        if scope == 'all':
-            Ingredient.query.delete()
-            SourceAuthor.query.delete()
-            Theme.query.delete()
-            message = 'Cleared all entries, ingredients, source authors, and themes'
-
+    return enqueue_job_response('reset', job_reset_database, params={'scope': scope}, payload=scope)
+
+
+def job_reset_database(job, scope):
+    # Delete entries batch by batch, committing and reporting progress after each like iter_entry_batches
+    ids = [row[0] for row in db.session.query(Entry.id).order_by(Entry.id).all()]
+    total = len(ids)
+    batch_size = app.config['JOB_BATCH_SIZE']
+    job.progress(0, total)
+    for start in range(0, total, batch_size):
+        batch_ids = ids[start:start + batch_size]
+        db.session.execute(entry_ingredients.delete().where(entry_ingredients.c.entry_id.in_(batch_ids)))
+        EditHistory.query.filter(EditHistory.entry_id.in_(batch_ids)).delete(synchronize_session=False)
+        LemmaPosting.query.filter(LemmaPosting.entry_id.in_(batch_ids)).delete(synchronize_session=False)
+        Entry.query.filter(Entry.id.in_(batch_ids)).delete(synchronize_session=False)
+        log_bulk_corpus_change(db.session, 'reset')
         db.session.commit()
-        if scope == 'all':
-            # Recreate schema helpers so future imports work smoothly
-            bootstrap_source_authors()
-            link_entries_to_source_authors()
-        return jsonify({'message': message})
-    except Exception as exc:
-        db.session.rollback()
-        return jsonify({'error': f'Failed to reset: {exc}'}), 500
+        job.progress(start + len(batch_ids), total)
+
+    # Whatever was added meanwhile, and history left by entries deleted earlier
+    db.session.execute(entry_ingredients.delete())
+    EditHistory.query.delete()
+    LemmaPosting.query.delete()
+    Entry.query.delete()
+    message = 'Cleared all entries'
+
+    if scope == 'all':
+        Ingredient.query.delete()
+        SourceAuthor.query.delete()
+        Theme.query.delete()
+        message = 'Cleared all entries, ingredients, source authors, and themes'
+
+    log_bulk_corpus_change(db.session, 'reset')
+    db.session.commit()
+    if scope == 'all':
+        # Recreate schema helpers so future imports work smoothly
+        bootstrap_source_authors()
+        link_entries_to_source_authors()
+    return {'message': message, 'scope': scope}
 
 # URN generation helper
 @app.route('/api/generate-urn/<int:entry_id>', methods=['POST'])
 def generate_urn(entry_id):
-    """Generate CTS and Raeder URNs for an entry"""
+    """Generate CTS and Raeder URNs for an entry; returns the whole updated entry"""
     entry = Entry.query.get_or_404(entry_id)
     entry.generate_urns()
     db.session.commit()
-    return jsonify({'urn_cts': entry.urn_cts, 'urn_raeder': entry.urn_raeder})
+    return with_corpus_revision(jsonify(entry.to_dict(include_ingredients=True)))
 
 @app.route('/api/reindex-lemmas', methods=['POST'])
 def reindex_lemmas():
-    """Rebuild lemma indices for all entries"""
-    entries = Entry.query.all()
+    """Queue a rebuild of lemma indices for all entries"""
+    return enqueue_job_response('reindex-lemmas', job_reindex_lemmas)
+
+
+def job_reindex_lemmas(job, payload):
     count = 0
-    for entry in entries:
-        if entry.body_greek:
-            entry.lemma_index = build_lemma_index(entry.body_greek)
-            count += 1
-    db.session.commit()
-    return jsonify({'message': f'Reindexed {count} entries'})
+    for batch in iter_entry_batches(job):
+        for entry in batch:
+            if entry.body_greek:
+                entry.lemma_data = build_lemma_index(entry.body_greek)
+                entry.token_offsets = build_token_offsets(entry.body_greek)
+                count += 1
+        db.session.flush()
+        # Rewrite postings even where lemma_data came out unchanged, so a reindex also repairs them
+        write_lemma_postings(db.session, [(entry.id, entry.lemma_data) for entry in batch])
+    return {'message': f'Reindexed {count} entries', 'count': count}
 
 @app.route('/api/generate-all-urns', methods=['POST'])
 def generate_all_urns():
-    """Generate URNs for all entries"""
-    entries = Entry.query.all()
+    """Queue URN generation for all entries"""
+    return enqueue_job_response('generate-all-urns', job_generate_all_urns)
+
+
+def job_generate_all_urns(job, payload):
     count = 0
-    for entry in entries:
-        entry.generate_urns()
-        count += 1
-    db.session.commit()
-    return jsonify({'message': f'Generated URNs for {count} entries'})
+    for batch in iter_entry_batches(job):
+        for entry in batch:
+            entry.generate_urns()
+            count += 1
+    return {'message': f'Generated URNs for {count} entries', 'count': count}
+
+# =============================================================================
+# BACKGROUND JOBS
+# =============================================================================
+
+job_executor = ThreadPoolExecutor(max_workers=app.config['JOB_WORKERS'], thread_name_prefix='maintenance-job')
+jobs_table = MaintenanceJob.__table__
+
+
+class JobCancelled(Exception):
+    """Raised inside a job once cancellation has been requested"""
+
+
+class JobContext:
+    """
+    Handle passed to job functions. Progress reports double as heartbeat and
+    cancellation checkpoint; call them between commits so the job's own
+    session holds no write lock while the jobs table is updated.
+    """
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.done = 0
+
+    def progress(self, done, total=None, message=None):
+        self.done = done
+        values = {'progress': done, 'heartbeat_at': datetime.utcnow()}
+        if total is not None:
+            values['total'] = total
+        if message:
+            values['message'] = message
+        update_job_row(self.job_id, **values)
+        if self.cancel_requested():
+            raise JobCancelled()
+
+    def cancel_requested(self):
+        with db.engine.connect() as conn:
+            return bool(conn.execute(
+                db.select(jobs_table.c.cancel_requested).where(jobs_table.c.id == self.job_id)
+            ).scalar())
+
+
+def update_job_row(job_id, **values):
+    # Job bookkeeping goes through Core so it is never discarded by DEMO_MODE's session commit
+    with db.engine.begin() as conn:
+        conn.execute(jobs_table.update().where(jobs_table.c.id == job_id).values(**values))
+
+
+def expire_stale_jobs(job_type):
+    """Release the slot held by a job whose worker stopped sending heartbeats"""
+    cutoff = datetime.utcnow() - timedelta(seconds=app.config['JOB_STALE_SECONDS'])
+    with db.engine.begin() as conn:
+        conn.execute(jobs_table.update().where(
+            jobs_table.c.active_key == job_type,
+            db.or_(jobs_table.c.heartbeat_at.is_(None), jobs_table.c.heartbeat_at < cutoff)
+        ).values(
+            active_key=None,
+            status='failed',
+            error='Job abandoned (no heartbeat)',
+            finished_at=datetime.utcnow()
+        ))
+
+
+def enqueue_job(job_type, func, params=None, payload=None):
+    """
+    Record a job and submit it to the executor.
+    Returns (job_id, None) or (None, active_job_id) if a job of this type is already active.
+    """
+    expire_stale_jobs(job_type)
+    job_id = uuid.uuid4().hex
+    now = datetime.utcnow()
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(jobs_table.insert().values(
+                id=job_id,
+                job_type=job_type,
+                active_key=job_type,
+                status='queued',
+                progress=0,
+                params=json.dumps(params or {}),
+                cancel_requested=False,
+                worker_pid=os.getpid(),
+                created_at=now,
+                heartbeat_at=now
+            ))
+    except IntegrityError:
+        with db.engine.connect() as conn:
+            active_id = conn.execute(
+                db.select(jobs_table.c.id).where(jobs_table.c.active_key == job_type)
+            ).scalar()
+        return None, active_id
+
+    job_executor.submit(run_job, job_id, job_type, func, payload)
+    return job_id, None
+
+
+def enqueue_job_response(job_type, func, params=None, payload=None):
+    job_id, active_id = enqueue_job(job_type, func, params=params, payload=payload)
+    if job_id is None:
+        active = db.session.get(MaintenanceJob, active_id) if active_id else None
+        return jsonify({
+            'error': f'A {job_type} job is already running',
+            'job': active.to_dict() if active else None
+        }), 409
+
+    job = db.session.get(MaintenanceJob, job_id)
+    status_url = url_for('get_job', job_id=job_id)
+    response = jsonify({'message': f'Queued {job_type} job', 'job': job.to_dict(), 'status_url': status_url})
+    response.status_code = 202
+    response.headers['Location'] = status_url
+    return response
+
+
+def job_error_message(exc, limit=300):
+    """
+    Short description of a job failure for /api/jobs. Database errors carry the whole
+    statement and its parameters (entry bodies included), so only the driver's own
+    message is kept; the full traceback goes to the log.
+    """
+    if isinstance(exc, DBAPIError):
+        message = f'{type(exc.orig).__name__}: {exc.orig}'
+    elif isinstance(exc, SQLAlchemyError):
+        message = type(exc).__name__
+    else:
+        message = str(exc) or type(exc).__name__
+    return message if len(message) <= limit else message[:limit - 1] + '…'
+
+
+def run_job(job_id, job_type, func, payload):
+    with app.app_context():
+        job = JobContext(job_id)
+        started = datetime.utcnow()
+        clock = time.perf_counter()
+        status = 'failed'
+        update_job_row(job_id, status='running', started_at=started, heartbeat_at=started)
+        try:
+            if job.cancel_requested():
+                raise JobCancelled()
+            result = func(job, payload) or {}
+            status = 'succeeded'
+            update_job_row(
+                job_id,
+                status=status,
+                active_key=None,
+                result=json.dumps(result, ensure_ascii=False),
+                message=result.get('message'),
+                finished_at=datetime.utcnow()
+            )
+        except JobCancelled:
+            db.session.rollback()
+            status = 'cancelled'
+            update_job_row(
+                job_id,
+                status=status,
+                active_key=None,
+                message=f'Cancelled after {job.done} item(s)',
+                finished_at=datetime.utcnow()
+            )
+        except Exception as exc:
+            db.session.rollback()
+            logging.exception("Job %s (%s) failed", job_id, func.__name__)
+            update_job_row(
+                job_id,
+                status=status,
+                active_key=None,
+                error=job_error_message(exc),
+                finished_at=datetime.utcnow()
+            )
+        finally:
+            record_job_finished(job_type, status, time.perf_counter() - clock, job.done)
+
+
+def iter_entry_batches(job):
+    """Yield entries in id-ordered batches, committing and reporting progress after each"""
+    ids = [row[0] for row in db.session.query(Entry.id).order_by(Entry.id).all()]
+    total = len(ids)
+    batch_size = app.config['JOB_BATCH_SIZE']
+    job.progress(0, total)
+    for start in range(0, total, batch_size):
+        batch_ids = ids[start:start + batch_size]
+        yield Entry.query.filter(Entry.id.in_(batch_ids)).order_by(Entry.id).all()
+        db.session.commit()
+        job.progress(start + len(batch_ids), total)
+
+
+@app.route('/api/jobs', methods=['GET'])
+def get_jobs():
+    """List recent maintenance jobs, newest first"""
+    query = MaintenanceJob.query
+    if request.args.get('type'):
+        query = query.filter(MaintenanceJob.job_type == request.args.get('type'))
+    if request.args.get('status'):
+        query = query.filter(MaintenanceJob.status == request.args.get('status'))
+    limit = max(1, min(request.args.get('limit', 50, type=int), 500))
+    jobs = query.order_by(MaintenanceJob.created_at.desc()).limit(limit).all()
+    return jsonify([j.to_dict() for j in jobs])
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = MaintenanceJob.query.get_or_404(job_id)
+    return jsonify(job.to_dict())
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Request cancellation; the job stops at its next progress checkpoint"""
+    job = MaintenanceJob.query.get_or_404(job_id)
+    if job.status not in ('queued', 'running'):
+        return jsonify({'error': f'Job already {job.status}', 'job': job.to_dict()}), 409
+    update_job_row(job_id, cancel_requested=True)
+    db.session.refresh(job)
+    return jsonify(job.to_dict()), 202
 
 
 def build_author_colors(authors_set):
@@ -1952,6 +5787,111 @@ def run_schema_migrations():
         if 'chapter_title' not in columns:
             with db.engine.begin() as conn:
                 conn.execute(text('ALTER TABLE entries ADD COLUMN chapter_title VARCHAR(100)'))
+        blob_type = 'BYTEA' if db.engine.dialect.name == 'postgresql' else 'BLOB'
+        for column in ('lemma_data', 'token_offsets'):
+            if column not in columns:
+                with db.engine.begin() as conn:
+                    conn.execute(text(f'ALTER TABLE entries ADD COLUMN {column} {blob_type}'))
+    if 'edit_history' in tables:
+        columns = {col['name'] for col in inspector.get_columns('edit_history')}
+        blob_type = 'BYTEA' if db.engine.dialect.name == 'postgresql' else 'BLOB'
+        added = [('snapshot', blob_type), ('delta', blob_type), ('chain', 'INTEGER'), ('old_length', 'INTEGER'),
+                 ('new_length', 'INTEGER'), ('new_crc', 'BIGINT'), ('old_preview', 'VARCHAR(200)'),
+                 ('new_preview', 'VARCHAR(200)')]
+        for column, column_type in added:
+            if column not in columns:
+                with db.engine.begin() as conn:
+                    conn.execute(text(f'ALTER TABLE edit_history ADD COLUMN {column} {column_type}'))
+        with db.engine.begin() as conn:
+            for index in EditHistory.__table__.indexes:
+                index.create(conn, checkfirst=True)
+    if 'corpus_revision' in tables:
+        columns = {col['name'] for col in inspector.get_columns('corpus_revision')}
+        if 'log_floor' not in columns:
+            with db.engine.begin() as conn:
+                conn.execute(text('ALTER TABLE corpus_revision ADD COLUMN log_floor INTEGER'))
+
+
+def migrate_lemma_indices(batch_size=500):
+    """
+    Convert legacy JSON lemma_index rows into packed lemma_data, batch by batch.
+    The JSON is cleared as rows convert, so an interrupted run resumes where it stopped;
+    SQLite only returns the freed pages after a VACUUM.
+    """
+    columns = {col['name'] for col in inspect(db.engine).get_columns('entries')}
+    if 'lemma_index' not in columns:
+        return
+    select_batch = text(
+        'SELECT id, lemma_index, body_greek FROM entries '
+        'WHERE lemma_index IS NOT NULL AND lemma_data IS NULL ORDER BY id LIMIT :limit'
+    )
+    update_row = text('UPDATE entries SET lemma_data = :data, lemma_index = NULL WHERE id = :entry_id') \
+        .bindparams(db.bindparam('data', type_=db.LargeBinary))
+    converted = 0
+    while True:
+        rows = db.session.execute(select_batch, {'limit': batch_size}).all()
+        if not rows:
+            break
+        updates = []
+        for entry_id, legacy, body in rows:
+            try:
+                data = encode_lemma_index(json.loads(legacy))
+            except (TypeError, ValueError, AttributeError):
+                data = build_lemma_index(body)
+            updates.append({'entry_id': entry_id, 'data': data})
+        db.session.execute(update_row, updates)
+        db.session.commit()
+        converted += len(rows)
+    if converted:
+        app.logger.info("Converted %d lemma indices to packed lexicon form", converted)
+
+
+def migrate_edit_history(batch_size=500):
+    """
+    Convert legacy full-text history rows into snapshots and deltas, batch by batch in id order.
+    The text columns are cleared as rows convert, so an interrupted run resumes where it stopped;
+    SQLite only returns the freed pages after a VACUUM.
+    """
+    columns = {col['name'] for col in inspect(db.engine).get_columns('edit_history')}
+    if 'old_value' not in columns:
+        return
+    select_batch = text(
+        'SELECT id, entry_id, field_changed, old_value, new_value FROM edit_history '
+        'WHERE chain IS NULL ORDER BY id LIMIT :limit'
+    )
+    update_row = text(
+        'UPDATE edit_history SET snapshot = :snapshot, delta = :delta, chain = :chain, '
+        'old_length = :old_length, new_length = :new_length, new_crc = :new_crc, '
+        'old_preview = :old_preview, new_preview = :new_preview, old_value = NULL, new_value = NULL '
+        'WHERE id = :history_id'
+    ).bindparams(db.bindparam('snapshot', type_=db.LargeBinary), db.bindparam('delta', type_=db.LargeBinary))
+    # Chains already converted by an interrupted run continue where they stopped
+    latest = db.select(db.func.max(EditHistory.id)).where(EditHistory.chain.isnot(None)) \
+        .group_by(EditHistory.entry_id, EditHistory.field_changed)
+    previous = {
+        (entry_id, field): (chain, length, crc) for entry_id, field, chain, length, crc in db.session.execute(
+            db.select(EditHistory.entry_id, EditHistory.field_changed, EditHistory.chain,
+                      EditHistory.new_length, EditHistory.new_crc).where(EditHistory.id.in_(latest))
+        )
+    }
+    converted = 0
+    while True:
+        rows = db.session.execute(select_batch, {'limit': batch_size}).all()
+        if not rows:
+            break
+        updates = []
+        for history_id, entry_id, field, old, new in rows:
+            # update_entry used to log str(value), so a cleared field was written as 'None'
+            old = None if old == 'None' else old
+            new = None if new == 'None' else new
+            values = history_values(old, new, previous.get((entry_id, field)))
+            previous[(entry_id, field)] = (values['chain'], values['new_length'], values['new_crc'])
+            updates.append({'history_id': history_id, **values})
+        db.session.execute(update_row, updates)
+        db.session.commit()
+        converted += len(rows)
+    if converted:
+        app.logger.info("Converted %d edit history rows to snapshot/delta form", converted)
 
 
 def bootstrap_source_authors():
@@ -2001,11 +5941,28 @@ def link_entries_to_source_authors():
 
 
 def init_db():
+    if app.config['PERF_INSTRUMENTATION']:
+        install_perf_instrumentation()
+    if app.config['METRICS_ENABLED']:
+        install_metrics()
+    if app.config['PROFILING_ENABLED']:
+        install_profiling()
     with app.app_context():
+        configure_engine(db.engine)
         db.create_all()
         run_schema_migrations()
+        # Before any backfill below writes through the change log
+        ensure_corpus_revision()
+        migrate_lemma_indices()
+        migrate_edit_history()
+        indexed = backfill_lemma_postings()
+        if indexed:
+            app.logger.info("Built lemma postings for %d entries", indexed)
+        backfill_token_offsets()
         bootstrap_source_authors()
         link_entries_to_source_authors()
+        if app.config['FILTER_INDEX_ENABLED']:
+            FILTER_INDEX.catch_up(*corpus_log_state())
         log_db_info(app.config['SQLALCHEMY_DATABASE_URI'])
 
 
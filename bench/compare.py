@@ -0,0 +1,94 @@
+"""
+Compare two bench/run.py result files.
+
+Matches scenarios by name and reports the change in median time. A scenario
+counts as a regression when it is slower by more than --threshold (relative)
+and --min-ms (absolute), so sub-millisecond noise does not trip CI.
+
+    python bench/compare.py results/main.json results/HEAD.json --fail-on-regression
+"""
+
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path, encoding='utf-8') as stream:
+        report = json.load(stream)
+    return report, {b['name']: b for b in report['benchmarks']}
+
+
+def describe(report):
+    commit = report.get('commit_info', {})
+    label = (commit.get('commit') or 'unknown')[:10]
+    if commit.get('dirty'):
+        label += '+dirty'
+    return f"{label} ({report['config']['entries']} entries, {report['config']['dialect']})"
+
+
+def format_ms(value):
+    return f"{value:10.2f}ms" if value is not None else f"{'-':>12s}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Relative slowdown that counts (default 10%%)')
+    parser.add_argument('--min-ms', type=float, default=1.0, help='Ignore absolute changes below this')
+    parser.add_argument('--stat', default='median', choices=['median', 'min', 'mean'])
+    parser.add_argument('--fail-on-regression', action='store_true')
+    parser.add_argument('--json', action='store_true', help='Emit machine-readable comparison')
+    args = parser.parse_args()
+
+    base_report, base = load(args.baseline)
+    cand_report, cand = load(args.candidate)
+    if base_report['config']['entries'] != cand_report['config']['entries']:
+        print('warning: corpus sizes differ', file=sys.stderr)
+
+    rows = []
+    for name in list(base) + [n for n in cand if n not in base]:
+        b, c = base.get(name), cand.get(name)
+        row = {'name': name, 'baseline_ms': None, 'candidate_ms': None, 'ratio': None, 'status': 'ok'}
+        if b and 'stats' in b:
+            row['baseline_ms'] = b['stats'][args.stat] * 1000
+        if c and 'stats' in c:
+            row['candidate_ms'] = c['stats'][args.stat] * 1000
+
+        if c is None:
+            row['status'] = 'removed'
+        elif b is None:
+            row['status'] = 'new'
+        elif 'error' in c:
+            row['status'] = 'error' if 'error' not in b else 'still failing'
+        elif 'error' in b:
+            row['status'] = 'fixed'
+        else:
+            row['ratio'] = row['candidate_ms'] / row['baseline_ms'] if row['baseline_ms'] else None
+            delta = row['candidate_ms'] - row['baseline_ms']
+            if row['ratio'] and abs(delta) >= args.min_ms:
+                if row['ratio'] > 1 + args.threshold:
+                    row['status'] = 'slower'
+                elif row['ratio'] < 1 / (1 + args.threshold):
+                    row['status'] = 'faster'
+        rows.append(row)
+
+    regressions = [r for r in rows if r['status'] in ('slower', 'error')]
+    if args.json:
+        print(json.dumps({'baseline': describe(base_report), 'candidate': describe(cand_report),
+                          'stat': args.stat, 'rows': rows, 'regressions': len(regressions)}, indent=2))
+    else:
+        print(f"baseline:  {describe(base_report)}")
+        print(f"candidate: {describe(cand_report)}")
+        print(f"{'scenario':34s} {'baseline':>12s} {'candidate':>12s} {'ratio':>8s}  status")
+        for r in rows:
+            ratio = f"{r['ratio']:7.2f}x" if r['ratio'] else f"{'-':>8s}"
+            print(f"{r['name']:34s} {format_ms(r['baseline_ms'])} {format_ms(r['candidate_ms'])} {ratio}  {r['status']}")
+
+    if args.fail_on_regression and regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
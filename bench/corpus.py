@@ -0,0 +1,354 @@
+"""
+Deterministic synthetic Collectiones corpus.
+
+Generates polytonic-Greek entries spread over the 70 books of the Collectiones
+(the surviving books weighted more heavily), attributed to Oribasius' sources
+with a skewed author distribution, sect labels and ingredient links. The same
+(count, seed) always yields the same rows, so benchmark databases can be
+rebuilt and cached between runs.
+
+    python bench/corpus.py --entries 10000 --csv corpus.csv
+    python bench/corpus.py --entries 100000 --database-url sqlite:////tmp/corpus.db
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+from itertools import accumulate
+
+# Bump when the generated rows change so cached databases are rebuilt
+GENERATOR_VERSION = 4
+
+BOOKS = list(range(1, 71))
+SURVIVING_BOOKS = set(range(1, 16)) | {24, 25} | set(range(43, 51))
+
+# (name, Greek name, sect, relative share of entries)
+AUTHORS = [
+    ('Galen', 'Γαληνός', 'Rationalist', 40),
+    ('Rufus', 'Ῥοῦφος', 'Rationalist', 9),
+    ('Antyllus', 'Ἄντυλλος', 'Pneumatist', 8),
+    ('Athenaeus', 'Ἀθήναιος', 'Pneumatist', 5),
+    ('Archigenes', 'Ἀρχιγένης', 'Pneumatist', 5),
+    ('Herodotus', 'Ἡρόδοτος', 'Pneumatist', 5),
+    ('Dieuches', 'Διεύχης', 'Dogmatist', 3),
+    ('Mnesitheus', 'Μνησίθεος', 'Dogmatist', 3),
+    ('Diocles', 'Διοκλῆς', 'Dogmatist', 2),
+    ('Philagrius', 'Φιλάγριος', 'Unknown', 2),
+    ('Heliodorus', 'Ἡλιόδωρος', 'Pneumatist', 3),
+    ('Apollonius', 'Ἀπολλώνιος', 'Empiricist', 2),
+    ('Xenocrates', 'Ξενοκράτης', 'Unknown', 2),
+    ('Soranus', 'Σωρανός', 'Methodist', 2),
+    ('Zopyrus', 'Ζώπυρος', 'Empiricist', 1),
+    ('Philumenus', 'Φιλούμενος', 'Methodist', 2),
+    ('Agathinus', 'Ἀγαθῖνος', 'Pneumatist', 1),
+    ('Dioscorides', 'Διοσκουρίδης', 'Unknown', 2),
+    ('Crateuas', 'Κρατεύας', 'Unknown', 1),
+    ('Philotimus', 'Φιλότιμος', 'Dogmatist', 1),
+    ('Sabinus', 'Σαβῖνος', 'Unknown', 1),
+]
+
+SECT_GROUPS = {
+    'Pneumatist': 'Pneumatists',
+    'Methodist': 'Methodists',
+    'Empiricist': 'Empiricists',
+    'Dogmatist': 'Dogmatists',
+    'Rationalist': 'Galen & Rufus',
+    'Unknown': 'Other',
+}
+
+# (Greek, Latin, English, category, subcategory)
+INGREDIENTS = [
+    ('ἔλαιον', 'oleum', 'olive oil', 'plant', 'oil'),
+    ('μέλι', 'mel', 'honey', 'animal', 'product'),
+    ('οἶνος', 'vinum', 'wine', 'plant', 'liquid'),
+    ('ὄξος', 'acetum', 'vinegar', 'plant', 'liquid'),
+    ('ὕδωρ', 'aqua', 'water', 'mineral', 'liquid'),
+    ('ῥητίνη', 'resina', 'resin', 'plant', 'resin'),
+    ('σμύρνα', 'myrrha', 'myrrh', 'plant', 'resin'),
+    ('λίβανος', 'tus', 'frankincense', 'plant', 'resin'),
+    ('κηρός', 'cera', 'wax', 'animal', 'product'),
+    ('στέαρ', 'sebum', 'suet', 'animal', 'fat'),
+    ('ἅλς', 'sal', 'salt', 'mineral', 'salt'),
+    ('νίτρον', 'nitrum', 'soda', 'mineral', 'salt'),
+    ('στυπτηρία', 'alumen', 'alum', 'mineral', 'salt'),
+    ('χαλκῖτις', 'chalcitis', 'copper ore', 'mineral', 'metal'),
+    ('ἰός', 'aerugo', 'verdigris', 'mineral', 'metal'),
+    ('λιθάργυρος', 'lithargyrum', 'litharge', 'mineral', 'metal'),
+    ('ψιμύθιον', 'cerussa', 'white lead', 'mineral', 'metal'),
+    ('θεῖον', 'sulphur', 'sulphur', 'mineral', 'other'),
+    ('ἄσφαλτος', 'bitumen', 'bitumen', 'mineral', 'other'),
+    ('πέπερι', 'piper', 'pepper', 'plant', 'seed'),
+    ('κύμινον', 'cuminum', 'cumin', 'plant', 'seed'),
+    ('ἄνισον', 'anisum', 'anise', 'plant', 'seed'),
+    ('σέλινον', 'apium', 'celery', 'plant', 'herb'),
+    ('πήγανον', 'ruta', 'rue', 'plant', 'herb'),
+    ('ὕσσωπος', 'hyssopus', 'hyssop', 'plant', 'herb'),
+    ('θύμον', 'thymum', 'thyme', 'plant', 'herb'),
+    ('ἀψίνθιον', 'absinthium', 'wormwood', 'plant', 'herb'),
+    ('γλυκύρριζα', 'glycyrrhiza', 'liquorice', 'plant', 'root'),
+    ('ἐλλέβορος', 'helleborus', 'hellebore', 'plant', 'root'),
+    ('σκαμμωνία', 'scammonium', 'scammony', 'plant', 'root'),
+    ('ὄπιον', 'opium', 'opium', 'plant', 'juice'),
+    ('κρόκος', 'crocus', 'saffron', 'plant', 'flower'),
+    ('ῥόδον', 'rosa', 'rose', 'plant', 'flower'),
+    ('μήκων', 'papaver', 'poppy', 'plant', 'flower'),
+    ('ἄλευρον', 'farina', 'flour', 'plant', 'grain'),
+    ('κριθή', 'hordeum', 'barley', 'plant', 'grain'),
+    ('γάλα', 'lac', 'milk', 'animal', 'product'),
+    ('ᾠόν', 'ovum', 'egg', 'animal', 'product'),
+    ('καστόριον', 'castoreum', 'castoreum', 'animal', 'secretion'),
+    ('θηριακή', 'theriaca', 'theriac', 'compound', 'antidote'),
+]
+
+QUANTITIES = ['δραχμὴ μία', 'δραχμαὶ δύο', 'δραχμαὶ δʹ', 'οὐγγία μία', 'λίτρα μία', 'κοτύλη μία', 'ὅσον ἀρκεῖ']
+PREPARATIONS = ['κεκομμένον', 'λεῖον', 'ἑφθόν', 'ὠμόν', 'διηθημένον', 'τετριμμένον', None]
+
+# Inflected forms grouped so the lemmatizer's rules have real work to do;
+# earlier words are drawn more often (Zipf-like)
+VOCABULARY = [
+    'καὶ', 'δὲ', 'τὸ', 'τοῦ', 'τῶν', 'τὴν', 'τῆς', 'ἐν', 'εἰς', 'γὰρ', 'μὲν', 'ἢ', 'ὡς', 'οὐ', 'ἐπὶ',
+    'πρὸς', 'διὰ', 'ἐκ', 'μετὰ', 'ὅταν', 'ἐὰν', 'χρὴ', 'δεῖ', 'μάλιστα', 'ἔπειτα',
+    'ἔλαιον', 'ἐλαίου', 'ἐλαίῳ', 'μέλιτι', 'μέλιτος', 'οἶνον', 'οἴνου', 'οἴνῳ', 'ὄξει', 'ὕδατι', 'ὕδωρ',
+    'φάρμακον', 'φαρμάκου', 'φαρμάκων', 'φαρμάκοις', 'σῶμα', 'σώματος', 'σώματι', 'σωμάτων',
+    'πυρετός', 'πυρετοῦ', 'πυρετῷ', 'πυρετῶν', 'νόσος', 'νόσου', 'νόσων', 'πάθος', 'πάθους', 'παθῶν',
+    'κοιλία', 'κοιλίας', 'κοιλίαν', 'κεφαλή', 'κεφαλῆς', 'κεφαλὴν', 'στόμαχος', 'στομάχου', 'στομάχῳ',
+    'ἧπαρ', 'ἥπατος', 'σπλὴν', 'σπληνός', 'νεφροί', 'νεφρῶν', 'θώραξ', 'θώρακος', 'πνεύμων', 'πνεύμονος',
+    'αἷμα', 'αἵματος', 'χολή', 'χολῆς', 'φλέγμα', 'φλέγματος', 'χυμός', 'χυμοῦ', 'χυμῶν',
+    'θερμαίνει', 'θερμαίνουσι', 'ψύχει', 'ψύχουσι', 'ξηραίνει', 'ὑγραίνει', 'λεπτύνει', 'παχύνει',
+    'καθαίρει', 'καθαίρουσι', 'ὠφελεῖ', 'βλάπτει', 'πέσσει', 'κινεῖ', 'ἐπέχει', 'λύει',
+    'δίδοται', 'δίδονται', 'ἐσθίεται', 'πίνεται', 'ἐπιτίθεται', 'ἐπιτίθενται', 'χρίεται', 'ἕψεται',
+    'θερμός', 'θερμοῦ', 'θερμὸν', 'ψυχρός', 'ψυχροῦ', 'ψυχρὸν', 'ξηρός', 'ξηροῦ', 'ὑγρός', 'ὑγροῦ',
+    'παλαιόν', 'παλαιοῦ', 'νέον', 'νέου', 'λεπτός', 'λεπτοῦ', 'παχύς', 'γλυκύς', 'πικρός', 'δριμύς',
+    'τροφή', 'τροφῆς', 'τροφὴν', 'δίαιτα', 'διαίτης', 'γυμνάσιον', 'γυμνασίου', 'γυμνασίων',
+    'λουτρόν', 'λουτροῦ', 'λουτρῷ', 'ὕπνος', 'ὕπνου', 'ἐγκέφαλος', 'ἐγκεφάλου', 'φλέψ', 'φλεβός',
+    'ἀρτηρία', 'ἀρτηρίας', 'σφυγμός', 'σφυγμοῦ', 'οὖρον', 'οὔρου', 'ἱδρώς', 'ἱδρῶτος',
+    'ἕλκος', 'ἕλκους', 'ἑλκῶν', 'τραῦμα', 'τραύματος', 'κάταγμα', 'καταγμάτων', 'ἐπίδεσμος', 'ἐπιδέσμου',
+    'κατάπλασμα', 'καταπλάσματος', 'ἔμπλαστρος', 'ἐμπλάστρου', 'ἀντίδοτος', 'ἀντιδότου', 'κλυστήρ',
+    'βοτάνη', 'βοτάνης', 'ῥίζα', 'ῥίζης', 'ῥίζαν', 'σπέρμα', 'σπέρματος', 'φύλλα', 'φύλλων', 'καρπός', 'καρποῦ',
+]
+
+TITLE_NOUNS = [
+    'ἐλαίου', 'οἴνου', 'μέλιτος', 'ὕδατος', 'λουτρῶν', 'γυμνασίων', 'τροφῆς', 'διαίτης', 'πυρετῶν',
+    'φλεβοτομίας', 'καθάρσεως', 'ἐμέτου', 'κλυστήρων', 'καταπλασμάτων', 'ἐμπλάστρων', 'ἀντιδότων',
+    'ἑλκῶν', 'καταγμάτων', 'ἐπιδέσμων', 'σφυγμῶν', 'οὔρων', 'ὕπνου', 'ἀέρων', 'ὀστῶν', 'νεύρων',
+    'μυῶν', 'φλεβῶν', 'ἀρτηριῶν', 'ἐγκεφάλου', 'ἥπατος', 'σπληνός', 'νεφρῶν', 'κοιλίας', 'στομάχου',
+]
+TITLE_ENGLISH = [
+    'oil', 'wine', 'honey', 'water', 'baths', 'exercises', 'nourishment', 'regimen', 'fevers',
+    'phlebotomy', 'purging', 'vomiting', 'clysters', 'poultices', 'plasters', 'antidotes',
+    'wounds', 'fractures', 'bandages', 'pulses', 'urine', 'sleep', 'airs', 'bones', 'nerves',
+    'muscles', 'veins', 'arteries', 'the brain', 'the liver', 'the spleen', 'the kidneys', 'the belly', 'the stomach',
+]
+ENGLISH_WORDS = [
+    'the', 'and', 'of', 'it', 'is', 'to', 'be', 'given', 'with', 'warm', 'cold', 'dry', 'moist', 'oil', 'wine',
+    'honey', 'body', 'fever', 'patient', 'should', 'which', 'when', 'after', 'bath', 'food', 'drink',
+    'heats', 'cools', 'purges', 'thins', 'thickens', 'applied', 'mixed', 'boiled', 'pounded', 'helps', 'harms',
+]
+
+THEMES = ['Diet', 'Drugs', 'Surgery', 'Anatomy', 'Hygiene', 'Pathology', 'Gynaecology', 'Exercise']
+
+
+def zipf_weights(count, exponent=1.1):
+    return list(accumulate(1 / (rank ** exponent) for rank in range(1, count + 1)))
+
+
+VOCABULARY_WEIGHTS = zipf_weights(len(VOCABULARY))
+AUTHOR_WEIGHTS = list(accumulate(a[3] for a in AUTHORS))
+BOOK_WEIGHTS = list(accumulate(4 if b in SURVIVING_BOOKS else 1 for b in BOOKS))
+
+
+def generate_body(rng, words):
+    tokens = rng.choices(VOCABULARY, cum_weights=VOCABULARY_WEIGHTS, k=words)
+    sentences = []
+    i = 0
+    while i < len(tokens):
+        length = rng.randint(6, 18)
+        sentences.append(' '.join(tokens[i:i + length]))
+        i += length
+    return '. '.join(sentences) + '.'
+
+
+def iter_entries(count, seed=1):
+    """
+    Yield `count` entry dicts (Entry column names plus `ingredients`, a list of
+    (ingredient_index, quantity, preparation) and `author_index`).
+    """
+    rng = random.Random(seed)
+    books = rng.choices(BOOKS, cum_weights=BOOK_WEIGHTS, k=count)
+    books.sort()
+    chapter = 0
+    previous_book = None
+    for book in books:
+        if book != previous_book:
+            chapter, previous_book = 0, book
+        # A chapter holds one to four excerpts
+        if chapter == 0 or rng.random() < 0.45:
+            chapter += 1
+            section = 1
+        else:
+            section += 1
+
+        author_index = rng.choices(range(len(AUTHORS)), cum_weights=AUTHOR_WEIGHTS)[0]
+        name, name_greek, sect, _ = AUTHORS[author_index]
+        words = max(12, int(rng.lognormvariate(4.6, 0.7)))
+        body = generate_body(rng, words)
+        topic = rng.randrange(len(TITLE_NOUNS))
+        page = 1 + (book * 37 + chapter * 3) % 400
+        line_start = rng.randint(1, 30)
+
+        ingredients = []
+        if rng.random() < 0.35:
+            for index in sorted(rng.sample(range(len(INGREDIENTS)), rng.randint(1, 6))):
+                ingredients.append((index, rng.choice(QUANTITIES), rng.choice(PREPARATIONS)))
+
+        yield {
+            'author_named': name_greek if rng.random() < 0.7 else f"{name_greek} ἐκ τοῦ {rng.randint(1, 9)}",
+            'author': name,
+            'author_index': author_index,
+            'author_group': SECT_GROUPS[sect],
+            'book': book,
+            'chapter': chapter,
+            'section': section,
+            'chapter_title': f"{book}.{chapter}",
+            'raeder_volume': f"VI.{1 + book // 25}.{1 + book % 2}",
+            'raeder_page': page,
+            'raeder_line_start': line_start,
+            'raeder_line_end': line_start + rng.randint(0, 25),
+            'title_greek': f"Περὶ {TITLE_NOUNS[topic]}" + (f", ἐκ τοῦ {rng.randint(1, 9)} λόγου" if rng.random() < 0.3 else ''),
+            'body_greek': body,
+            'translation_title': f"On {TITLE_ENGLISH[topic]}",
+            'translation_content': ' '.join(rng.choices(ENGLISH_WORDS, k=max(8, words // 2))) if rng.random() < 0.4 else None,
+            'location': f"Coll. {book}.{chapter}",
+            'word_count': len(body.split()),
+            'note1': 'cf. Galen, De simpl. med.' if rng.random() < 0.05 else None,
+            'pneumatist': sect,
+            'themes': json.dumps(rng.sample(THEMES, rng.randint(0, 2))),
+            'ingredients': ingredients,
+        }
+
+
+def entry_urns(row):
+    urn_cts = f"urn:cts:greekLit:tlg0722.tlg001:{row['book']}.{row['chapter']}.{row['section']}"
+    raeder = f"{row['raeder_volume']}.{row['raeder_page']}.{row['raeder_line_start']}"
+    if row['raeder_line_end'] != row['raeder_line_start']:
+        raeder += f"-{row['raeder_line_end']}"
+    return urn_cts, f"urn:cite:alchemies:raeder:{raeder}"
+
+
+CSV_COLUMNS = [
+    ('Author Named', 'author_named'), ('Author', 'author'), ('Author Group', 'author_group'),
+    ('Book', 'book'), ('Chapter', 'chapter'), ('Section', 'section'), ('Chapter Title', 'chapter_title'),
+    ('Raeder Volume', 'raeder_volume'), ('Raeder Page', 'raeder_page'),
+    ('Line Start', 'raeder_line_start'), ('Line End', 'raeder_line_end'),
+    ('Title', 'title_greek'), ('Body', 'body_greek'), ('Translation Title', 'translation_title'),
+    ('Translation Content', 'translation_content'), ('Location', 'location'),
+    ('Word Count', 'word_count'), ('Note', 'note1'), ('Medical Sect', 'pneumatist'),
+]
+
+
+def write_csv(stream, count, seed=1):
+    """Write entries in the layout /api/import accepts"""
+    writer = csv.writer(stream)
+    writer.writerow([header for header, _ in CSV_COLUMNS])
+    for row in iter_entries(count, seed):
+        writer.writerow(['' if row[field] is None else row[field] for _, field in CSV_COLUMNS])
+
+
+def seed_database(oribasius, count, seed=1, batch_size=5000, lemma_index=True):
+    """
+    Bulk-load the synthetic corpus through the app's metadata.
+    `oribasius` is the imported app module; must be called with an empty database.
+    """
+    db = oribasius.db
+    entries = oribasius.Entry.__table__
+    authors = oribasius.SourceAuthor.__table__
+    ingredients = oribasius.Ingredient.__table__
+    links = oribasius.entry_ingredients
+
+    with oribasius.app.app_context():
+        db.create_all()
+        with db.engine.begin() as conn:
+            conn.execute(authors.insert(), [
+                {'id': i + 1, 'name': name, 'name_greek': greek, 'sect': sect, 'sect_certain': True}
+                for i, (name, greek, sect, _) in enumerate(AUTHORS)
+            ])
+            conn.execute(ingredients.insert(), [
+                {'id': i + 1, 'name_greek': greek, 'name_latin': latin, 'name_english': english,
+                 'category': category, 'subcategory': subcategory}
+                for i, (greek, latin, english, category, subcategory) in enumerate(INGREDIENTS)
+            ])
+
+        entry_rows, link_rows = [], []
+
+        def flush():
+            # New lexicon rows go in through the session; commit them first so they are
+            # visible to (and not lock-contending with) the bulk insert connection
+            db.session.commit()
+            with db.engine.begin() as conn:
+                conn.execute(entries.insert(), entry_rows)
+                if link_rows:
+                    conn.execute(links.insert(), link_rows)
+            entry_rows.clear()
+            link_rows.clear()
+
+        for entry_id, row in enumerate(iter_entries(count, seed), start=1):
+            row = dict(row)
+            author_index = row.pop('author_index')
+            for index, quantity, preparation in row.pop('ingredients'):
+                link_rows.append({'entry_id': entry_id, 'ingredient_id': index + 1,
+                                  'quantity': quantity, 'preparation': preparation})
+            row['id'] = entry_id
+            row['source_author_id'] = author_index + 1
+            row['urn_cts'], row['urn_raeder'] = entry_urns(row)
+            if lemma_index:
+                row['lemma_data'] = oribasius.build_lemma_index(row['body_greek'])
+                row['token_offsets'] = oribasius.build_token_offsets(row['body_greek'])
+            entry_rows.append(row)
+            if len(entry_rows) >= batch_size:
+                flush()
+        if entry_rows:
+            flush()
+        if lemma_index:
+            oribasius.backfill_lemma_postings(batch_size)
+
+        if db.engine.dialect.name == 'postgresql':
+            # Explicit ids bypass the sequences; move them past the seeded rows
+            with db.engine.begin() as conn:
+                for table in ('source_authors', 'ingredients', 'entries'):
+                    conn.exec_driver_sql(
+                        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                        f"COALESCE((SELECT MAX(id) FROM {table}), 1))"
+                    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--entries', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--csv', help='Write an importable CSV to this path (- for stdout)')
+    parser.add_argument('--database-url', help='Create and fill an empty database at this URL')
+    parser.add_argument('--no-lemma-index', action='store_true', help='Skip lemma indexing (faster for huge corpora)')
+    args = parser.parse_args()
+
+    if not args.csv and not args.database_url:
+        parser.error('give --csv and/or --database-url')
+
+    if args.csv:
+        if args.csv == '-':
+            write_csv(sys.stdout, args.entries, args.seed)
+        else:
+            with open(args.csv, 'w', newline='', encoding='utf-8') as stream:
+                write_csv(stream, args.entries, args.seed)
+
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        import app as oribasius
+        seed_database(oribasius, args.entries, args.seed, lemma_index=not args.no_lemma_index)
+
+
+if __name__ == '__main__':
+    main()
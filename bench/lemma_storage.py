@@ -0,0 +1,128 @@
+"""
+Measure the packed lemma index against the legacy JSON encoding.
+
+Rebuilds the old `json.dumps({lemma: [positions]})` form of every entry's index
+next to the stored lemma_data blob and reports total size, per-entry decode
+time and lemma-search match time for both.
+
+    python bench/lemma_storage.py --entries 10000
+    python bench/lemma_storage.py --database-url sqlite:////path/to/oribasius.db --json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from run import prepare_sqlite  # noqa: E402
+
+QUERIES = ['φαρμάκου', 'ὕδατι', 'ῥίζης', 'μέλιτος καὶ οἴνου']
+
+
+def best_of(rounds, func, items):
+    """Fastest of several passes of func over items, in seconds"""
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for item in items:
+            func(item)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def measure(oribasius, rounds):
+    with oribasius.app.app_context():
+        rows = oribasius.db.session.execute(
+            oribasius.db.select(oribasius.Entry.body_greek, oribasius.Entry.lemma_data)
+            .where(oribasius.Entry.lemma_data.isnot(None))
+        ).all()
+        blobs = [bytes(data) for _, data in rows]
+        legacy = [json.dumps(oribasius.lemma_positions(body), ensure_ascii=False) for body, _ in rows]
+        # Warm the lexicon cache the way a long-running worker would have it
+        for blob in blobs:
+            oribasius.decode_lemma_index(blob)
+        query_forms = [oribasius.lemma_query_forms(q) for q in QUERIES]
+        query_ids = [frozenset(oribasius.lemma_ids(list(forms)).values()) for forms in query_forms]
+
+        def legacy_match(text):
+            index = json.loads(text)
+            return [any(lemma in index for lemma in forms) for forms in query_forms]
+
+        def packed_match(blob):
+            ids, _ = oribasius.lemma_index_counts(blob)
+            return [not wanted.isdisjoint(ids) for wanted in query_ids]
+
+        # Both encodings must agree before their timings mean anything
+        assert [legacy_match(t) for t in legacy] == [packed_match(b) for b in blobs], 'match results differ'
+
+        json_bytes = [len(t.encode('utf-8')) for t in legacy]
+        blob_bytes = [len(b) for b in blobs]
+        n = len(blobs)
+        return {
+            'entries': n,
+            'lexicon_size': oribasius.Lemma.query.count(),
+            'json_bytes': sum(json_bytes),
+            'packed_bytes': sum(blob_bytes),
+            'json_bytes_median': statistics.median(json_bytes) if n else 0,
+            'packed_bytes_median': statistics.median(blob_bytes) if n else 0,
+            'decode_us': {
+                'json_loads': best_of(rounds, json.loads, legacy) / n * 1e6,
+                'packed_postings': best_of(rounds, oribasius.decode_lemma_postings, blobs) / n * 1e6,
+                'packed_with_lemmas': best_of(rounds, oribasius.decode_lemma_index, blobs) / n * 1e6,
+                'packed_counts': best_of(rounds, oribasius.lemma_index_counts, blobs) / n * 1e6,
+            },
+            'match_us': {
+                'json': best_of(rounds, legacy_match, legacy) / n / len(QUERIES) * 1e6,
+                'packed': best_of(rounds, packed_match, blobs) / n / len(QUERIES) * 1e6,
+            },
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--entries', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--database-url', help='Measure an existing database instead of the synthetic corpus')
+    parser.add_argument('--cache-dir', default=os.path.join(tempfile.gettempdir(), 'oribasius-bench'))
+    parser.add_argument('--rebuild', action='store_true', help='Regenerate the cached corpus')
+    parser.add_argument('--json', action='store_true', help='Emit machine-readable results')
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    else:
+        os.environ['DATABASE_URL'] = prepare_sqlite(args, tempfile.mkdtemp(prefix='oribasius-bench-'))
+    os.environ.setdefault('JOB_WORKERS', '1')
+
+    import app as oribasius
+
+    result = measure(oribasius, args.rounds)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    if not result['entries']:
+        print('no lemma indices to measure')
+        return
+    print(f"{result['entries']} entries, {result['lexicon_size']} lexicon rows")
+    print(f"{'storage':24s} {'json':>12s} {'packed':>12s} {'ratio':>8s}")
+    for label, key in (('total bytes', 'bytes'), ('median bytes/entry', 'bytes_median')):
+        old, new = result[f'json_{key}'], result[f'packed_{key}']
+        print(f"{label:24s} {old:12,.0f} {new:12,.0f} {old / new:7.2f}x")
+    decode = result['decode_us']
+    print(f"{'decode (us/entry)':24s} {decode['json_loads']:12.2f}")
+    for label in ('packed_postings', 'packed_with_lemmas', 'packed_counts'):
+        print(f"  {label:22s} {'':12s} {decode[label]:12.2f} {decode['json_loads'] / decode[label]:7.2f}x")
+    match = result['match_us']
+    print(f"{'match (us/entry/query)':24s} {match['json']:12.2f} {match['packed']:12.2f} {match['json'] / match['packed']:7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
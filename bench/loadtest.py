@@ -0,0 +1,351 @@
+"""
+Load-test a local gunicorn instance with reader and editor traffic mixes.
+
+Seeds (or reuses) a synthetic corpus database, starts gunicorn on it with each
+requested worker class, and drives it with concurrent virtual users that
+replay what static/app.js sends: the page-load burst, filtering,
+substring and lemma searches, the analytics tab, the thematic map, and inline
+edits (GET entry, PUT the full form, reload the list only when another
+editor wrote since it was loaded). Reports p50/p95/p99
+latency per action, throughput, HTTP errors and SQLite lock errors.
+
+    python bench/loadtest.py --mix seminar --users 30 --duration 60
+    python bench/loadtest.py --worker-class sync,gthread,gevent --json > loadtest.json
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import random
+import re
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import corpus  # noqa: E402
+from run import prepare_sqlite  # noqa: E402
+
+SEARCH_TERMS = ['ἐλαίου', 'οἶνον', 'πυρετοῦ', 'φαρμάκων', 'κεφαλῆς', 'λουτρόν', 'oil', 'wine', 'fever']
+# Cards on the first screen of the virtualized list, overscan included
+VISIBLE_CARDS = 10
+LEMMA_TERMS = ['ἔλαιον', 'πυρετός', 'φάρμακον', 'θερμαίνει', 'στόμαχος', 'αἷμα']
+SECTS = sorted({a[2] for a in corpus.AUTHORS})
+
+# Reader action weights per mix; editors only appear in mixes with --editors > 0
+MIXES = {
+    'reading': {'browse': 5, 'search': 3, 'lemma_search': 2, 'view_entry': 4, 'analytics': 1, 'thematic_map': 1,
+                'poll_changes': 1},
+    'seminar': {'browse': 2, 'search': 3, 'lemma_search': 3, 'view_entry': 2, 'analytics': 3, 'thematic_map': 2,
+                'poll_changes': 1},
+    'editing': {'browse': 3, 'search': 1, 'lemma_search': 1, 'view_entry': 2, 'analytics': 1, 'thematic_map': 0,
+                'poll_changes': 2},
+}
+DEFAULT_EDITORS = {'reading': 0, 'seminar': 3, 'editing': 6}
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class Recorder:
+    """Latency samples and failures per action, shared by all virtual users"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def add(self, action, seconds, ok):
+        with self.lock:
+            if ok:
+                self.latencies[action].append(seconds)
+            else:
+                self.errors[action] += 1
+
+
+class VirtualUser:
+    def __init__(self, base_url, recorder, rng, entries, think_time):
+        self.base_url = base_url
+        self.recorder = recorder
+        self.rng = rng
+        self.entries = entries
+        self.think_time = think_time
+        self.revision = None       # X-Corpus-Revision of the last response that carried one
+        self.list_revision = None  # ... and of the entry list the user is looking at
+
+    def request(self, action, path, method='GET', payload=None):
+        data = json.dumps(payload).encode('utf-8') if payload is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                     headers={'Content-Type': 'application/json'} if data else {})
+        started = time.perf_counter()
+        body, ok = None, True
+        try:
+            with urllib.request.urlopen(req, timeout=120) as resp:
+                body = resp.read()
+                revision = resp.headers.get('X-Corpus-Revision')
+                self.revision = int(revision) if revision is not None else None
+                if path.startswith('/api/entries?'):
+                    self.list_revision = self.revision
+        except (urllib.error.URLError, OSError):
+            ok = False
+        self.recorder.add(action, time.perf_counter() - started, ok)
+        return body
+
+    def think(self):
+        if self.think_time:
+            time.sleep(self.rng.expovariate(1 / self.think_time))
+
+    def entries_query(self, **params):
+        # loadEntries() fetches summary rows; cards fetch their bodies as they scroll into view
+        params.update(view='summary')
+        if re.search(r'[\u0370-\u03FF\u1F00-\u1FFF]', params.get('search', '')):
+            params['sort_by'] = 'relevance'  # as loadEntries() does for Greek searches
+        return '/api/entries?' + urllib.parse.urlencode(params)
+
+    def list_entries(self, action, **params):
+        """Load a list and the bodies of the cards the first screen renders"""
+        body = self.request(action, self.entries_query(**params))
+        ids = [entry['id'] for entry in json.loads(body)[:VISIBLE_CARDS]] if body else []
+        if ids:
+            self.request(f'{action}.cards', '/api/entries?' + urllib.parse.urlencode({
+                'ids': ','.join(map(str, ids)), 'view': 'detail', 'include_ingredients': 'true', 'snippets': 'false'}))
+
+    def page_load(self):
+        # DOMContentLoaded: loadFilters, loadEntries, loadAuthors, loadIngredients
+        self.request('page_load.filters', '/api/filters')
+        self.list_entries('page_load.entries')
+        self.request('page_load.authors', '/api/authors')
+        self.request('page_load.ingredients', '/api/ingredients')
+
+    def browse(self):
+        if self.rng.random() < 0.5:
+            self.list_entries('browse', book=self.rng.choice(corpus.BOOKS))
+        else:
+            self.list_entries('browse', sect=self.rng.choice(SECTS))
+
+    def search(self):
+        self.list_entries('search', search=self.rng.choice(SEARCH_TERMS))
+
+    def lemma_search(self):
+        self.list_entries('lemma_search', search=self.rng.choice(LEMMA_TERMS), lemma_search='true')
+
+    def view_entry(self):
+        self.request('view_entry', f'/api/entries/{self.rng.randint(1, self.entries)}')
+
+    def analytics(self):
+        # loadAnalytics() fetches both in parallel
+        self.request('analytics', '/api/analytics')
+        self.request('analytics.book_map', '/api/book-map')
+
+    def thematic_map(self):
+        self.request('thematic_map', f"/api/thematic-map?mode={self.rng.choice(['school', 'author'])}")
+
+    def poll_changes(self, action='poll_changes'):
+        # pollChanges(): apply the deltas since the list's revision; reload only if the log cannot cover them
+        if self.list_revision is None:
+            return
+        body = self.request(action, f'/api/changes?since={self.list_revision}')
+        feed = json.loads(body) if body else None
+        if feed is None or feed['reset']:
+            self.list_entries(f'{action}.reload')
+        else:
+            self.list_revision = feed['revision']
+
+    def edit(self):
+        entry_id = self.rng.randint(1, self.entries)
+        body = self.request('edit.open', f'/api/entries/{entry_id}')
+        if body is None:
+            return
+        entry = json.loads(body)
+        self.think()
+        # saveEntry() sends the whole form, so body_greek is always re-indexed
+        form = {field: entry.get(field) for field in (
+            'author_named', 'author', 'source_author_id', 'author_group', 'book', 'chapter', 'chapter_title',
+            'section', 'raeder_volume', 'raeder_page', 'raeder_line_start', 'raeder_line_end', 'title_greek',
+            'body_greek', 'translation_title', 'translation_content', 'note1', 'note2')}
+        form['note1'] = f"load test edit {self.rng.random():.6f}"
+        form['editor_name'] = 'Collaborator'
+        self.request('edit.save', f'/api/entries/{entry_id}', method='PUT', payload=form)
+        # saveEntry() patches the card in place, catching up from the change feed if other writes landed
+        if self.list_revision is None:
+            self.list_entries('edit.reload')
+        elif self.revision == self.list_revision + 1:
+            self.list_revision = self.revision
+        else:
+            self.poll_changes('edit.catch_up')
+
+
+def run_user(user, role, mix, deadline):
+    user.page_load()
+    actions = [name for name, weight in mix.items() if weight]
+    weights = [mix[name] for name in actions]
+    while time.monotonic() < deadline:
+        user.think()
+        if role == 'editor':
+            user.edit()
+        else:
+            getattr(user, user.rng.choices(actions, weights)[0])()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_gunicorn(worker_class, args, database_url, log_path):
+    port = free_port()
+    cmd = [sys.executable, '-m', 'gunicorn', 'app:app', '--bind', f'127.0.0.1:{port}',
+           '--workers', str(args.workers), '--worker-class', worker_class, '--timeout', '300']
+    if worker_class == 'gthread':
+        cmd += ['--threads', str(args.threads)]
+    elif worker_class == 'gevent':
+        cmd += ['--worker-connections', str(max(args.users * 2, 100))]
+    env = dict(os.environ, DATABASE_URL=database_url, JOB_WORKERS='1')
+    with open(log_path, 'w') as log:
+        proc = subprocess.Popen(cmd, cwd=REPO_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f'gunicorn exited early; see {log_path}')
+        try:
+            with urllib.request.urlopen(base_url + '/api/filters', timeout=5):
+                return proc, base_url
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.25)
+    proc.kill()
+    raise RuntimeError(f'gunicorn did not become ready; see {log_path}')
+
+
+def stop_gunicorn(proc):
+    proc.send_signal(signal.SIGTERM)
+    try:
+        proc.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def count_lock_errors(log_path):
+    with open(log_path, encoding='utf-8', errors='replace') as stream:
+        return sum(1 for line in stream if 'database is locked' in line)
+
+
+def summarize(recorder, seconds, lock_errors):
+    actions = {}
+    total = 0
+    for action in sorted(set(recorder.latencies) | set(recorder.errors)):
+        ms = [v * 1000 for v in recorder.latencies[action]]
+        total += len(ms) + recorder.errors[action]
+        actions[action] = {
+            'requests': len(ms),
+            'errors': recorder.errors[action],
+            'p50_ms': round(percentile(ms, 50), 2) if ms else None,
+            'p95_ms': round(percentile(ms, 95), 2) if ms else None,
+            'p99_ms': round(percentile(ms, 99), 2) if ms else None,
+        }
+    all_ms = [v * 1000 for samples in recorder.latencies.values() for v in samples]
+    return {
+        'requests': total,
+        'throughput_rps': round(total / seconds, 2),
+        'errors': sum(recorder.errors.values()),
+        'lock_errors': lock_errors,
+        'p50_ms': round(percentile(all_ms, 50), 2) if all_ms else None,
+        'p95_ms': round(percentile(all_ms, 95), 2) if all_ms else None,
+        'p99_ms': round(percentile(all_ms, 99), 2) if all_ms else None,
+        'actions': actions,
+    }
+
+
+def run_worker_class(worker_class, args, workdir):
+    database_url = args.database_url or prepare_sqlite(args, workdir)
+    log_path = os.path.join(workdir, f'gunicorn-{worker_class}.log')
+    proc, base_url = start_gunicorn(worker_class, args, database_url, log_path)
+    try:
+        # Seed the thematic structure once so the thematic map has divisions to walk
+        urllib.request.urlopen(urllib.request.Request(base_url + '/api/seed-thematic', method='POST')).read()
+
+        recorder = Recorder()
+        editors = DEFAULT_EDITORS[args.mix] if args.editors is None else args.editors
+        roles = ['editor'] * editors + ['reader'] * args.users
+        started = time.monotonic()
+        deadline = started + args.duration
+        threads = []
+        for i, role in enumerate(roles):
+            user = VirtualUser(base_url, recorder, random.Random(args.seed * 1000 + i), args.entries, args.think_time)
+            thread = threading.Thread(target=run_user, args=(user, role, MIXES[args.mix], deadline), daemon=True)
+            threads.append(thread)
+            thread.start()
+            time.sleep(args.ramp_up / max(len(roles), 1))
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+    finally:
+        stop_gunicorn(proc)
+    report = summarize(recorder, elapsed, count_lock_errors(log_path))
+    report.update(worker_class=worker_class, editors=editors, readers=args.users)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--mix', choices=sorted(MIXES), default='seminar')
+    parser.add_argument('--users', type=int, default=20, help='Concurrent readers')
+    parser.add_argument('--editors', type=int, help='Concurrent editors (default depends on --mix)')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds of traffic per worker class')
+    parser.add_argument('--ramp-up', type=float, default=5, help='Seconds over which users are started')
+    parser.add_argument('--think-time', type=float, default=1.0, help='Mean pause between actions, seconds')
+    parser.add_argument('--worker-class', default='sync,gthread', help='Comma-separated gunicorn worker classes')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4, help='Threads per gthread worker')
+    parser.add_argument('--entries', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--database-url', help='Use this database instead of a seeded SQLite copy')
+    parser.add_argument('--cache-dir', default=os.path.join(tempfile.gettempdir(), 'oribasius-bench'))
+    parser.add_argument('--rebuild', action='store_true', help='Regenerate the cached corpus')
+    parser.add_argument('--json', action='store_true', help='Emit machine-readable results')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='oribasius-loadtest-')
+    results = {}
+    for worker_class in args.worker_class.split(','):
+        if worker_class == 'gevent' and importlib.util.find_spec('gevent') is None:
+            print('skipping gevent: pip install gevent', file=sys.stderr)
+            continue
+        print(f'running {args.mix} mix on {worker_class} workers ...', file=sys.stderr)
+        results[worker_class] = run_worker_class(worker_class, args, workdir)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps({'mix': args.mix, 'entries': args.entries, 'duration': args.duration,
+                          'results': results}, indent=2))
+        return
+
+    for worker_class, report in results.items():
+        print(f"[{worker_class}] {report['readers']} readers, {report['editors']} editors: "
+              f"{report['throughput_rps']} req/s, p50={report['p50_ms']}ms p95={report['p95_ms']}ms "
+              f"p99={report['p99_ms']}ms errors={report['errors']} lock_errors={report['lock_errors']}")
+        for action, stats in report['actions'].items():
+            print(f"  {action:24s} n={stats['requests']:5d} err={stats['errors']:3d} "
+                  f"p50={stats['p50_ms']}ms p95={stats['p95_ms']}ms p99={stats['p99_ms']}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+Check that read routing never sends a write to the read-only engine.
+
+Runs the app with READ_ROUTING=true against a copy of the synthetic corpus and
+records every statement each engine executes while read routes (entries,
+facets, analytics, compare, history, as-of) are requested through the test
+client, interleaved with entry edits. Fails unless the read engine ran only
+reads, the @read_only_route views actually used it, and a write forced onto it
+from inside such a view raises ReadOnlyRoutingError.
+
+    python bench/read_routing.py --entries 2000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from run import prepare_sqlite  # noqa: E402
+
+READ_PREFIXES = ('SELECT', 'PRAGMA')
+
+
+def record_statements(engine, statements):
+    from sqlalchemy import event
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def run_checks(oribasius):
+    from sqlalchemy import text
+
+    app = oribasius.app
+    failures = []
+
+    def check(condition, message):
+        print(f"{'ok  ' if condition else 'FAIL'} {message}")
+        if not condition:
+            failures.append(message)
+
+    # Views registered before the first request: a write forced onto the read engine from a read-only view
+    @app.route('/_check/write-on-read-engine', methods=['POST'])
+    @oribasius.read_only_route
+    def write_on_read_engine():
+        with oribasius.get_read_engine().connect() as conn:
+            conn.execute(text('UPDATE entries SET note1 = note1 WHERE id = 1'))
+        return oribasius.jsonify({'written': True})
+
+    # ...and an ORM write from a read-only view, which must land on the primary
+    @app.route('/_check/orm-write/<int:entry_id>', methods=['POST'])
+    @oribasius.read_only_route
+    def orm_write(entry_id):
+        entry = oribasius.db.session.get(oribasius.Entry, entry_id)
+        entry.note4 = 'written from a read-only route'
+        oribasius.db.session.commit()
+        return oribasius.jsonify({'written': True})
+
+    app.testing = True
+    client = app.test_client()
+    with app.app_context():
+        read_engine = oribasius.get_read_engine()
+        check(read_engine is not None and read_engine is not oribasius.db.engine, 'read engine is separate from the primary')
+        entry_ids = [row[0] for row in oribasius.db.session.execute(
+            oribasius.db.select(oribasius.Entry.id).order_by(oribasius.Entry.id).limit(3))]
+        primary_engine = oribasius.db.engine
+    read_statements, primary_statements = [], []
+    record_statements(read_engine, read_statements)
+    record_statements(primary_engine, primary_statements)
+
+    before_edits = datetime.utcnow().isoformat()
+    for n, entry_id in enumerate(entry_ids):
+        response = client.put(f'/api/entries/{entry_id}', json={'note1': f'routing check {n}', 'editor_name': 'routing-check'})
+        check(response.status_code == 200, f'PUT /api/entries/{entry_id} succeeds')
+    read_after_edits = len(read_statements)
+
+    entry_id = entry_ids[0]
+    paths = [
+        '/api/entries?view=summary&limit=20',
+        '/api/entries?book=1&sort_by=book&limit=20',
+        '/api/facets',
+        '/api/facets?search=καί',
+        '/api/analytics',
+        '/api/compare?select=book:1&select=book:2&lemmas=5',
+        f'/api/history/{entry_id}',
+        f'/api/history/{entry_id}?field=note1&limit=1',
+        f'/api/entries/{entry_id}/as-of?at={before_edits}',
+    ]
+    for path in paths:
+        response = client.get(path)
+        check(response.status_code == 200, f'GET {path} -> {response.status_code}')
+    history = client.get(f'/api/history/{entry_id}').get_json()
+    if history:
+        response = client.get(f"/api/history/{entry_id}/{history[0]['id']}")
+        check(response.status_code == 200, 'GET /api/history/<id>/<history_id> succeeds')
+
+    read_during_views = len(read_statements) - read_after_edits
+    check(read_after_edits == 0, f'entry edits ran nothing on the read engine ({read_after_edits} statements)')
+    check(read_during_views > 0, f'read-only views used the read engine ({read_during_views} statements)')
+
+    primary_before = len(primary_statements)
+    response = client.post(f'/_check/orm-write/{entry_id}')
+    check(response.status_code == 200, 'ORM write inside a read-only view succeeds')
+    writes = [s for s in primary_statements[primary_before:] if s.lstrip().upper().startswith('UPDATE')]
+    check(bool(writes), 'that write ran on the primary')
+
+    try:
+        client.post('/_check/write-on-read-engine')
+        raised = False
+    except oribasius.ReadOnlyRoutingError:
+        raised = True
+    check(raised, 'a write sent to the read engine inside a read-only view raises ReadOnlyRoutingError')
+
+    non_reads = [s for s in read_statements if not s.lstrip().upper().startswith(READ_PREFIXES)]
+    check(not non_reads, f'read engine ran only SELECT/PRAGMA ({len(read_statements)} statements, '
+                         f'{len(non_reads)} others{": " + non_reads[0][:60] if non_reads else ""})')
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--entries', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--cache-dir', default=os.path.join(tempfile.gettempdir(), 'oribasius-bench'))
+    parser.add_argument('--rebuild', action='store_true', help='Regenerate the cached corpus')
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = prepare_sqlite(args, tempfile.mkdtemp(prefix='oribasius-routing-'))
+    os.environ['READ_ROUTING'] = 'true'
+    os.environ.pop('READ_DATABASE_URL', None)
+    os.environ.setdefault('JOB_WORKERS', '1')
+
+    import app as oribasius
+
+    failures = run_checks(oribasius)
+    if failures:
+        print(f'{len(failures)} check(s) failed', file=sys.stderr)
+        sys.exit(1)
+    print('read routing checks passed')
+
+
+if __name__ == '__main__':
+    main()
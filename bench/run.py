@@ -0,0 +1,311 @@
+"""
+Benchmark the API against a synthetic corpus.
+
+Builds (or reuses a cached copy of) a deterministic corpus from bench/corpus.py,
+drives every read endpoint, the search modes, export, import and the
+maintenance jobs through Flask's test client, and writes per-scenario timing
+statistics as JSON for bench/compare.py.
+
+    python bench/run.py --entries 10000 --output results/HEAD.json
+    python bench/run.py --entries 1000 --filter search --rounds 20
+"""
+
+import argparse
+import importlib.metadata
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import corpus  # noqa: E402
+
+# Terminal statuses of /api/jobs/<id>
+JOB_DONE = {'succeeded', 'failed', 'cancelled'}
+
+
+class Scenario:
+    def __init__(self, name, group, method, url, expect=200, data=None, job=False, teardown=None, rows=False):
+        self.name = name
+        self.group = group
+        self.method = method
+        self.url = url
+        self.expect = expect
+        self.data = data
+        self.job = job
+        self.teardown = teardown
+        self.rows = rows  # count JSON array items to report rows/s
+
+
+def build_scenarios(oribasius, args):
+    """Scenarios mirror what the index page requests, plus the maintenance endpoints"""
+    book = corpus.BOOKS[0]
+    author = corpus.AUTHORS[0][0]
+    middle_id = max(1, args.entries // 2)
+    urn = f"cts:greekLit:tlg0722.tlg001:{book}.1.1"  # /urn/ supplies the "urn:" prefix
+    import_csv = io.StringIO()
+    corpus.write_csv(import_csv, args.import_rows, seed=args.seed + 1)
+    import_bytes = import_csv.getvalue().encode('utf-8')
+
+    scenarios = [
+        Scenario('entries.all', 'entries', 'GET', '/api/entries'),
+        Scenario('entries.all_with_ingredients', 'entries', 'GET', '/api/entries?include_ingredients=true'),
+        Scenario('entries.ndjson', 'entries', 'GET', '/api/entries?format=ndjson&include_ingredients=true'),
+        Scenario('entries.by_book', 'entries', 'GET', f'/api/entries?book={book}&include_ingredients=true'),
+        Scenario('entries.by_author', 'entries', 'GET', f'/api/entries?author={author}'),
+        Scenario('entries.by_sect', 'entries', 'GET', '/api/entries?sect=Pneumatist'),
+        Scenario('entries.by_ingredient', 'entries', 'GET', '/api/entries?ingredient_id=1'),
+        Scenario('entries.sorted_desc', 'entries', 'GET', '/api/entries?sort_by=word_count&sort_order=desc'),
+        Scenario('entries.one', 'entries', 'GET', f'/api/entries/{middle_id}'),
+        Scenario('entries.view_summary', 'serialize', 'GET', '/api/entries?view=summary', rows=True),
+        Scenario('entries.view_detail', 'serialize', 'GET', '/api/entries?view=detail', rows=True),
+        Scenario('entries.view_full', 'serialize', 'GET', '/api/entries?view=full', rows=True),
+        Scenario('entries.view_detail_ingredients', 'serialize', 'GET',
+                 '/api/entries?view=detail&include_ingredients=true', rows=True),
+        Scenario('search.substring_greek', 'search', 'GET', '/api/entries?search=ἐλαίου'),
+        Scenario('search.substring_english', 'search', 'GET', '/api/entries?search=oil'),
+        Scenario('search.substring_rare', 'search', 'GET', '/api/entries?search=κλυστήρ'),
+        Scenario('search.lemma', 'search', 'GET', '/api/entries?search=ἔλαιον&lemma_search=true'),
+        Scenario('search.lemma_multiword', 'search', 'GET', '/api/entries?search=πυρετοῦ θερμαίνει&lemma_search=true'),
+        Scenario('search.lemma_phrase', 'search', 'GET', '/api/entries?search="ἐλαίου παλαιοῦ"&lemma_search=true'),
+        Scenario('search.lemma_near', 'search', 'GET', '/api/entries?search=ἐλαίου NEAR/5 μέλιτος&lemma_search=true'),
+        Scenario('search.lemma_boolean', 'search', 'GET',
+                 '/api/entries?search=(ἐλαίου OR οἴνου) AND NOT μέλιτος&lemma_search=true'),
+        Scenario('search.lemma_ranked_top50', 'search', 'GET',
+                 '/api/entries?search=ἔλαιον&lemma_search=true&sort_by=relevance&limit=50'),
+        Scenario('search.lemma_ranked_all', 'search', 'GET', '/api/entries?search=ἔλαιον&lemma_search=true&sort_by=relevance'),
+        Scenario('search.lemma_filtered', 'search', 'GET', f'/api/entries?search=φαρμάκων&lemma_search=true&book={book}'),
+        Scenario('reference.filters', 'reference', 'GET', '/api/filters'),
+        Scenario('reference.authors', 'reference', 'GET', '/api/authors'),
+        Scenario('reference.ingredients', 'reference', 'GET', '/api/ingredients'),
+        Scenario('reference.history', 'reference', 'GET', f'/api/history/{middle_id}'),
+        Scenario('reference.urn', 'reference', 'GET', f'/urn/{urn}', expect=(200, 302)),
+        Scenario('analytics.summary', 'analytics', 'GET', '/api/analytics'),
+        Scenario('analytics.book_map', 'analytics', 'GET', '/api/book-map'),
+        Scenario('analytics.book_map_v2', 'analytics', 'GET', '/api/book-map-v2'),
+        Scenario('analytics.thematic_structure', 'analytics', 'GET', '/api/thematic-structure'),
+        Scenario('analytics.thematic_map', 'analytics', 'GET', '/api/thematic-map'),
+        Scenario('analytics.compare', 'analytics', 'GET',
+                 f'/api/compare?type1=author&value1={author}&type2=author_group&value2=Pneumatists'),
+        Scenario('analytics.compare_sects_by_book', 'analytics', 'GET',
+                 '/api/compare?select=sect:Pneumatist&select=sect:Methodist&select=sect:Empiricist'
+                 f'&select=sect:Dogmatist&select=author:{author}&breakdown=book'),
+        Scenario('analytics.compare_lemmas', 'analytics', 'GET',
+                 f'/api/compare?select=sect:Pneumatist&select=sect:Methodist&select=author:{author}&lemmas=20'),
+        Scenario('export.csv', 'export', 'GET', '/api/export'),
+    ]
+    if oribasius.pa is not None:
+        scenarios += [
+            Scenario('export.parquet', 'export', 'GET', '/api/export/columnar?format=parquet'),
+            Scenario('export.arrow_lemmas', 'export', 'GET', '/api/export/columnar?format=arrow&dataset=lemmas'),
+        ]
+
+    # Jobs run last: reindex and URN generation rewrite rows with identical values,
+    # imported rows are deleted again after every round
+    def remove_imported():
+        with oribasius.app.app_context():
+            db = oribasius.db
+            with db.engine.begin() as conn:
+                conn.execute(oribasius.entry_ingredients.delete().where(
+                    oribasius.entry_ingredients.c.entry_id > args.entries))
+                conn.execute(oribasius.Entry.__table__.delete().where(oribasius.Entry.id > args.entries))
+
+    scenarios += [
+        Scenario('jobs.reindex_lemmas', 'jobs', 'POST', '/api/reindex-lemmas', expect=202, job=True),
+        Scenario('jobs.generate_all_urns', 'jobs', 'POST', '/api/generate-all-urns', expect=202, job=True),
+        Scenario('jobs.import_csv', 'jobs', 'POST', '/api/import', expect=202, job=True,
+                 data=lambda: {'file': (io.BytesIO(import_bytes), 'bench.csv')},
+                 teardown=remove_imported),
+    ]
+    return scenarios
+
+
+def wait_for_job(client, job_id, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f'/api/jobs/{job_id}').get_json()
+        if job['status'] in JOB_DONE:
+            return job
+        time.sleep(0.005)
+    raise TimeoutError(f'job {job_id} still running after {timeout}s')
+
+
+def run_once(client, scenario, args):
+    data = scenario.data() if callable(scenario.data) else scenario.data
+    started = time.perf_counter()
+    response = client.open(scenario.url, method=scenario.method, data=data, buffered=False)
+    body = b''.join(response.response)
+    response.close()
+    expected = scenario.expect if isinstance(scenario.expect, tuple) else (scenario.expect,)
+    error = None
+    if response.status_code not in expected:
+        error = f'HTTP {response.status_code}'
+    elif scenario.job:
+        job = wait_for_job(client, json.loads(body)['job']['id'], args.job_timeout)
+        if job['status'] != 'succeeded':
+            error = f"job {job['status']}: {job.get('error')}"
+    elapsed = time.perf_counter() - started
+    return elapsed, len(body), error, len(json.loads(body)) if scenario.rows and not error else None
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    q1, _, q3 = statistics.quantiles(ordered, n=4) if len(ordered) > 1 else (ordered[0],) * 3
+    return {
+        'rounds': len(ordered),
+        'min': ordered[0],
+        'max': ordered[-1],
+        'mean': statistics.fmean(ordered),
+        'median': statistics.median(ordered),
+        'stddev': statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        'iqr': q3 - q1,
+        'ops': len(ordered) / sum(ordered) if sum(ordered) else None,
+    }
+
+
+def run_scenario(client, scenario, args):
+    rounds = args.job_rounds if scenario.job else args.rounds
+    samples, size, errors, rows = [], None, [], None
+    for i in range(args.warmup + rounds):
+        elapsed, size, error, rows = run_once(client, scenario, args)
+        if scenario.teardown:
+            scenario.teardown()
+        if error:
+            errors.append(error)
+            break
+        if i >= args.warmup:
+            samples.append(elapsed)
+
+    result = {'name': scenario.name, 'group': scenario.group, 'url': scenario.url, 'response_bytes': size}
+    if errors:
+        result['error'] = errors[0]
+    else:
+        result['stats'] = summarize(samples)
+        if rows is not None:
+            result['rows'] = rows
+            result['rows_per_sec'] = round(rows / result['stats']['median'], 1)
+    return result
+
+
+def git_info():
+    def git(*cmd):
+        try:
+            return subprocess.run(['git', *cmd], cwd=BENCH_DIR, capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    return {'commit': git('rev-parse', 'HEAD'), 'dirty': bool(git('status', '--porcelain', '--untracked-files=no'))}
+
+
+def prepare_sqlite(args, workdir):
+    """Seed a cached corpus database once per (size, seed, generator) and work on a copy"""
+    os.makedirs(args.cache_dir, exist_ok=True)
+    name = f"corpus-v{corpus.GENERATOR_VERSION}-{args.entries}-s{args.seed}.db"
+    cached = os.path.join(args.cache_dir, name)
+    if not os.path.exists(cached) or args.rebuild:
+        building = cached + '.building'
+        if os.path.exists(building):
+            os.remove(building)
+        print(f"seeding {args.entries} entries into {cached} ...", file=sys.stderr)
+        subprocess.run([sys.executable, os.path.join(BENCH_DIR, 'corpus.py'), '--entries', str(args.entries),
+                        '--seed', str(args.seed), '--database-url', f'sqlite:///{building}'], check=True)
+        os.replace(building, cached)
+    path = os.path.join(workdir, 'bench.db')
+    shutil.copyfile(cached, path)
+    return f'sqlite:///{path}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--entries', type=int, default=10000, help='Corpus size (1k to 1M)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--job-rounds', type=int, default=2)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--import-rows', type=int, default=1000)
+    parser.add_argument('--job-timeout', type=float, default=3600)
+    parser.add_argument('--filter', help='Only run scenarios whose name contains this (comma-separated)')
+    parser.add_argument('--database-url', help='Benchmark an existing database instead (seeded if empty)')
+    parser.add_argument('--cache-dir', default=os.path.join(tempfile.gettempdir(), 'oribasius-bench'))
+    parser.add_argument('--rebuild', action='store_true', help='Regenerate the cached corpus')
+    parser.add_argument('--output', help='Write JSON results here (default: stdout)')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='oribasius-bench-')
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    else:
+        os.environ['DATABASE_URL'] = prepare_sqlite(args, workdir)
+    os.environ.setdefault('JOB_WORKERS', '1')
+
+    import app as oribasius
+
+    with oribasius.app.app_context():
+        if args.database_url and not oribasius.Entry.query.first():
+            corpus.seed_database(oribasius, args.entries, args.seed)
+        if not oribasius.ThematicDivision.query.first():
+            oribasius.seed_thematic_divisions()
+        dialect = oribasius.db.engine.dialect.name
+
+    client = oribasius.app.test_client()
+    scenarios = build_scenarios(oribasius, args)
+    if args.filter:
+        wanted = args.filter.split(',')
+        scenarios = [s for s in scenarios if any(w in s.name for w in wanted)]
+
+    results = []
+    for scenario in scenarios:
+        result = run_scenario(client, scenario, args)
+        results.append(result)
+        if 'stats' in result:
+            print(f"{scenario.name:34s} median {result['stats']['median'] * 1000:10.2f} ms  "
+                  f"min {result['stats']['min'] * 1000:10.2f} ms"
+                  + (f"  {result['rows_per_sec']:10.0f} rows/s" if 'rows_per_sec' in result else ''), file=sys.stderr)
+        else:
+            print(f"{scenario.name:34s} ERROR {result['error']}", file=sys.stderr)
+
+    import sqlalchemy
+    report = {
+        'machine_info': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine(),
+            'cpu_count': os.cpu_count(),
+        },
+        'commit_info': git_info(),
+        'datetime': datetime.now(timezone.utc).isoformat(),
+        'config': {
+            'entries': args.entries,
+            'seed': args.seed,
+            'generator_version': corpus.GENERATOR_VERSION,
+            'rounds': args.rounds,
+            'job_rounds': args.job_rounds,
+            'warmup': args.warmup,
+            'import_rows': args.import_rows,
+            'dialect': dialect,
+            'flask': importlib.metadata.version('flask'),
+            'sqlalchemy': sqlalchemy.__version__,
+        },
+        'benchmarks': results,
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as stream:
+            stream.write(output + '\n')
+    else:
+        print(output)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""
+Concurrent read/write load against SQLite under both connection profiles.
+
+Spawns reader and writer processes (standing in for gunicorn workers) against
+a scratch database and reports read latency, write latency and lock errors for
+SQLite's default rollback journal versus the app's tuned WAL profile.
+
+    python bench/sqlite_contention.py --entries 5000 --readers 6 --writers 2 --seconds 10
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+WORKDIR = tempfile.mkdtemp(prefix='oribasius-contention-')
+# Point the app at a scratch database before importing it
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(WORKDIR, 'app.db')}"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event, text  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+import app as oribasius  # noqa: E402
+
+READ_SQL = text(
+    "SELECT author, SUM(word_count), COUNT(*) FROM entries GROUP BY author"
+)
+PAGE_SQL = text(
+    "SELECT id, book, chapter, body_greek FROM entries WHERE book = :book ORDER BY chapter"
+)
+WRITE_SQL = text(
+    "UPDATE entries SET note1 = :note, updated_at = CURRENT_TIMESTAMP WHERE id = :id"
+)
+HISTORY_SQL = text(
+    "INSERT INTO edit_history (entry_id, field_changed, snapshot, delta, chain, old_length, new_length, "
+    "new_crc, old_preview, new_preview, editor_name, edited_at) "
+    "VALUES (:id, 'note1', :snapshot, :delta, :chain, :old_length, :new_length, "
+    ":new_crc, :old_preview, :new_preview, 'bench', CURRENT_TIMESTAMP)"
+)
+
+
+def make_engine(path, profile):
+    oribasius.app.config['SQLITE_PROFILE'] = profile
+    uri = f"sqlite:///{path}"
+    options = oribasius.build_engine_options(uri) if profile == 'tuned' else {}
+    engine = create_engine(uri, **options)
+    if profile == 'tuned':
+        event.listen(engine, 'connect', oribasius.apply_sqlite_pragmas)
+    return engine
+
+
+def seed(path, profile, entries):
+    engine = make_engine(path, profile)
+    oribasius.db.metadata.create_all(engine)
+    rng = random.Random(7)
+    rows = [{
+        'author': f"Author {rng.randint(1, 40)}",
+        'book': rng.randint(1, 50),
+        'chapter': i,
+        'body_greek': ' '.join('ἔλαιον παλαιόν θερμαίνει' for _ in range(rng.randint(20, 200))),
+        'word_count': rng.randint(60, 600),
+    } for i in range(entries)]
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO entries (author, book, chapter, body_greek, word_count) "
+            "VALUES (:author, :book, :chapter, :body_greek, :word_count)"
+        ), rows)
+        if profile != 'tuned':
+            conn.exec_driver_sql('PRAGMA journal_mode=DELETE')
+    engine.dispose()
+
+
+def worker(role, path, profile, seconds, entries, queue):
+    engine = make_engine(path, profile)
+    rng = random.Random(os.getpid())
+    latencies, errors = [], 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            if role == 'reader':
+                with engine.connect() as conn:
+                    conn.execute(READ_SQL).fetchall()
+                    conn.execute(PAGE_SQL, {'book': rng.randint(1, 50)}).fetchall()
+            else:
+                entry_id = rng.randint(1, entries)
+                note = f"edit {rng.random()}"
+                with engine.begin() as conn:
+                    conn.execute(WRITE_SQL, {'id': entry_id, 'note': note})
+                    conn.execute(HISTORY_SQL, {'id': entry_id, **oribasius.history_values('', note)})
+                time.sleep(0.01)  # editors pause between saves
+            latencies.append(time.perf_counter() - started)
+        except OperationalError as exc:
+            if 'locked' not in str(exc):
+                raise
+            errors += 1
+    engine.dispose()
+    queue.put((role, latencies, errors))
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies, errors, seconds):
+    ms = [v * 1000 for v in latencies]
+    return {
+        'ops': len(ms),
+        'ops_per_sec': round(len(ms) / seconds, 1),
+        'lock_errors': errors,
+        'p50_ms': round(percentile(ms, 50), 2) if ms else None,
+        'p95_ms': round(percentile(ms, 95), 2) if ms else None,
+        'p99_ms': round(percentile(ms, 99), 2) if ms else None,
+        'mean_ms': round(statistics.mean(ms), 2) if ms else None,
+    }
+
+
+def run_profile(profile, args):
+    path = os.path.join(WORKDIR, f'{profile}.db')
+    seed(path, profile, args.entries)
+    queue = multiprocessing.Queue()
+    roles = ['reader'] * args.readers + ['writer'] * args.writers
+    procs = [multiprocessing.Process(target=worker, args=(role, path, profile, args.seconds, args.entries, queue))
+             for role in roles]
+    for proc in procs:
+        proc.start()
+    results = [queue.get() for _ in procs]
+    for proc in procs:
+        proc.join()
+
+    report = {}
+    for role in ('reader', 'writer'):
+        latencies = [v for r, lat, _ in results if r == role for v in lat]
+        errors = sum(err for r, _, err in results if r == role)
+        report[role] = summarize(latencies, errors, args.seconds)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--entries', type=int, default=5000)
+    parser.add_argument('--readers', type=int, default=6)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--profiles', default='default,tuned')
+    parser.add_argument('--json', action='store_true', help='Emit machine-readable results')
+    args = parser.parse_args()
+
+    results = {profile: run_profile(profile, args) for profile in args.profiles.split(',')}
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for profile, report in results.items():
+        print(f"[{profile}]")
+        for role, stats in report.items():
+            print(f"  {role:7s} ops={stats['ops']:6d} ({stats['ops_per_sec']}/s) "
+                  f"p50={stats['p50_ms']}ms p95={stats['p95_ms']}ms p99={stats['p99_ms']}ms "
+                  f"lock_errors={stats['lock_errors']}")
+
+
+if __name__ == '__main__':
+    main()
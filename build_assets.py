@@ -0,0 +1,64 @@
+"""
+Build content-hashed, precompressed copies of the index page's CSS and JS.
+
+Writes static/dist/<name>.<hash>.<ext> for every file in ASSETS, next to a .gz
+variant and, when the optional `brotli` package is installed, a .br variant, plus
+static/dist/manifest.json mapping each source name to its hashed file. app.py
+serves the hashed files from /assets/ with a one-year immutable Cache-Control
+and falls back to the plain /static/ files when the manifest is missing or stale.
+
+    python build_assets.py
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+
+try:
+    import brotli
+except ImportError:  # optional; gzip alone is enough for every browser
+    brotli = None
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(ROOT, 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+ASSETS = ['app.css', 'app.js']
+# Characters of the content hash kept in the file name
+HASH_LENGTH = 12
+
+
+def write(path, data):
+    with open(path, 'wb') as stream:
+        stream.write(data)
+
+
+def build():
+    if os.path.isdir(DIST_DIR):
+        shutil.rmtree(DIST_DIR)
+    os.makedirs(DIST_DIR)
+    manifest = {}
+    for name in ASSETS:
+        with open(os.path.join(STATIC_DIR, name), 'rb') as stream:
+            data = stream.read()
+        digest = hashlib.sha256(data).hexdigest()
+        stem, ext = os.path.splitext(name)
+        filename = f'{stem}.{digest[:HASH_LENGTH]}{ext}'
+        path = os.path.join(DIST_DIR, filename)
+        write(path, data)
+        # mtime=0 keeps the .gz byte-identical across builds of the same source
+        write(path + '.gz', gzip.compress(data, compresslevel=9, mtime=0))
+        sizes = [f'{len(data):,} B', f'gzip {os.path.getsize(path + ".gz"):,} B']
+        if brotli is not None:
+            write(path + '.br', brotli.compress(data, quality=11))
+            sizes.append(f'brotli {os.path.getsize(path + ".br"):,} B')
+        manifest[name] = {'file': filename, 'sha256': digest}
+        print(f'{name} -> dist/{filename} ({", ".join(sizes)})')
+    with open(os.path.join(DIST_DIR, 'manifest.json'), 'w', encoding='utf-8') as stream:
+        json.dump(manifest, stream, indent=2)
+    return manifest
+
+
+if __name__ == '__main__':
+    build()
@@ -0,0 +1,26 @@
+"""
+Gunicorn settings picked up automatically from the working directory.
+
+When PROMETHEUS_MULTIPROC_DIR is set, each worker writes its metrics to that
+directory and /metrics aggregates them; these hooks keep the directory clean
+across restarts and drop the live gauges of workers that exit.
+"""
+
+import os
+import shutil
+
+
+def on_starting(server):
+    path = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        try:
+            from prometheus_client import multiprocess
+        except ImportError:
+            return
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,1689 @@
+// State
+let entries = [];
+let filters = {};
+let authors = [];
+let ingredients = [];
+let charts = {};
+let currentEntryIngredients = [];
+let viewingEntryId = null;
+let corpusRevision = null;  // X-Corpus-Revision the rendered list reflects
+let facetCounts = null;      // last /api/facets result, shown in the filter dropdowns
+let facetGeneration = 0;
+
+// Virtualized entry list: `entries` holds summary rows for every match, only the cards
+// near the viewport are in the DOM, and their bodies/ingredients are fetched on demand
+const ENTRY_ESTIMATED_HEIGHT = 420;  // px, until a card has been measured
+const ENTRY_OVERSCAN = 4;            // cards rendered beyond each edge of the viewport
+let entryHeights = new Map();        // id -> measured card height
+let entryOffsets = [0];              // top of card i within the list; last item is the list height
+let entryGap = 16;
+let renderedRange = [0, 0];
+let entryDetails = new Map();        // id -> detail view, null if the entry is gone
+let entryDetailRequests = new Map(); // id -> in-flight detail fetch
+let listGeneration = 0;              // bumped by loadEntries() so stale detail responses are dropped
+let pendingHashReveal = true;        // honour #entry-<id> (URN redirects) once the list arrives
+const ENTRY_LOOKUP_CHUNK = 900;      // ids per ?ids= request, the server's limit
+
+// Other users' edits arrive from the change feed: server-sent events when the server enables
+// them, otherwise polling /api/changes. Both carry deltas applied on top of corpusRevision.
+const CHANGE_STREAM = document.body.dataset.changeStream === 'true';
+const CHANGE_POLL_MS = 15000;
+const CHANGE_RELOAD_DELAY_MS = 500;  // coalesce a burst of changes into one reload
+let changeReloads = new Set();       // views to refetch once the burst settles
+let changeReloadTimer = null;
+
+// Initialize
+document.addEventListener('DOMContentLoaded', () => {
+    loadFilters();
+    loadEntries().then(followChanges);
+    loadAuthors();
+    loadIngredients();
+    setupEventListeners();
+});
+
+function setupEventListeners() {
+    document.querySelectorAll('.nav-tab').forEach(tab => {
+        tab.addEventListener('click', () => {
+            if (tab.dataset.panel !== 'analytics') closeAnalyticsFullscreen();
+            document.querySelectorAll('.nav-tab').forEach(t => t.classList.remove('active'));
+            document.querySelectorAll('.panel').forEach(p => p.classList.remove('active'));
+            tab.classList.add('active');
+            document.getElementById(`panel-${tab.dataset.panel}`).classList.add('active');
+            if (tab.dataset.panel === 'analytics') loadAnalytics();
+            if (tab.dataset.panel === 'browse') renderVisibleEntries(true);
+        });
+    });
+
+    window.addEventListener('scroll', scheduleRenderVisibleEntries, { passive: true });
+    window.addEventListener('resize', scheduleRenderVisibleEntries);
+    window.addEventListener('hashchange', revealEntryFromHash);
+
+    const analyticsBtn = document.getElementById('analytics-fullscreen-btn');
+    if (analyticsBtn) analyticsBtn.addEventListener('click', toggleAnalyticsFullscreen);
+
+    document.getElementById('filter-search').addEventListener('keypress', e => {
+        if (e.key === 'Enter') loadEntries();
+    });
+
+    // Import drag/drop
+    const dropzone = document.getElementById('import-dropzone');
+    const fileInput = document.getElementById('import-file');
+    dropzone.addEventListener('dragover', e => { e.preventDefault(); dropzone.classList.add('dragover'); });
+    dropzone.addEventListener('dragleave', () => dropzone.classList.remove('dragover'));
+    dropzone.addEventListener('drop', e => {
+        e.preventDefault();
+        dropzone.classList.remove('dragover');
+        if (e.dataTransfer.files[0]) importFile(e.dataTransfer.files[0]);
+    });
+    fileInput.addEventListener('change', e => { if (e.target.files[0]) importFile(e.target.files[0]); });
+}
+
+document.addEventListener('keydown', e => {
+    if (e.key === 'Escape') {
+        closeAnalyticsFullscreen();
+        closeModal('view-modal');
+    }
+});
+
+async function loadFilters() {
+    try {
+        filters = await cachedJson('/api/filters');
+
+        const sourceAuthorSelect = document.getElementById('filter-source-author');
+        const editSourceAuthorSelect = document.getElementById('edit-source-author');
+        sourceAuthorSelect.innerHTML = '<option value="">All Authors</option>';
+        editSourceAuthorSelect.innerHTML = '<option value="">-- Select --</option>';
+        const sourceAuthorList = filters.source_authors || [];
+        sourceAuthorList.forEach(a => {
+            sourceAuthorSelect.innerHTML += `<option value="${a.id}" data-mode="source">${a.name}${a.sect ? ` (${a.sect})` : ''}</option>`;
+            editSourceAuthorSelect.innerHTML += `<option value="${a.id}">${a.name}</option>`;
+        });
+        if (sourceAuthorList.length === 0 && (filters.authors || []).length) {
+            (filters.authors || []).forEach(name => {
+                sourceAuthorSelect.innerHTML += `<option value="${name}" data-mode="legacy">${name}</option>`;
+            });
+        }
+
+        const sectSelect = document.getElementById('filter-sect');
+        sectSelect.innerHTML = '<option value="">All Sects</option>';
+        if ((filters.sects || []).length) {
+            sectSelect.dataset.mode = 'source';
+            filters.sects.forEach(s => {
+                sectSelect.innerHTML += `<option value="${s}">${s}</option>`;
+            });
+        } else if ((filters.pneumatists || []).length) {
+            sectSelect.dataset.mode = 'legacy';
+            filters.pneumatists.forEach(s => {
+                const label = s || 'Unknown';
+                sectSelect.innerHTML += `<option value="${label}">${label}</option>`;
+            });
+        } else {
+            sectSelect.dataset.mode = 'source';
+        }
+
+        const bookSelect = document.getElementById('filter-book');
+        bookSelect.innerHTML = '<option value="">All Books</option>';
+        (filters.books || []).forEach(b => {
+            bookSelect.innerHTML += `<option value="${b}">Book ${b}</option>`;
+        });
+
+        // Load ingredients for filter
+        ingredients = await cachedJson('/api/ingredients');
+        const ingredientSelect = document.getElementById('filter-ingredient');
+        const editIngredientSelect = document.getElementById('edit-ingredient-select');
+        ingredientSelect.innerHTML = '<option value="">All</option>';
+        editIngredientSelect.innerHTML = '<option value="">-- Select ingredient --</option>';
+        ingredients.forEach(i => {
+            const label = i.name_greek + (i.name_english ? ` (${i.name_english})` : '');
+            ingredientSelect.innerHTML += `<option value="${i.id}">${label}</option>`;
+            editIngredientSelect.innerHTML += `<option value="${i.id}">${label}</option>`;
+        });
+        showFacetCounts();
+    } catch (err) {
+        console.error('Error loading filters:', err);
+    }
+}
+
+async function loadEntries() {
+    const params = new URLSearchParams();
+    const sourceAuthorSelect = document.getElementById('filter-source-author');
+    const selectedAuthorOption = sourceAuthorSelect ? sourceAuthorSelect.options[sourceAuthorSelect.selectedIndex] : null;
+    const sectSelect = document.getElementById('filter-sect');
+    const sect = sectSelect.value;
+    const book = document.getElementById('filter-book').value;
+    const ingredient = document.getElementById('filter-ingredient').value;
+    const search = document.getElementById('filter-search').value;
+    const lemmaSearch = document.getElementById('lemma-search').checked;
+
+    if (selectedAuthorOption && selectedAuthorOption.value) {
+        if (selectedAuthorOption.dataset.mode === 'legacy') {
+            params.append('author', selectedAuthorOption.value);
+        } else {
+            params.append('source_author_id', selectedAuthorOption.value);
+        }
+    }
+    if (sect) {
+        if (sectSelect.dataset.mode === 'legacy') {
+            params.append('pneumatist', sect);
+        } else {
+            params.append('sect', sect);
+        }
+    }
+    if (book) params.append('book', book);
+    if (ingredient) params.append('ingredient_id', ingredient);
+    if (search) params.append('search', search);
+    if (lemmaSearch) params.append('lemma_search', 'true');
+    // Greek searches come back best match first (BM25 over lemmas)
+    if (/[\u0370-\u03FF\u1F00-\u1FFF]/.test(search)) params.append('sort_by', 'relevance');
+    // Bodies and ingredients come later, per card, from loadEntryDetails()
+    params.append('view', 'summary');
+    loadFacetCounts(params);
+
+    try {
+        // Without a search the cached corpus can answer locally, once it is validated as current
+        const cached = search ? null : await cachedEntryList(params);
+        if (cached) {
+            showEntryList(cached.entries, cached.revision);
+            return;
+        }
+        const resp = await fetch(`/api/entries?${params}`);
+        showEntryList(await resp.json(), parseInt(resp.headers.get('X-Corpus-Revision')));
+    } catch (err) {
+        console.error('Error loading entries:', err);
+        showToast('Failed to load entries', 'error');
+    }
+}
+
+// Entry counts per dropdown value for the other active filters and the search
+async function loadFacetCounts(params) {
+    const generation = ++facetGeneration;
+    const query = new URLSearchParams(params);
+    query.delete('view');
+    query.delete('sort_by');
+    try {
+        const resp = await fetch(`/api/facets?${query}`);
+        if (!resp.ok || generation !== facetGeneration) return;
+        facetCounts = await resp.json();
+        showFacetCounts();
+    } catch (err) {
+        console.error('Error loading facet counts:', err);
+    }
+}
+
+function showFacetCounts() {
+    if (!facetCounts) return;
+    const sourceAuthorSelect = document.getElementById('filter-source-author');
+    const sectSelect = document.getElementById('filter-sect');
+    const legacyAuthors = sourceAuthorSelect.querySelector('option[data-mode="legacy"]');
+    annotateFacetOptions(sourceAuthorSelect, facetCounts.facets[legacyAuthors ? 'author' : 'source_author_id']);
+    annotateFacetOptions(sectSelect, facetCounts.facets[sectSelect.dataset.mode === 'legacy' ? 'pneumatist' : 'sect']);
+    annotateFacetOptions(document.getElementById('filter-book'), facetCounts.facets.book);
+}
+
+function annotateFacetOptions(select, values) {
+    const counts = new Map((values || []).map(v => [String(v.value), v.entries]));
+    Array.from(select.options).forEach(option => {
+        if (!option.value) return;
+        if (option.dataset.label === undefined) option.dataset.label = option.textContent;
+        option.textContent = `${option.dataset.label} (${counts.get(option.value) || 0})`;
+    });
+}
+
+function showEntryList(list, revision) {
+    entries = list;
+    corpusRevision = revision;
+    listGeneration++;
+    entryDetails = new Map();
+    entryDetailRequests = new Map();
+    renderEntries();
+    updateStatsBar();
+    if (pendingHashReveal) {
+        pendingHashReveal = false;
+        revealEntryFromHash();
+    }
+}
+
+function renderEntries() {
+    const container = document.getElementById('entries-list');
+    if (entries.length === 0) {
+        container.innerHTML = '<div style="text-align: center; padding: 3rem; color: var(--ink-light);"><p>No entries found.</p></div>';
+        return;
+    }
+
+    container.innerHTML = '<div id="entries-top-spacer"></div>' +
+        '<div class="entries-window" id="entries-window"></div><div id="entries-bottom-spacer"></div>';
+    entryGap = parseFloat(getComputedStyle(document.getElementById('entries-window')).rowGap) || 0;
+    layoutEntries();
+    renderVisibleEntries(true);
+}
+
+function layoutEntries() {
+    entryOffsets = new Array(entries.length + 1);
+    entryOffsets[0] = 0;
+    entries.forEach((e, i) => {
+        entryOffsets[i + 1] = entryOffsets[i] + (entryHeights.get(e.id) ?? ENTRY_ESTIMATED_HEIGHT) + entryGap;
+    });
+}
+
+// Index of the card covering list offset y
+function entryIndexAt(y) {
+    let lo = 0, hi = entries.length - 1;
+    while (lo < hi) {
+        const mid = (lo + hi + 1) >> 1;
+        if (entryOffsets[mid] <= y) lo = mid; else hi = mid - 1;
+    }
+    return lo;
+}
+
+function entriesListTop() {
+    return document.getElementById('entries-list').getBoundingClientRect().top + window.scrollY;
+}
+
+function withDetail(entry) {
+    const detail = entryDetails.get(entry.id);
+    return detail ? { ...entry, ...detail } : entry;
+}
+
+// Render the cards around the viewport, measure them, and fetch the bodies they still lack
+function renderVisibleEntries(force = false) {
+    const windowEl = document.getElementById('entries-window');
+    if (!windowEl || !windowEl.offsetParent || entries.length === 0) return;
+    const viewTop = window.scrollY - entriesListTop();
+    const first = Math.max(0, entryIndexAt(viewTop) - ENTRY_OVERSCAN);
+    const last = Math.min(entries.length, entryIndexAt(viewTop + window.innerHeight) + 1 + ENTRY_OVERSCAN);
+    if (!force && first === renderedRange[0] && last === renderedRange[1]) return;
+    renderedRange = [first, last];
+
+    const visible = entries.slice(first, last);
+    windowEl.innerHTML = visible.map(e => renderEntryCard(withDetail(e))).join('');
+
+    // Swap estimates for real heights; keep what is on screen still when cards above it change size
+    const anchor = entryIndexAt(Math.max(0, viewTop));
+    let shift = 0;
+    windowEl.querySelectorAll('.entry-card').forEach((card, i) => {
+        const id = visible[i].id;
+        const height = card.offsetHeight;
+        const before = entryHeights.get(id) ?? ENTRY_ESTIMATED_HEIGHT;
+        if (height !== before && first + i < anchor) shift += height - before;
+        entryHeights.set(id, height);
+    });
+    layoutEntries();
+    document.getElementById('entries-top-spacer').style.height = `${entryOffsets[first]}px`;
+    document.getElementById('entries-bottom-spacer').style.height =
+        `${Math.max(0, entryOffsets[entries.length] - entryOffsets[last])}px`;
+    if (shift) window.scrollBy(0, shift);
+
+    const missing = visible.filter(e => !entryDetails.has(e.id)).map(e => e.id);
+    if (missing.length) {
+        loadEntryDetails(missing).then(() => renderVisibleEntries(true)).catch(err => {
+            console.error('Error loading entry details:', err);
+        });
+    }
+}
+
+async function fetchEntryDetails(ids) {
+    const details = [];
+    for (let i = 0; i < ids.length; i += ENTRY_LOOKUP_CHUNK) {
+        const params = new URLSearchParams({
+            ids: ids.slice(i, i + ENTRY_LOOKUP_CHUNK).join(','), view: 'detail',
+            include_ingredients: 'true', snippets: 'false'
+        });
+        const resp = await fetch(`/api/entries?${params}`);
+        if (!resp.ok) throw new Error(`entry details: HTTP ${resp.status}`);
+        details.push(...await resp.json());
+    }
+    return details;
+}
+
+// Fetch the detail view (bodies, ingredients, notes) for entries, sharing in-flight requests;
+// the cached corpus answers first when it reflects the same revision as the list
+function loadEntryDetails(ids) {
+    const missing = ids.filter(id => !entryDetails.has(id) && !entryDetailRequests.has(id));
+    if (missing.length) {
+        const generation = listGeneration;
+        const request = cachedEntryDetails(missing)
+            .then(async cached => {
+                const rest = missing.filter(id => !cached.has(id));
+                const fetched = rest.length ? await fetchEntryDetails(rest) : [];
+                if (generation !== listGeneration) return;
+                missing.forEach(id => entryDetails.set(id, null));  // deleted meanwhile
+                cached.forEach((d, id) => entryDetails.set(id, d));
+                fetched.forEach(d => entryDetails.set(d.id, d));
+            })
+            .finally(() => {
+                if (generation === listGeneration) missing.forEach(id => entryDetailRequests.delete(id));
+            });
+        missing.forEach(id => entryDetailRequests.set(id, request));
+    }
+    return Promise.all(ids.map(id => entryDetailRequests.get(id)).filter(Boolean));
+}
+
+async function entryWithDetail(id) {
+    await loadEntryDetails([id]);
+    const entry = entries.find(e => e.id === id);
+    return entry ? withDetail(entry) : null;
+}
+
+let scrollFrame = null;
+function scheduleRenderVisibleEntries() {
+    if (scrollFrame) return;
+    scrollFrame = requestAnimationFrame(() => {
+        scrollFrame = null;
+        renderVisibleEntries();
+    });
+}
+
+// Deep links (#entry-<id>, e.g. from /urn/... redirects) point at cards that may not be rendered yet
+function revealEntryFromHash() {
+    const match = location.hash.match(/^#entry-(\d+)$/);
+    if (!match) return;
+    const index = entries.findIndex(e => e.id === parseInt(match[1]));
+    if (index < 0) return;
+    window.scrollTo(0, entriesListTop() + entryOffsets[index]);
+    renderVisibleEntries(true);
+    // Cards above may have been re-measured while rendering; settle on the card itself
+    const settle = () => document.getElementById(`entry-${entries[index].id}`)?.scrollIntoView();
+    settle();
+    loadEntryDetails([entries[index].id]).then(() => {
+        renderVisibleEntries(true);
+        settle();
+    }).catch(() => {});
+}
+
+function renderEntryCard(e) {
+    const author = e.source_author;
+    const sectBadge = author?.sect 
+        ? `<span class="badge badge-sect ${!author.sect_certain ? 'uncertain' : ''}">${author.sect}${!author.sect_certain ? '?' : ''}</span>` 
+        : '';
+    const ingredientBadges = (e.ingredients || []).slice(0, 3).map(i => 
+        `<span class="badge badge-ingredient">${i.name_greek}</span>`
+    ).join('') + (e.ingredients?.length > 3 ? `<span class="badge badge-ingredient">+${e.ingredients.length - 3}</span>` : '');
+
+    return `
+    <div class="entry-card" id="entry-${e.id}">
+        <div class="entry-header">
+            <div class="entry-meta">
+                <span class="entry-location">${formatEntryLocation(e)}</span>
+                <span class="entry-author">
+                    ${e.author_named ? `<strong>${e.author_named}</strong> · ` : ''}
+                    Source: ${author?.name || e.author || 'Unknown'}
+                </span>
+            </div>
+            <div class="entry-badges">
+                ${e.author_group ? `<span class="badge badge-author-group">${e.author_group}</span>` : ''}
+                ${sectBadge}
+                <span class="badge badge-words">${e.word_count || 0} words</span>
+                ${e.score != null ? `<span class="badge badge-words" title="Search relevance (BM25)">score ${e.score.toFixed(2)}</span>` : ''}
+                ${ingredientBadges}
+            </div>
+        </div>
+        <div class="entry-body">
+            <div class="text-columns">
+                <div class="text-column">
+                    <h3>Greek Text</h3>
+                    <div class="greek-text">
+                        ${e.title_greek ? `<strong>${e.title_greek}</strong><br><br>` : ''}
+                        ${entryText(e, 'body_greek')}
+                    </div>
+                </div>
+                <div class="text-column">
+                    <h3>Translation</h3>
+                    <div class="translation-text">
+                        ${e.translation_title ? `<strong>${e.translation_title}</strong><br><br>` : ''}
+                        ${entryText(e, 'translation_content')}
+                    </div>
+                </div>
+            </div>
+        </div>
+        <div class="entry-footer">
+            <div class="entry-urns">
+                ${e.urn_cts ? `<span>CTS: ${e.urn_cts}</span>` : ''}
+                ${e.urn_raeder ? `<span>Raeder: ${e.urn_raeder}</span>` : ''}
+                ${!e.urn_cts && !e.urn_raeder ? '<button class="btn btn-small btn-outline" onclick="generateURN(' + e.id + ')">Generate URNs</button>' : ''}
+            </div>
+            <div class="entry-actions">
+                <button class="btn btn-small btn-outline" onclick="viewEntry(${e.id})">View</button>
+                <button class="btn btn-small btn-primary" onclick="editEntry(${e.id})">Edit</button>
+            </div>
+        </div>
+    </div>`;
+}
+
+// Entry fields that decide whether an entry is in the current list and where it sits
+function listingFields() {
+    const fields = ['book'];  // the list is ordered by book
+    if (document.getElementById('filter-source-author')?.value) fields.push('source_author_id', 'author');
+    if (document.getElementById('filter-sect').value) fields.push('source_author_id', 'pneumatist');
+    if (document.getElementById('filter-ingredient').value) fields.push('ingredients');
+    if (document.getElementById('filter-search').value) {
+        fields.push('title_greek', 'body_greek', 'translation_title', 'translation_content');
+    }
+    return fields;
+}
+
+// Apply a write response to the rendered list: patch or drop the one card when this write is
+// the only change since the list was loaded and cannot move the entry in or out of it or
+// reorder it, catch up from the change feed when other writes landed in between, and
+// otherwise refetch the list. `updated` is the entry returned, null for a delete.
+function applyEntryChange(resp, id, updated) {
+    const revision = parseInt(resp.headers.get('X-Corpus-Revision'));
+    const index = entries.findIndex(e => e.id === id);
+    const current = index >= 0 ? withDetail(entries[index]) : null;
+    const key = (entry, field) => JSON.stringify(
+        field === 'ingredients' ? (entry.ingredients || []).map(i => i.id) : entry[field] ?? null);
+    const moved = updated && current && listingFields().some(f => key(current, f) !== key(updated, f));
+    if (revision <= corpusRevision) return;  // the change feed got here first
+    if (!current || moved) {
+        loadEntries();
+        return;
+    }
+    if (revision !== corpusRevision + 1) {
+        pollChanges();  // others wrote meanwhile: catch up from the change feed, this write included
+        return;
+    }
+    corpusRevision = revision;
+    if (updated) {
+        // Keep the search extras (snippets, score, lemma matches): the searched fields did not change
+        entries[index] = { ...entries[index], ...updated };
+        entryDetails.set(id, updated);
+        renderVisibleEntries(true);
+    } else {
+        entries.splice(index, 1);
+        entryDetails.delete(id);
+        renderEntries();
+    }
+    updateStatsBar();
+}
+
+// Persistent corpus cache (IndexedDB): a summary row per entry for filtering the browse list
+// locally, the detail row for its card, and the JSON of corpus-derived views (filters,
+// analytics, maps), all stamped with the corpus revision they reflect. /api/revision
+// validates it; /api/changes brings it up to date; an empty or outdated copy is refilled
+// in the background by id range while the page keeps using the server.
+const CORPUS_CACHE_DB = 'oribasius-corpus';
+const CORPUS_CACHE_VERSION = 1;
+const CORPUS_FILL_RANGE = 500;  // entry ids per request while filling
+const CACHED_SUMMARY_FIELDS = ['id', 'book', 'chapter', 'section', 'chapter_title', 'author', 'author_named',
+    'author_group', 'source_author_id', 'source_author', 'pneumatist', 'title_greek', 'translation_title',
+    'word_count', 'urn_cts'];
+let corpusCacheDb = null;       // promise of the IDBDatabase, null inside if unavailable
+let corpusCacheRevision = null; // revision of the cached rows as last validated
+let corpusCacheCheck = null;    // in-flight validation, shared by concurrent loads
+let corpusCacheFilling = false;
+let revisionRequest = null;     // in-flight /api/revision, shared by the page-load burst
+const EMPTY_CORPUS_CACHE = { revision: 0, filled_to: 0, complete: false };
+
+function openCorpusCache() {
+    if (!corpusCacheDb) {
+        corpusCacheDb = new Promise(resolve => {
+            if (!window.indexedDB) return resolve(null);
+            const req = indexedDB.open(CORPUS_CACHE_DB, CORPUS_CACHE_VERSION);
+            req.onupgradeneeded = () => {
+                ['summaries', 'details'].forEach(name => req.result.createObjectStore(name, { keyPath: 'id' }));
+                ['meta', 'responses'].forEach(name => req.result.createObjectStore(name));
+            };
+            req.onsuccess = () => resolve(req.result);
+            req.onerror = () => resolve(null);  // e.g. storage disabled: run uncached
+        });
+    }
+    return corpusCacheDb;
+}
+
+function idbResult(req) {
+    return new Promise((resolve, reject) => {
+        req.onsuccess = () => resolve(req.result);
+        req.onerror = () => reject(req.error);
+    });
+}
+
+async function cacheRead(store, read) {
+    const idb = await openCorpusCache();
+    return idb ? idbResult(read(idb.transaction(store).objectStore(store))) : undefined;
+}
+
+async function cacheWrite(stores, write) {
+    const idb = await openCorpusCache();
+    if (!idb) return;
+    const tx = idb.transaction(stores, 'readwrite');
+    write(...stores.map(name => tx.objectStore(name)));
+    return new Promise((resolve, reject) => {
+        tx.oncomplete = () => resolve();
+        tx.onerror = tx.onabort = () => reject(tx.error);
+    });
+}
+
+function serverRevision() {
+    if (!revisionRequest) {
+        revisionRequest = fetch('/api/revision')
+            .then(resp => resp.ok ? resp.json() : null)
+            .catch(() => null)
+            .finally(() => { revisionRequest = null; });
+    }
+    return revisionRequest;
+}
+
+// GET a corpus-derived JSON view, served from the cache while the corpus revision is unchanged
+async function cachedJson(url) {
+    const server = await serverRevision();
+    const cached = server ? await cacheRead('responses', store => store.get(url)) : null;
+    if (cached && cached.revision === server.revision) return cached.body;
+    const resp = await fetch(url);
+    const body = await resp.json();
+    // Stamped with the revision read before the fetch: a write in between only costs a refetch
+    if (server && resp.ok) {
+        cacheWrite(['responses'], store => store.put({ revision: server.revision, body }, url))
+            .catch(err => console.error('Error caching response:', err));
+    }
+    return body;
+}
+
+function cachedSummary(detail) {
+    const summary = { ingredient_ids: (detail.ingredients || []).map(i => i.id) };
+    CACHED_SUMMARY_FIELDS.forEach(f => { summary[f] = detail[f]; });
+    return summary;
+}
+
+function storeEntryDetails(details, removedIds, state) {
+    return cacheWrite(['summaries', 'details', 'meta'], (summaries, detailStore, meta) => {
+        details.forEach(d => {
+            detailStore.put(d);
+            summaries.put(cachedSummary(d));
+        });
+        removedIds.forEach(id => {
+            detailStore.delete(id);
+            summaries.delete(id);
+        });
+        meta.put(state, 'state');
+    });
+}
+
+// The cache state if it is complete and at least as new as the server's corpus, else null
+function currentCorpusCache() {
+    if (!corpusCacheCheck) {
+        corpusCacheCheck = validateCorpusCache().finally(() => { corpusCacheCheck = null; });
+    }
+    return corpusCacheCheck;
+}
+
+async function validateCorpusCache() {
+    if (corpusCacheFilling) return null;
+    try {
+        if (!await openCorpusCache()) return null;
+        const [server, stored] = await Promise.all([serverRevision(), cacheRead('meta', store => store.get('state'))]);
+        if (!server) return null;
+        let state = stored || EMPTY_CORPUS_CACHE;
+        if (state.complete && state.revision < server.revision && state.revision >= server.log_floor) {
+            state = await catchUpCorpusCache(state) || EMPTY_CORPUS_CACHE;
+        }
+        if (state.complete && state.revision >= server.revision) {
+            corpusCacheRevision = state.revision;
+            return state;
+        }
+        fillCorpusCache(state, server);
+    } catch (err) {
+        console.error('Error validating corpus cache:', err);
+    }
+    return null;
+}
+
+// Apply the change log since the cache's revision: refetch created and updated entries (and
+// those embedding a changed author or ingredient), drop deleted ones. Null when the log
+// cannot cover the gap and the copy has to be refilled.
+async function catchUpCorpusCache(state) {
+    for (;;) {
+        const resp = await fetch(`/api/changes?since=${state.revision}`);
+        if (!resp.ok) throw new Error(`changes: HTTP ${resp.status}`);
+        const feed = await resp.json();
+        if (feed.reset || feed.changes.some(c => c.entity === 'corpus')) return null;
+        const refetch = new Set();
+        const removed = new Set();
+        let summaries = null;
+        for (const change of feed.changes) {
+            if (change.entity === 'entry') {
+                const [add, drop] = change.action === 'delete' ? [removed, refetch] : [refetch, removed];
+                add.add(change.entity_id);
+                drop.delete(change.entity_id);
+            } else {
+                summaries = summaries || await cacheRead('summaries', store => store.getAll());
+                summaries.filter(e => change.entity === 'source_author'
+                    ? e.source_author_id === change.entity_id
+                    : e.ingredient_ids.includes(change.entity_id)).forEach(e => refetch.add(e.id));
+            }
+        }
+        const details = await fetchEntryDetails([...refetch]);
+        const found = new Set(details.map(d => d.id));
+        refetch.forEach(id => { if (!found.has(id)) removed.add(id); });
+        state = { ...state, revision: feed.revision };
+        await storeEntryDetails(details, removed, state);
+        if (!feed.more) return state;
+    }
+}
+
+// Copy the corpus by id range, resuming an interrupted fill, then catch up on the writes
+// that landed meanwhile. Runs in the background; the next list load uses the result.
+async function fillCorpusCache(state, server) {
+    corpusCacheFilling = true;
+    try {
+        const resumable = !state.complete && state.filled_to > 0 &&
+            state.revision >= server.log_floor && state.revision <= server.revision;
+        if (!resumable) {
+            state = { ...EMPTY_CORPUS_CACHE, revision: server.revision };
+            await cacheWrite(['summaries', 'details', 'responses', 'meta'], (...stores) => {
+                stores.forEach(store => store.clear());
+                stores[3].put(state, 'state');
+            });
+        }
+        for (let from = state.filled_to + 1; from <= server.max_entry_id; from += CORPUS_FILL_RANGE) {
+            const params = new URLSearchParams({
+                id_from: from, id_to: from + CORPUS_FILL_RANGE - 1,
+                view: 'detail', include_ingredients: 'true', snippets: 'false'
+            });
+            const resp = await fetch(`/api/entries?${params}`);
+            if (!resp.ok) throw new Error(`entries: HTTP ${resp.status}`);
+            state = { ...state, filled_to: from + CORPUS_FILL_RANGE - 1 };
+            await storeEntryDetails(await resp.json(), [], state);
+        }
+        state = await catchUpCorpusCache(state);
+        if (state) await cacheWrite(['meta'], meta => meta.put({ ...state, complete: true }, 'state'));
+    } catch (err) {
+        console.error('Error filling corpus cache:', err);
+    } finally {
+        corpusCacheFilling = false;
+    }
+}
+
+// The browse list from the cache when it is current: the server's filters, ordered by book
+async function cachedEntryList(params) {
+    const state = await currentCorpusCache();
+    if (!state) return null;
+    const rows = await cacheRead('summaries', store => store.getAll());
+    const is = (value, wanted) => String(value ?? '') === wanted;
+    const tests = {
+        author: (e, v) => is(e.author, v),
+        source_author_id: (e, v) => is(e.source_author_id, v),
+        sect: (e, v) => is(e.source_author?.sect, v),
+        pneumatist: (e, v) => is(e.pneumatist, v),
+        book: (e, v) => is(e.book, v),
+        ingredient_id: (e, v) => e.ingredient_ids.some(id => is(id, v))
+    };
+    const active = [...params].filter(([name]) => tests[name]);
+    const list = rows.filter(e => active.every(([name, value]) => tests[name](e, value)));
+    list.sort((a, b) => (a.book ?? -Infinity) - (b.book ?? -Infinity) || a.id - b.id);
+    return { entries: list, revision: state.revision };
+}
+
+// Card details straight from the cache, when it reflects the list's revision
+async function cachedEntryDetails(ids) {
+    const found = new Map();
+    if (corpusCacheRevision === null || corpusCacheRevision !== corpusRevision) return found;
+    const idb = await openCorpusCache();
+    const store = idb.transaction('details').objectStore('details');
+    const details = await Promise.all(ids.map(id => idbResult(store.get(id))));
+    details.forEach(d => { if (d) found.set(d.id, d); });
+    return found;
+}
+
+function followChanges() {
+    if (CHANGE_STREAM) {
+        // EventSource reconnects on its own, resuming from the last event id
+        const source = new EventSource(`/api/changes/stream?since=${corpusRevision || 0}`);
+        source.addEventListener('change', e => applyChangeFeed(JSON.parse(e.data)));
+    } else {
+        setInterval(pollChanges, CHANGE_POLL_MS);
+    }
+}
+
+async function pollChanges() {
+    if (corpusRevision === null || Number.isNaN(corpusRevision) || document.hidden) return;
+    try {
+        const resp = await fetch(`/api/changes?since=${corpusRevision}`);
+        if (!resp.ok) return;
+        const feed = await resp.json();
+        applyChangeFeed(feed);
+        if (feed.more) pollChanges();
+    } catch (err) {
+        console.error('Error polling changes:', err);
+    }
+}
+
+// Apply a /api/changes payload: patch edited cards in place, drop deleted ones, and refetch
+// only the views a change can reorder or that hold derived data (analytics, maps)
+function applyChangeFeed(feed) {
+    if (corpusRevision === null || Number.isNaN(corpusRevision)) return;
+    if (feed.reset) {
+        scheduleChangeReload('entries', 'authors', 'ingredients', 'filters', 'analytics');
+        corpusRevision = feed.revision;
+        return;
+    }
+    if (feed.revision <= corpusRevision) return;
+    const summaries = new Map(feed.entries.map(e => [e.id, e]));
+    const fields = listingFields();
+    let patched = false;
+    let removed = false;
+    feed.changes.filter(c => c.revision > corpusRevision).forEach(change => {
+        if (change.entity === 'source_author') {
+            scheduleChangeReload('entries', 'authors', 'filters');
+        } else if (change.entity === 'ingredient') {
+            scheduleChangeReload('ingredients', 'filters');
+            entryDetails = new Map();  // cached cards embed ingredient names
+            patched = true;
+        } else if (change.entity === 'corpus' || change.action === 'create') {
+            scheduleChangeReload('entries', 'authors', 'filters');
+        } else if (change.action === 'delete') {
+            const index = entries.findIndex(e => e.id === change.entity_id);
+            if (index >= 0) {
+                entries.splice(index, 1);
+                removed = true;
+            }
+            entryDetails.delete(change.entity_id);
+        } else if ((change.fields || []).some(f => fields.includes(f))) {
+            scheduleChangeReload('entries');
+        } else {
+            const index = entries.findIndex(e => e.id === change.entity_id);
+            const summary = summaries.get(change.entity_id);
+            if (index >= 0 && summary) entries[index] = { ...entries[index], ...summary };
+            entryDetails.delete(change.entity_id);  // refetched when the card is next drawn
+            patched = true;
+        }
+    });
+    scheduleChangeReload('analytics');
+    corpusRevision = feed.revision;
+    if (removed) {
+        renderEntries();
+        updateStatsBar();
+    } else if (patched) {
+        renderVisibleEntries(true);
+    }
+}
+
+function scheduleChangeReload(...views) {
+    views.forEach(v => changeReloads.add(v));
+    clearTimeout(changeReloadTimer);
+    changeReloadTimer = setTimeout(() => {
+        const pending = changeReloads;
+        changeReloads = new Set();
+        const panel = document.querySelector('.nav-tab.active')?.dataset.panel;
+        if (pending.has('entries')) loadEntries();
+        if (pending.has('authors')) loadAuthors();
+        if (pending.has('ingredients')) loadIngredients();
+        if (pending.has('filters')) loadFilters();
+        // Analytics and the maps reload on their own when their tab is opened
+        if (pending.has('analytics') && panel === 'analytics') loadAnalytics();
+        if (pending.has('analytics') && panel === 'structure' && thematicData) loadThematicMap();
+    }, CHANGE_RELOAD_DELAY_MS);
+}
+
+function escapeHtml(text) {
+    return text.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;');
+}
+
+// Keyword-in-context snippets sent with search results; highlights are offsets into snippet.text
+function renderSnippets(entry, field) {
+    const snippets = (entry.snippets || []).filter(s => s.field === field);
+    return snippets.map(s => {
+        let html = '';
+        let cursor = 0;
+        for (const [start, end] of s.highlights) {
+            html += escapeHtml(s.text.slice(cursor, start)) + '<mark>' + escapeHtml(s.text.slice(start, end)) + '</mark>';
+            cursor = end;
+        }
+        return `<div class="snippet">${html + escapeHtml(s.text.slice(cursor))}</div>`;
+    }).join('');
+}
+
+function truncate(text, max) {
+    if (!text) return '<em style="color: var(--ink-light);">No content</em>';
+    return text.length <= max ? text : text.substring(0, max) + '...';
+}
+
+// Card text: search snippets, else the (lazily loaded) body
+function entryText(e, field) {
+    const snippets = renderSnippets(e, field);
+    if (snippets) return snippets;
+    if (e[field] === undefined) return '<em style="color: var(--ink-light);">Loading…</em>';
+    return truncate(e[field], 500);
+}
+
+async function viewEntry(id) {
+    const entry = await entryWithDetail(id);
+    if (!entry) return;
+    viewingEntryId = id;
+    const title = entry.author_named ? `${entry.author_named} – ${formatEntryLocation(entry)}` : `Entry ${entry.id}`;
+    document.getElementById('view-modal-title').textContent = title;
+    document.getElementById('view-modal-body').innerHTML = buildViewModalContent(entry);
+    document.getElementById('view-modal').classList.add('active');
+}
+
+function buildViewModalContent(entry) {
+    const sourceAuthor = entry.source_author;
+    const sectLabel = sourceAuthor?.sect ? `${sourceAuthor.sect}${sourceAuthor.sect_certain === false ? '?' : ''}` : (entry.pneumatist || 'Unknown');
+    const ingredientList = (entry.ingredients || []).map(i => i.name_greek + (i.name_english ? ` (${i.name_english})` : '')).join(', ');
+    const notes = [entry.note1, entry.note2, entry.note3, entry.note4].filter(Boolean).join('<br><br>');
+    const themes = (entry.themes || []).join(', ');
+    const urnLines = [];
+    if (entry.urn_cts) urnLines.push(`CTS: ${entry.urn_cts}`);
+    if (entry.urn_raeder) urnLines.push(`Raeder: ${entry.urn_raeder}`);
+    const urnDisplay = urnLines.length ? urnLines.join('<br>') : '—';
+
+    return `
+        <div class="view-grid">
+            <div class="view-section">
+                <h4>Location</h4>
+                <div>${formatEntryLocation(entry)}</div>
+            </div>
+            <div class="view-section">
+                <h4>Source Author</h4>
+                <div>${sourceAuthor?.name || entry.author || 'Unknown'}${sectLabel ? ` · ${sectLabel}` : ''}</div>
+            </div>
+            <div class="view-section">
+                <h4>Word Count</h4>
+                <div>${(entry.word_count || 0).toLocaleString()}</div>
+            </div>
+            <div class="view-section">
+                <h4>URNs</h4>
+                <div>${urnDisplay}</div>
+            </div>
+            <div class="view-section">
+                <h4>Ingredients</h4>
+                <div>${ingredientList || '<em>None</em>'}</div>
+            </div>
+            <div class="view-section">
+                <h4>Themes</h4>
+                <div>${themes || '<em>None</em>'}</div>
+            </div>
+        </div>
+        <div class="view-section">
+            <h4>Greek Text</h4>
+            <div class="view-text greek">${entry.title_greek ? `<strong>${entry.title_greek}</strong><br><br>` : ''}${entry.body_greek || '<em>No Greek text</em>'}</div>
+        </div>
+        <div class="view-section">
+            <h4>Translation</h4>
+            <div class="view-text">${entry.translation_title ? `<strong>${entry.translation_title}</strong><br><br>` : ''}${entry.translation_content || '<em>No translation</em>'}</div>
+        </div>
+        <div class="view-section">
+            <h4>Notes</h4>
+            <div class="view-text">${notes || '<em>No notes</em>'}</div>
+        </div>
+    `;
+}
+
+function openEditFromView() {
+    if (!viewingEntryId) return;
+    const id = viewingEntryId;
+    viewingEntryId = null;
+    closeModal('view-modal');
+    editEntry(id);
+}
+
+function getChapterLabel(entry) {
+    const hasNumber = entry.chapter !== null && entry.chapter !== undefined && entry.chapter !== '';
+    if (entry.chapter_title && hasNumber) {
+        return `${entry.chapter_title} (${entry.chapter})`;
+    }
+    if (entry.chapter_title) return entry.chapter_title;
+    if (hasNumber) return entry.chapter;
+    return '?';
+}
+
+function formatEntryLocation(entry) {
+    const parts = [`Book ${entry.book || '?'}`];
+    const chapterLabel = getChapterLabel(entry);
+    if (chapterLabel) parts.push(`Ch. ${chapterLabel}`);
+    if (entry.section) parts.push(`§ ${entry.section}`);
+    return parts.join(', ');
+}
+
+function updateStatsBar() {
+    document.getElementById('stat-entries').textContent = entries.length.toLocaleString();
+    const totalWords = entries.reduce((sum, e) => sum + (e.word_count || 0), 0);
+    document.getElementById('stat-words').textContent = totalWords.toLocaleString();
+    const uniqueAuthors = new Set(entries.map(e => e.source_author?.name || e.author).filter(a => a));
+    document.getElementById('stat-authors').textContent = uniqueAuthors.size;
+}
+
+// Entry CRUD
+async function editEntry(id) {
+    const entry = await entryWithDetail(id);
+    if (!entry) return;
+
+    document.getElementById('modal-title').textContent = 'Edit Entry';
+    document.getElementById('delete-btn').style.display = 'inline-flex';
+    document.getElementById('edit-id').value = entry.id;
+    document.getElementById('edit-author-named').value = entry.author_named || '';
+    document.getElementById('edit-source-author').value = entry.source_author_id || '';
+    document.getElementById('edit-author-group').value = entry.author_group || '';
+    document.getElementById('edit-book').value = entry.book || '';
+    document.getElementById('edit-chapter').value = entry.chapter || '';
+    document.getElementById('edit-chapter-title').value = entry.chapter_title || '';
+    document.getElementById('edit-section').value = entry.section || '';
+    document.getElementById('edit-raeder-volume').value = entry.raeder_volume || '';
+    document.getElementById('edit-raeder-page').value = entry.raeder_page || '';
+    document.getElementById('edit-raeder-line-start').value = entry.raeder_line_start || '';
+    document.getElementById('edit-raeder-line-end').value = entry.raeder_line_end || '';
+    document.getElementById('edit-title-greek').value = entry.title_greek || '';
+    document.getElementById('edit-body-greek').value = entry.body_greek || '';
+    document.getElementById('edit-translation-title').value = entry.translation_title || '';
+    document.getElementById('edit-translation-content').value = entry.translation_content || '';
+    document.getElementById('edit-note1').value = entry.note1 || '';
+    document.getElementById('edit-note2').value = entry.note2 || '';
+
+    currentEntryIngredients = entry.ingredients || [];
+    renderEntryIngredients();
+    document.getElementById('edit-modal').classList.add('active');
+}
+
+function openNewEntryModal() {
+    document.getElementById('modal-title').textContent = 'New Entry';
+    document.getElementById('delete-btn').style.display = 'none';
+    document.getElementById('edit-id').value = '';
+    ['author-named', 'source-author', 'author-group', 'book', 'chapter', 'chapter-title', 'section',
+     'raeder-volume', 'raeder-page', 'raeder-line-start', 'raeder-line-end',
+     'title-greek', 'body-greek', 'translation-title', 'translation-content', 'note1', 'note2'
+    ].forEach(f => { 
+        const el = document.getElementById(`edit-${f}`);
+        if (el) el.value = '';
+    });
+    currentEntryIngredients = [];
+    renderEntryIngredients();
+    document.getElementById('edit-modal').classList.add('active');
+}
+
+function renderEntryIngredients() {
+    const container = document.getElementById('entry-ingredients-list');
+    container.innerHTML = currentEntryIngredients.map(i => `
+        <span class="tag">
+            ${i.name_greek}
+            <button class="tag-remove" onclick="removeIngredientFromEntry(${i.id})">&times;</button>
+        </span>
+    `).join('');
+}
+
+function addIngredientToEntry() {
+    const select = document.getElementById('edit-ingredient-select');
+    const id = parseInt(select.value);
+    if (!id) return;
+    const ingredient = ingredients.find(i => i.id === id);
+    if (ingredient && !currentEntryIngredients.find(i => i.id === id)) {
+        currentEntryIngredients.push(ingredient);
+        renderEntryIngredients();
+    }
+}
+
+function removeIngredientFromEntry(id) {
+    currentEntryIngredients = currentEntryIngredients.filter(i => i.id !== id);
+    renderEntryIngredients();
+}
+
+async function saveEntry() {
+    const id = document.getElementById('edit-id').value;
+    const data = {
+        author_named: document.getElementById('edit-author-named').value,
+        source_author_id: parseInt(document.getElementById('edit-source-author').value) || null,
+        author_group: document.getElementById('edit-author-group').value,
+        book: parseInt(document.getElementById('edit-book').value) || null,
+        chapter: parseInt(document.getElementById('edit-chapter').value) || null,
+        chapter_title: document.getElementById('edit-chapter-title').value,
+        section: parseInt(document.getElementById('edit-section').value) || null,
+        raeder_volume: document.getElementById('edit-raeder-volume').value,
+        raeder_page: parseInt(document.getElementById('edit-raeder-page').value) || null,
+        raeder_line_start: parseInt(document.getElementById('edit-raeder-line-start').value) || null,
+        raeder_line_end: parseInt(document.getElementById('edit-raeder-line-end').value) || null,
+        title_greek: document.getElementById('edit-title-greek').value,
+        body_greek: document.getElementById('edit-body-greek').value,
+        translation_title: document.getElementById('edit-translation-title').value,
+        translation_content: document.getElementById('edit-translation-content').value,
+        note1: document.getElementById('edit-note1').value,
+        note2: document.getElementById('edit-note2').value,
+        ingredient_ids: currentEntryIngredients.map(i => i.id),
+        editor_name: 'Collaborator'
+    };
+
+    try {
+        const url = id ? `/api/entries/${id}` : '/api/entries';
+        const resp = await fetch(url, {
+            method: id ? 'PUT' : 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(data)
+        });
+        if (resp.ok) {
+            showToast(id ? 'Entry updated' : 'Entry created', 'success');
+            closeModal('edit-modal');
+            if (id) {
+                applyEntryChange(resp, parseInt(id), await resp.json());
+            } else {
+                loadEntries();  // where a new entry lands depends on the filters and order
+            }
+        }
+    } catch (err) {
+        showToast('Failed to save entry', 'error');
+    }
+}
+
+async function deleteEntry() {
+    const id = document.getElementById('edit-id').value;
+    if (!id || !confirm('Delete this entry?')) return;
+    try {
+        const resp = await fetch(`/api/entries/${id}`, { method: 'DELETE' });
+        showToast('Entry deleted', 'success');
+        closeModal('edit-modal');
+        applyEntryChange(resp, parseInt(id), null);
+    } catch (err) {
+        showToast('Failed to delete', 'error');
+    }
+}
+
+async function generateURN(id) {
+    try {
+        const resp = await fetch(`/api/generate-urn/${id}`, { method: 'POST' });
+        const data = await resp.json();
+        showToast('URNs generated', 'success');
+        applyEntryChange(resp, id, data);
+    } catch (err) {
+        showToast('Failed to generate URNs', 'error');
+    }
+}
+
+// Authors
+async function loadAuthors() {
+    try {
+        authors = await cachedJson('/api/authors');
+        renderAuthors();
+    } catch (err) {
+        console.error('Error loading authors:', err);
+    }
+}
+
+function renderAuthors() {
+    const tbody = document.querySelector('#authors-table tbody');
+    tbody.innerHTML = authors.map(a => `
+        <tr>
+            <td><strong>${a.name}</strong></td>
+            <td class="greek">${a.name_greek || '-'}</td>
+            <td>${a.sect || 'Unknown'}${!a.sect_certain ? ' <em>(uncertain)</em>' : ''}</td>
+            <td>${a.floruit || '-'}</td>
+            <td>${a.entry_count}</td>
+            <td><button class="btn btn-small btn-outline" onclick="editAuthor(${a.id})">Edit</button></td>
+        </tr>
+    `).join('');
+}
+
+function openNewAuthorModal() {
+    document.getElementById('author-modal-title').textContent = 'New Author';
+    document.getElementById('delete-author-btn').style.display = 'none';
+    document.getElementById('author-id').value = '';
+    ['name', 'name-greek', 'sect', 'floruit', 'tlg', 'notes'].forEach(f => {
+        const el = document.getElementById(`author-${f}`);
+        if (el) el.value = '';
+    });
+    document.getElementById('author-sect-certain').checked = true;
+    document.getElementById('author-modal').classList.add('active');
+}
+
+function editAuthor(id) {
+    const author = authors.find(a => a.id === id);
+    if (!author) return;
+    document.getElementById('author-modal-title').textContent = 'Edit Author';
+    document.getElementById('delete-author-btn').style.display = 'inline-flex';
+    document.getElementById('author-id').value = author.id;
+    document.getElementById('author-name').value = author.name || '';
+    document.getElementById('author-name-greek').value = author.name_greek || '';
+    document.getElementById('author-sect').value = author.sect || '';
+    document.getElementById('author-sect-certain').checked = author.sect_certain !== false;
+    document.getElementById('author-floruit').value = author.floruit || '';
+    document.getElementById('author-tlg').value = author.tlg_id || '';
+    document.getElementById('author-notes').value = author.notes || '';
+    document.getElementById('author-modal').classList.add('active');
+}
+
+async function saveAuthor() {
+    const id = document.getElementById('author-id').value;
+    const data = {
+        name: document.getElementById('author-name').value,
+        name_greek: document.getElementById('author-name-greek').value,
+        sect: document.getElementById('author-sect').value,
+        sect_certain: document.getElementById('author-sect-certain').checked,
+        floruit: document.getElementById('author-floruit').value,
+        tlg_id: document.getElementById('author-tlg').value,
+        notes: document.getElementById('author-notes').value
+    };
+    try {
+        await fetch(id ? `/api/authors/${id}` : '/api/authors', {
+            method: id ? 'PUT' : 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(data)
+        });
+        showToast('Author saved', 'success');
+        closeModal('author-modal');
+        loadAuthors();
+        loadFilters();
+    } catch (err) {
+        showToast('Failed to save author', 'error');
+    }
+}
+
+async function deleteAuthor() {
+    const id = document.getElementById('author-id').value;
+    if (!id || !confirm('Delete this author?')) return;
+    try {
+        await fetch(`/api/authors/${id}`, { method: 'DELETE' });
+        showToast('Author deleted', 'success');
+        closeModal('author-modal');
+        loadAuthors();
+        loadFilters();
+    } catch (err) {
+        showToast('Failed to delete', 'error');
+    }
+}
+
+// Ingredients
+async function loadIngredients() {
+    const params = new URLSearchParams();
+    const cat = document.getElementById('ingredient-category-filter')?.value;
+    const search = document.getElementById('ingredient-search')?.value;
+    if (cat) params.append('category', cat);
+    if (search) params.append('search', search);
+    try {
+        ingredients = await cachedJson(`/api/ingredients?${params}`);
+        renderIngredients();
+    } catch (err) {
+        console.error('Error loading ingredients:', err);
+    }
+}
+
+function renderIngredients() {
+    const tbody = document.querySelector('#ingredients-table tbody');
+    tbody.innerHTML = ingredients.map(i => `
+        <tr>
+            <td class="greek">${i.name_greek}</td>
+            <td>${i.name_latin || '-'}</td>
+            <td>${i.name_english || '-'}</td>
+            <td>${i.category || '-'}</td>
+            <td>${i.dioscorides_ref || '-'}</td>
+            <td><button class="btn btn-small btn-outline" onclick="editIngredient(${i.id})">Edit</button></td>
+        </tr>
+    `).join('');
+}
+
+function openNewIngredientModal() {
+    document.getElementById('ingredient-modal-title').textContent = 'New Ingredient';
+    document.getElementById('delete-ingredient-btn').style.display = 'none';
+    document.getElementById('ingredient-id').value = '';
+    ['greek', 'latin', 'english', 'modern', 'category', 'subcategory', 'dioscorides', 'notes'].forEach(f => {
+        const el = document.getElementById(`ingredient-${f}`);
+        if (el) el.value = '';
+    });
+    document.getElementById('ingredient-modal').classList.add('active');
+}
+
+function editIngredient(id) {
+    const ing = ingredients.find(i => i.id === id);
+    if (!ing) return;
+    document.getElementById('ingredient-modal-title').textContent = 'Edit Ingredient';
+    document.getElementById('delete-ingredient-btn').style.display = 'inline-flex';
+    document.getElementById('ingredient-id').value = ing.id;
+    document.getElementById('ingredient-greek').value = ing.name_greek || '';
+    document.getElementById('ingredient-latin').value = ing.name_latin || '';
+    document.getElementById('ingredient-english').value = ing.name_english || '';
+    document.getElementById('ingredient-modern').value = ing.modern_id || '';
+    document.getElementById('ingredient-category').value = ing.category || '';
+    document.getElementById('ingredient-subcategory').value = ing.subcategory || '';
+    document.getElementById('ingredient-dioscorides').value = ing.dioscorides_ref || '';
+    document.getElementById('ingredient-notes').value = ing.notes || '';
+    document.getElementById('ingredient-modal').classList.add('active');
+}
+
+async function saveIngredient() {
+    const id = document.getElementById('ingredient-id').value;
+    const data = {
+        name_greek: document.getElementById('ingredient-greek').value,
+        name_latin: document.getElementById('ingredient-latin').value,
+        name_english: document.getElementById('ingredient-english').value,
+        modern_id: document.getElementById('ingredient-modern').value,
+        category: document.getElementById('ingredient-category').value,
+        subcategory: document.getElementById('ingredient-subcategory').value,
+        dioscorides_ref: document.getElementById('ingredient-dioscorides').value,
+        notes: document.getElementById('ingredient-notes').value
+    };
+    try {
+        await fetch(id ? `/api/ingredients/${id}` : '/api/ingredients', {
+            method: id ? 'PUT' : 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(data)
+        });
+        showToast('Ingredient saved', 'success');
+        closeModal('ingredient-modal');
+        loadIngredients();
+        loadFilters();
+    } catch (err) {
+        showToast('Failed to save ingredient', 'error');
+    }
+}
+
+async function deleteIngredient() {
+    const id = document.getElementById('ingredient-id').value;
+    if (!id || !confirm('Delete this ingredient?')) return;
+    try {
+        await fetch(`/api/ingredients/${id}`, { method: 'DELETE' });
+        showToast('Ingredient deleted', 'success');
+        closeModal('ingredient-modal');
+        loadIngredients();
+        loadFilters();
+    } catch (err) {
+        showToast('Failed to delete', 'error');
+    }
+}
+
+// Analytics
+async function loadAnalytics() {
+    try {
+        const [data, mapData] = await Promise.all([
+            cachedJson('/api/analytics'),
+            cachedJson('/api/book-map')
+        ]);
+
+        document.getElementById('analytics-total-words').textContent = data.total_words.toLocaleString();
+        document.getElementById('analytics-total-entries').textContent = data.total_entries.toLocaleString();
+
+        Object.values(charts).forEach(c => c.destroy());
+        charts = {};
+
+        // Authors chart
+        const authorLabels = Object.keys(data.words_by_author);
+        const authorHeight = Math.max(320, authorLabels.length * 24);
+        document.getElementById('chart-authors').parentElement.style.height = `${authorHeight}px`;
+        charts.authors = new Chart(document.getElementById('chart-authors'), {
+            type: 'bar',
+            data: { labels: authorLabels, datasets: [{ data: authorLabels.map(l => data.words_by_author[l]), backgroundColor: '#1e3a5f' }] },
+            options: { indexAxis: 'y', maintainAspectRatio: false, plugins: { legend: { display: false } }, scales: { x: { beginAtZero: true } } }
+        });
+
+        // Sects chart
+        const sectLabels = Object.keys(data.words_by_sect);
+        charts.sects = new Chart(document.getElementById('chart-sects'), {
+            type: 'doughnut',
+            data: { labels: sectLabels, datasets: [{ data: sectLabels.map(l => data.words_by_sect[l]), backgroundColor: ['#40826d', '#1e3a5f', '#b8860b', '#c44536', '#5c4030'] }] },
+            options: { plugins: { legend: { position: 'right' } } }
+        });
+
+        // Books chart
+        const bookLabels = Object.keys(data.words_by_book).sort((a, b) => parseInt(a.replace('Book ', '')) - parseInt(b.replace('Book ', '')));
+        charts.books = new Chart(document.getElementById('chart-books'), {
+            type: 'bar',
+            data: { labels: bookLabels, datasets: [{ data: bookLabels.map(l => data.words_by_book[l]), backgroundColor: '#b8860b' }] },
+            options: { plugins: { legend: { display: false } }, scales: { y: { beginAtZero: true } } }
+        });
+
+        // Ingredients chart
+        const ingLabels = data.top_ingredients.slice(0, 10).map(i => i[0]);
+        charts.ingredients = new Chart(document.getElementById('chart-ingredients'), {
+            type: 'bar',
+            data: { labels: ingLabels, datasets: [{ data: data.top_ingredients.slice(0, 10).map(i => i[1]), backgroundColor: '#40826d' }] },
+            options: { indexAxis: 'y', maintainAspectRatio: false, plugins: { legend: { display: false } }, scales: { x: { beginAtZero: true } } }
+        });
+
+        // Word frequency
+        const maxFreq = data.top_greek_words[0]?.[1] || 1;
+        document.getElementById('word-freq-container').innerHTML = `
+            <table class="data-table" style="box-shadow: none;">
+                <thead><tr><th>Word</th><th>Count</th></tr></thead>
+                <tbody>
+                    ${data.top_greek_words.slice(0, 30).map(([word, count]) => `
+                        <tr><td class="greek">${word}</td><td>${count}</td></tr>
+                    `).join('')}
+                </tbody>
+            </table>`;
+
+        renderBookMap(mapData);
+    } catch (err) {
+        showToast('Failed to load analytics', 'error');
+    }
+}
+
+// Background jobs: maintenance endpoints answer 202 with a job to poll
+async function runMaintenanceJob(url, options = {}) {
+    const resp = await fetch(url, { method: 'POST', ...options });
+    const data = await resp.json();
+    if (!resp.ok) throw new Error(data.error || 'Request failed');
+    if (resp.status !== 202 || !data.job) return data;
+    return waitForJob(data.job.id);
+}
+
+async function waitForJob(jobId) {
+    while (true) {
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        const resp = await fetch(`/api/jobs/${jobId}`);
+        const job = await resp.json();
+        if (job.status === 'succeeded') return job.result || { message: job.message };
+        if (job.status === 'failed') throw new Error(job.error || 'Job failed');
+        if (job.status === 'cancelled') throw new Error(job.message || 'Job cancelled');
+    }
+}
+
+// Import/Export
+function exportCSV() { window.location.href = '/api/export'; }
+
+async function importFile(file) {
+    const formData = new FormData();
+    formData.append('file', file);
+    showToast('Importing...', 'info');
+    try {
+        const data = await runMaintenanceJob('/api/import', { body: formData });
+        showToast(data.message || 'Import complete', 'success');
+        loadEntries();
+        loadFilters();
+    } catch (err) {
+        showToast(err.message || 'Import failed', 'error');
+    }
+}
+
+async function reindexLemmas() {
+    showToast('Reindexing...', 'info');
+    try {
+        const data = await runMaintenanceJob('/api/reindex-lemmas');
+        showToast(data.message, 'success');
+    } catch (err) {
+        showToast(err.message || 'Reindex failed', 'error');
+    }
+}
+
+async function generateAllURNs() {
+    try {
+        const data = await runMaintenanceJob('/api/generate-all-urns');
+        showToast(data.message, 'success');
+        loadEntries();
+    } catch (err) {
+        showToast(err.message || 'Failed to generate URNs', 'error');
+    }
+}
+
+async function clearDatabase(scope = 'entries') {
+    const scopeLabel = scope === 'all'
+        ? 'the entire database (entries, authors, ingredients, themes)'
+        : 'all entries';
+    const confirmation = prompt(`This will delete ${scopeLabel}. Type RESET to confirm.`);
+    if (confirmation !== 'RESET') {
+        showToast('Reset cancelled', 'info');
+        return;
+    }
+    try {
+        const data = await runMaintenanceJob('/api/reset', {
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ scope, confirm: 'RESET' })
+        });
+        showToast(data.message || 'Database cleared', 'success');
+        loadEntries();
+        loadFilters();
+    } catch (err) {
+        showToast(err.message || 'Reset failed', 'error');
+    }
+}
+
+function toggleAnalyticsFullscreen() {
+    const panel = document.getElementById('panel-analytics');
+    if (!panel) return;
+    const isFull = panel.classList.toggle('fullscreen');
+    document.body.classList.toggle('panel-fullscreen-active', isFull);
+    const btn = document.getElementById('analytics-fullscreen-btn');
+    if (btn) btn.textContent = isFull ? 'Restore' : 'Maximize';
+    scheduleChartResize();
+}
+
+function closeAnalyticsFullscreen() {
+    const panel = document.getElementById('panel-analytics');
+    if (!panel || !panel.classList.contains('fullscreen')) return;
+    panel.classList.remove('fullscreen');
+    document.body.classList.remove('panel-fullscreen-active');
+    const btn = document.getElementById('analytics-fullscreen-btn');
+    if (btn) btn.textContent = 'Maximize';
+    scheduleChartResize();
+}
+
+function scheduleChartResize() {
+    setTimeout(() => {
+        Object.values(charts || {}).forEach(chart => {
+            if (chart && typeof chart.resize === 'function') chart.resize();
+        });
+        // book map is pure HTML; nothing to resize
+    }, 150);
+}
+
+function renderBookMap(data) {
+    const container = document.getElementById('book-map');
+    const legend = document.getElementById('book-map-legend');
+    if (!data?.books?.length) {
+        container.innerHTML = '<em style="color: var(--ink-light);">No data</em>';
+        legend.innerHTML = '';
+        return;
+    }
+
+    container.innerHTML = data.books.map(book => {
+        const chapters = book.chapters.map(ch => {
+            const titleLine = ch.title ? `Title: ${ch.title}` : '';
+            const transLine = ch.translation_title ? ` / ${ch.translation_title}` : '';
+            const label = `Book ${book.book}, Chapter ${ch.chapter}\nSource: ${ch.source_author}\n${titleLine}${transLine}\nEntries: ${ch.entries}\nWords: ${ch.word_count.toLocaleString()}`;
+            return `<div class="chapter-block" title="${label}" style="background:${ch.color}"></div>`;
+        }).join('');
+        return `
+            <div class="book-row">
+                <div class="book-label">Book ${book.book}</div>
+                <div class="chapter-strip">${chapters}</div>
+            </div>
+        `;
+    }).join('');
+
+    const colorEntries = Object.entries(data.colors || {});
+    legend.innerHTML = colorEntries.map(([name, color]) => `
+        <span class="legend-item"><span class="legend-swatch" style="background:${color}"></span>${name}</span>
+    `).join('');
+}
+
+// Utils
+function closeModal(id) {
+    const el = document.getElementById(id);
+    if (el) el.classList.remove('active');
+    if (id === 'view-modal') viewingEntryId = null;
+}
+
+function showToast(message, type = 'info') {
+    const container = document.getElementById('toast-container');
+    const toast = document.createElement('div');
+    toast.className = `toast ${type}`;
+    toast.textContent = message;
+    container.appendChild(toast);
+    setTimeout(() => toast.remove(), 4000);
+}
+
+// Structure Panel Functions
+let thematicData = null;
+let expandedNodes = new Set();  // Track which nodes are expanded
+
+async function seedThematicData() {
+    try {
+        const data = await runMaintenanceJob('/api/seed-thematic');
+        showToast(data.message, 'success');
+        loadThematicMap();
+    } catch (error) {
+        console.error('Error seeding thematic data:', error);
+        showToast('Failed to seed thematic data', 'error');
+    }
+}
+
+async function loadThematicMap() {
+    const mode = document.querySelector('input[name="structure-mode"]:checked').value;
+    try {
+        const data = await cachedJson(`/api/thematic-map?mode=${mode}`);
+        thematicData = data;
+
+        // Expand root level by default
+        if (data.structure && data.structure.length > 0) {
+            expandedNodes.add(data.structure[0].id);
+        }
+
+        renderThematicTree(data);
+    } catch (error) {
+        console.error('Error loading thematic map:', error);
+        showToast('Failed to load thematic structure', 'error');
+    }
+}
+
+function toggleNode(nodeId) {
+    if (expandedNodes.has(nodeId)) {
+        expandedNodes.delete(nodeId);
+    } else {
+        expandedNodes.add(nodeId);
+    }
+    renderThematicTree(thematicData);
+}
+
+function filterByDivision(booksStart, booksEnd) {
+    // Switch to Browse tab
+    document.querySelectorAll('.nav-tab').forEach(t => t.classList.remove('active'));
+    document.querySelectorAll('.panel').forEach(p => p.classList.remove('active'));
+    document.querySelector('[data-panel="browse"]').classList.add('active');
+    document.getElementById('panel-browse').classList.add('active');
+
+    // Apply filter
+    const bookFilter = document.getElementById('filter-book');
+    if (bookFilter && booksStart) {
+        // If single book, select it
+        if (booksStart === booksEnd) {
+            bookFilter.value = booksStart;
+        } else {
+            // For ranges, just set to first book (user can adjust)
+            bookFilter.value = booksStart;
+        }
+        loadEntries();
+        showToast(`Filtered to Book ${booksStart}${booksEnd !== booksStart ? `-${booksEnd}` : ''}`, 'info');
+    }
+}
+
+function renderThematicTree(data) {
+    if (!data) return;
+
+    const container = document.getElementById('thematic-tree');
+    const legend = document.getElementById('structure-legend');
+
+    // Build legend from unique groups
+    const groups = new Set();
+    function collectGroups(node) {
+        Object.keys(node.group_counts || {}).forEach(g => groups.add(g));
+        (node.children || []).forEach(collectGroups);
+    }
+    data.structure.forEach(collectGroups);
+
+    const mode = data.mode || 'school';
+    const fallbackSchoolColors = {
+        'Galen': '#e41a1c',
+        'Pneumatist': '#377eb8',
+        'Methodist': '#4daf4a',
+        'Empiricist': '#984ea3',
+        'Dogmatist': '#ff7f00',
+        'Other': '#999999'
+    };
+
+    // Prefer server-provided colors to stay consistent with book map
+    let colors = data.colors || {};
+    if (mode === 'school' && Object.keys(colors).length === 0) {
+        colors = fallbackSchoolColors;
+    } else if (mode !== 'school' && Object.keys(colors).length === 0) {
+        // Fallback: assign deterministic colors if backend did not send any
+        const authorPalette = [
+            '#e41a1c', '#377eb8', '#4daf4a', '#984ea3', '#ff7f00', '#ffff33',
+            '#a65628', '#f781bf', '#999999', '#66c2a5', '#fc8d62', '#8da0cb',
+            '#e78ac3', '#a6d854', '#ffd92f', '#e5c494', '#b3b3b3', '#8dd3c7',
+            '#bebada', '#fb8072', '#80b1d3', '#fdb462', '#b3de69', '#fccde5', '#d9d9d9'
+        ];
+        colors = {};
+        const sortedGroups = Array.from(groups).filter(g => g !== 'Unknown').sort();
+        sortedGroups.forEach((author, idx) => {
+            colors[author] = authorPalette[idx % authorPalette.length];
+        });
+        colors['Unknown'] = '#999999';
+        colors['Other'] = '#999999';
+    }
+
+    Object.keys(colors || {}).forEach(g => groups.add(g));
+
+    legend.innerHTML = Array.from(groups).map(g => `
+        <span style="display: flex; align-items: center; gap: 0.5rem;">
+            <span style="width: 12px; height: 12px; border-radius: 3px; background: ${colors[g] || '#999'}"></span>
+            <span style="font-size: 0.9rem;">${g}</span>
+        </span>
+    `).join('');
+
+    function renderNode(node, depth = 0) {
+        const indent = depth * 24;
+        const hasChildren = node.children && node.children.length > 0;
+        const isExpanded = expandedNodes.has(node.id);
+
+        // Calculate dominant group
+        const groupCounts = node.group_counts || {};
+        const total = Object.values(groupCounts).reduce((a, b) => a + b, 0);
+        const dominant = Object.entries(groupCounts).sort((a, b) => b[1] - a[1])[0];
+        const dominantColor = dominant ? (colors[dominant[0]] || '#999') : node.color;
+
+        // Create percentage bar
+        let barHtml = '';
+        if (total > 0) {
+            const segments = Object.entries(groupCounts)
+                .sort((a, b) => b[1] - a[1])
+                .map(([group, count]) => {
+                    const pct = (count / total * 100).toFixed(1);
+                    return `<div style="width: ${pct}%; background: ${colors[group] || '#999'}; height: 100%;"
+                                 title="${group}: ${pct}%"></div>`;
+                }).join('');
+            barHtml = `<div style="display: flex; height: 8px; border-radius: 4px; overflow: hidden; margin-top: 0.5rem;">${segments}</div>`;
+        }
+
+        const levelStyles = {
+            'part': 'font-size: 1.25rem; font-weight: 700;',
+            'division': 'font-size: 1.1rem; font-weight: 600;',
+            'subdivision': 'font-weight: 500;',
+            'section': 'font-size: 0.95rem;'
+        };
+
+        // Expand/collapse arrow
+        const arrow = hasChildren
+            ? `<span style="margin-right: 0.5rem; cursor: pointer; user-select: none; transition: transform 0.2s;"
+                      onclick="event.stopPropagation(); toggleNode(${node.id})">
+                 ${isExpanded ? '▼' : '▶'}
+               </span>`
+            : '<span style="margin-right: 1.5rem;"></span>';
+
+        // Click handler for filtering
+        const clickHandler = node.books_start
+            ? `onclick="filterByDivision(${node.books_start}, ${node.books_end})" style="cursor: pointer;"`
+            : '';
+
+        const childrenHtml = hasChildren && isExpanded
+            ? node.children.map(c => renderNode(c, depth + 1)).join('')
+            : '';
+
+        return `
+            <div style="margin-left: ${indent}px;">
+                <div ${clickHandler}
+                     style="border-left: 4px solid ${node.color || dominantColor}; padding-left: 1rem; padding-top: 0.75rem; padding-bottom: 0.75rem; margin-bottom: 0.5rem; background: rgba(255,255,255,0.3); border-radius: 0 8px 8px 0; transition: all 0.2s ease;"
+                     onmouseover="this.style.background='rgba(255,255,255,0.6)'"
+                     onmouseout="this.style.background='rgba(255,255,255,0.3)'">
+                    <div style="display: flex; justify-content: space-between; align-items: start;">
+                        <div style="flex: 1;">
+                            ${arrow}
+                            <span style="${levelStyles[node.level] || ''}">${node.numeral ? node.numeral + '. ' : ''}${node.title_english}</span>
+                            ${node.title_latin ? `<span style="color: var(--ink-light); font-style: italic; margin-left: 0.5rem;">${node.title_latin}</span>` : ''}
+                            ${node.books ? `<span style="color: var(--ink-light); font-size: 0.85rem; margin-left: 0.5rem;">[${node.books}]</span>` : ''}
+                        </div>
+                        <div style="text-align: right; font-size: 0.9rem; color: var(--ink-light); min-width: 120px;">
+                            <div>${(node.word_count || 0).toLocaleString()} words</div>
+                            <div>${node.entry_count || 0} entries</div>
+                        </div>
+                    </div>
+                    ${node.definition ? `<div style="font-size: 0.9rem; color: var(--ink-light); margin-top: 0.5rem; margin-left: 1.5rem;">${node.definition}</div>` : ''}
+                    ${barHtml ? `<div style="margin-left: 1.5rem;">${barHtml}</div>` : ''}
+                </div>
+                ${childrenHtml}
+            </div>
+        `;
+    }
+
+    container.innerHTML = data.structure.map(node => renderNode(node)).join('');
+}